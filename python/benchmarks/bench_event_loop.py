@@ -0,0 +1,74 @@
+"""
+Event-loop responsiveness benchmark.
+
+Runs a mix of heavy list queries and cheap point lookups concurrently
+through the ASGI app, once with database work inline on the event loop
+and once on the DB executor, and reports per-query latency percentiles.
+
+    python -m benchmarks.bench_event_loop --requests 400 --concurrency 32
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from httpx import AsyncClient
+
+from .common import populate, quiet_logs, summarize, temp_database
+from src.executor import set_db_executor_workers
+from src.config import DB_EXECUTOR_WORKERS
+
+QUERIES = {
+    "heavy": "{ allCharacters { name homePlanet { name } } }",
+    "light": '{ planet(id: "1") { name climate } }',
+}
+
+async def run_workload(app, requests, concurrency, heavy_ratio, seed):
+    rng = random.Random(seed)
+    plan = ["heavy" if rng.random() < heavy_ratio else "light" for _ in range(requests)]
+    latencies = {name: [] for name in QUERIES}
+    queue = asyncio.Queue()
+    for kind in plan:
+        queue.put_nowait(kind)
+
+    async def worker(client):
+        while not queue.empty():
+            kind = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.post("/graphql/", json={"query": QUERIES[kind]})
+            response.raise_for_status()
+            latencies[kind].append(time.perf_counter() - started)
+
+    async with AsyncClient(app=app, base_url="http://bench") as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--heavy-ratio", type=float, default=0.1)
+    parser.add_argument("--characters", type=int, default=1000)
+    parser.add_argument("--planets", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=max(DB_EXECUTOR_WORKERS, 1))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from src.main import app
+    quiet_logs()
+
+    with temp_database(size=max(args.workers, 1)):
+        populate(args.planets, args.characters, starships=10)
+        print(f"{'mode':<10} {'query':<6} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for mode, workers in (("inline", 0), ("executor", args.workers)):
+            set_db_executor_workers(workers)
+            latencies = asyncio.run(
+                run_workload(app, args.requests, args.concurrency, args.heavy_ratio, args.seed)
+            )
+            for kind, values in latencies.items():
+                s = summarize(values)
+                print(f"{mode:<10} {kind:<6} {s['count']:>6} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f}")
+        set_db_executor_workers(DB_EXECUTOR_WORKERS)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+GraphQL benchmark suite.
+
+Runs a matrix of representative operations against the ASGI app
+in-process (httpx, no network) for each dataset scale, and reports
+throughput, p50/p95/p99 latency, SQL statements per request and peak
+RSS. Results can be saved as JSON and compared against a saved baseline;
+any regression beyond the tolerance exits with status 1.
+
+    python -m benchmarks.bench_graphql --scales 0.001,0.005 --output results.json
+    python -m benchmarks.bench_graphql --scales 0.001,0.005 --baseline results.json --tolerance 0.2
+"""
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import sys
+import time
+
+from httpx import AsyncClient
+
+from .common import count_statements, quiet_logs, summarize, temp_database
+from src.cache import clear_caches
+from src.seed import generate_data
+
+QUERIES = {
+    "character_by_id": '{ character(id: "1") { name species homePlanet { name } } }',
+    "characters_page": "{ characters(first: 50) { edges { node { name homePlanet { name } } } totalCount } }",
+    "planets_residents": "{ planets(first: 20) { edges { node { name residents(first: 10) { name } } } } }",
+    "starship_pilots": "{ starships(first: 20) { edges { node { name pilots(first: 10) { name homePlanet { name } } } } } }",
+    "all_characters_nested": (
+        "{ allCharacters { name homePlanet { name } "
+        "pilotedStarships(first: 3) { name pilots(first: 3) { name } } } }"
+    ),
+}
+
+# Metrics compared against the baseline: name -> True when higher is better
+COMPARED = {"rps": True, "p95_ms": False, "p99_ms": False, "sql_per_request": False}
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+async def run_case(app, query, requests, concurrency, warmup, max_seconds):
+    payload = {"query": query}
+    latencies = []
+    errors = 0
+    done = 0
+
+    async with AsyncClient(app=app, base_url="http://bench") as client:
+        # SQL per request is measured on one request against cold cross-request
+        # caches, so it does not depend on TTLs or interleaving and can be
+        # compared exactly; the timed run below uses warm caches.
+        clear_caches()
+        with count_statements() as cold:
+            await client.post("/graphql/", json=payload)
+
+        for _ in range(warmup):
+            await client.post("/graphql/", json=payload)
+
+        remaining = iter(range(requests))
+
+        async def worker():
+            nonlocal errors, done
+            for _ in remaining:
+                started = time.perf_counter()
+                if started > deadline:
+                    return
+                response = await client.post("/graphql/", json=payload)
+                elapsed = time.perf_counter() - started
+                done += 1
+                if response.status_code != 200 or response.json().get("errors"):
+                    errors += 1
+                else:
+                    latencies.append(elapsed)
+
+        with count_statements() as statements:
+            started = time.perf_counter()
+            deadline = started + max_seconds
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            wall = time.perf_counter() - started
+
+    return {
+        "requests": done,
+        "errors": errors,
+        "rps": len(latencies) / wall if wall else 0.0,
+        "sql_per_request": cold.count,
+        "sql_per_request_warm": statements.count / done if done else 0.0,
+        **summarize(latencies),
+    }
+
+def run_suite(scales, queries, requests, concurrency, warmup, max_seconds, seed):
+    from src.main import app
+    quiet_logs()
+
+    results = []
+    for scale in scales:
+        with temp_database():
+            dataset = generate_data(scale=scale, seed=seed)
+            for name in queries:
+                result = asyncio.run(run_case(app, QUERIES[name], requests, concurrency, warmup, max_seconds))
+                result.update({"scale": scale, "query": name, "peak_rss_mb": peak_rss_mb()})
+                results.append(result)
+                print_row(result)
+        print(
+            f"  scale {scale}: {dataset['planets']} planets, {dataset['characters']} characters, "
+            f"{dataset['starships']} starships, {dataset['pilots']} pilots (seeded in {dataset['seconds']:.1f}s)"
+        )
+    return results
+
+def print_header():
+    print(
+        f"{'scale':>7} {'query':<22} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'sql/req':>8} {'rss MB':>7} {'errors':>6}"
+    )
+
+def print_row(r):
+    print(
+        f"{r['scale']:>7g} {r['query']:<22} {r['rps']:>8.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+        f"{r['p99_ms']:>8.2f} {r['sql_per_request']:>8.1f} {r['peak_rss_mb']:>7.0f} {r['errors']:>6}"
+    )
+
+def compare(results, baseline, tolerance):
+    """
+    Return a list of regression messages: cases whose metrics are worse
+    than the baseline by more than `tolerance` (a fraction), or that now
+    produce errors. SQL statements per request are counted on a cold cache,
+    which makes them deterministic, so they allow no increase at all.
+    """
+    previous = {(r["scale"], r["query"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["scale"], result["query"]))
+        if before is None:
+            continue
+        label = f"scale {result['scale']:g} {result['query']}"
+        if result["errors"] > before.get("errors", 0):
+            regressions.append(f"{label}: errors {before.get('errors', 0)} -> {result['errors']}")
+        for metric, higher_is_better in COMPARED.items():
+            old, new = before.get(metric), result[metric]
+            if not old:
+                continue
+            allowed = 0.0 if metric == "sql_per_request" else tolerance
+            change = (old - new) / old if higher_is_better else (new - old) / old
+            if change > allowed + 1e-9:
+                regressions.append(f"{label}: {metric} {old:.2f} -> {new:.2f} ({change:+.0%} worse)")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="0.001,0.005", help="Comma separated dataset scales (1.0 = 1M characters)")
+    parser.add_argument("--queries", default=",".join(QUERIES), help="Comma separated subset of: " + ", ".join(QUERIES))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--max-seconds", type=float, default=10.0,
+                        help="Stop issuing requests for a case after this long (slow shapes on big datasets)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a JSON file written by --output")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown before failing")
+    args = parser.parse_args(argv)
+
+    scales = [float(value) for value in args.scales.split(",")]
+    queries = args.queries.split(",")
+    unknown = [name for name in queries if name not in QUERIES]
+    if unknown:
+        parser.error(f"Unknown queries: {', '.join(unknown)}")
+
+    print_header()
+    results = run_suite(
+        scales, queries, args.requests, args.concurrency, args.warmup, args.max_seconds, args.seed
+    )
+
+    if args.output:
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {key: getattr(args, key) for key in ("requests", "concurrency", "warmup", "max_seconds", "seed")},
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as stream:
+            json.dump(report, stream, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as stream:
+            regressions = compare(results, json.load(stream), args.tolerance)
+        if regressions:
+            print(f"\nREGRESSIONS against {args.baseline}:")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+SQLite PRAGMA profile benchmark.
+
+Runs concurrent point reads and single-row write transactions against a
+fresh database for each profile (SQLite defaults vs the configured
+performance profile) and reports throughput and latency percentiles.
+
+    python -m benchmarks.bench_sqlite_profiles --threads 8 --reads 20000 --writes 2000
+"""
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import populate, summarize, temp_database
+from src.database import get_db_connection, LEGACY_PROFILE, PERFORMANCE_PROFILE
+
+PROFILES = {
+    "legacy": LEGACY_PROFILE,
+    "performance": PERFORMANCE_PROFILE,
+}
+
+def read_op(rng, characters):
+    conn = get_db_connection()
+    try:
+        conn.execute(
+            "SELECT c.id, c.name, p.name FROM characters c "
+            "LEFT JOIN planets p ON p.id = c.home_planet_id WHERE c.id = ?",
+            (rng.randint(1, characters),),
+        ).fetchone()
+    finally:
+        conn.close()
+
+def write_op(rng, characters):
+    conn = get_db_connection()
+    try:
+        conn.execute(
+            "UPDATE characters SET species = ? WHERE id = ?",
+            (f"Species {rng.randint(0, 9)}", rng.randint(1, characters)),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+def run_ops(op, count, threads, characters, seed):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    local = threading.local()
+
+    def task(_):
+        nonlocal errors
+        if not hasattr(local, "rng"):
+            local.rng = random.Random(seed + threading.get_ident())
+        started = time.perf_counter()
+        try:
+            op(local.rng, characters)
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(task, range(count)))
+    wall = time.perf_counter() - started
+    return {"ops_per_sec": len(latencies) / wall if wall else 0.0, "errors": errors, **summarize(latencies)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--reads", type=int, default=20000)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--characters", type=int, default=10000)
+    parser.add_argument("--planets", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'profile':<12} {'workload':<8} {'ops/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, pragmas in PROFILES.items():
+        with temp_database(size=args.threads, pragmas=pragmas):
+            populate(args.planets, args.characters, starships=100)
+            for workload, op, count in (("read", read_op, args.reads), ("write", write_op, args.writes)):
+                result = run_ops(op, count, args.threads, args.characters, args.seed)
+                print(
+                    f"{name:<12} {workload:<8} {result['ops_per_sec']:>10.0f} {result['p50_ms']:>8.2f} "
+                    f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['errors']:>7}"
+                )
+
+if __name__ == "__main__":
+    main()
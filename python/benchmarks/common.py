@@ -0,0 +1,81 @@
+import logging
+import os
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import configure_pool, get_pool, init_db, DATABASE_NAME
+from src.seed import generate_data
+
+def quiet_logs():
+    logging.getLogger("starwars_api").setLevel(logging.WARNING)
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def summarize(latencies):
+    return {
+        "count": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+def populate(planets, characters, starships, pilots_per_starship=3, seed=42, **options):
+    """Fill the current database with a seeded synthetic dataset (see src.seed.generate_data)."""
+    return generate_data(
+        seed=seed, planets=planets, characters=characters, starships=starships,
+        pilots=starships * pilots_per_starship, **options,
+    )
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, sql):
+        if not sql.startswith("PRAGMA"):
+            with self._lock:
+                self.count += 1
+
+@contextmanager
+def count_statements():
+    """Count SQL statements run on connections borrowed from the pool inside the block."""
+    counter = StatementCounter()
+    pool = get_pool()
+    acquire = pool.acquire
+
+    def traced_acquire(*args, **kwargs):
+        conn = acquire(*args, **kwargs)
+        conn.set_trace_callback(counter)
+        return conn
+
+    pool.acquire = traced_acquire
+    try:
+        yield counter
+    finally:
+        del pool.acquire
+        for conn in list(pool._idle):
+            conn.set_trace_callback(None)
+
+@contextmanager
+def temp_database(**pool_options):
+    """Point the shared pool at a throwaway database file for the duration of a run."""
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="starwars-bench-")
+    os.close(fd)
+    configure_pool(path, **pool_options)
+    try:
+        init_db()
+        yield path
+    finally:
+        configure_pool(DATABASE_NAME)
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
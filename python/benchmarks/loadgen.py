@@ -0,0 +1,319 @@
+"""
+Closed-loop load generator for a running API server.
+
+Replays a weighted mix of operations from a JSON scenario file with a
+fixed number of concurrent virtual users, optionally paced to a target
+request rate. Tokens from /auth/login are cached per user and reused by
+authenticated operations. Prints throughput and errors per interval while
+running, then latency percentiles and histograms per operation.
+
+    python -m benchmarks.loadgen benchmarks/scenarios/mixed.json --url http://localhost:8000
+    python -m benchmarks.loadgen benchmarks/scenarios/mixed.json --concurrency 64 --duration 120 --output load.json
+
+Scenario format (keys other than "operations" are optional):
+
+    {
+      "duration": 60, "concurrency": 16, "target_rps": null, "ramp_up": 5,
+      "think_time": [0.0, 0.1],
+      "users": [{"username": "admin", "password": "admin123"}],
+      "operations": [
+        {"name": "login", "type": "login", "weight": 1},
+        {"name": "character", "weight": 10, "id_range": [1, 1000],
+         "query": "query ($id: ID!) { character(id: $id) { name } }", "variables": {"id": "{id}"}},
+        {"name": "create_planet", "weight": 1, "auth": true,
+         "query": "mutation ($n: String!) { createPlanet(input: {name: $n}) { id } }",
+         "variables": {"n": "Load {worker}-{seq}"}}
+      ]
+    }
+
+String variables are formatted with {worker}, {seq}, {rand} and {id}
+(a random integer from the operation's "id_range", which should match the
+ids of the target database, e.g. 1..1000 after `python -m src.seed --scale 0.001`).
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from .common import summarize
+
+DEFAULTS = {
+    "duration": 30,
+    "concurrency": 8,
+    "target_rps": None,
+    "ramp_up": 0,
+    "think_time": [0.0, 0.0],
+    "users": [{"username": "admin", "password": "admin123"}],
+}
+
+# Histogram bucket upper bounds in milliseconds
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf")]
+
+def load_scenario(path):
+    with open(path, encoding="utf-8") as stream:
+        scenario = {**DEFAULTS, **json.load(stream)}
+
+    operations = scenario.get("operations") or []
+    if not operations:
+        raise ValueError("Scenario must define at least one operation")
+    for index, operation in enumerate(operations):
+        operation.setdefault("name", f"op{index}")
+        operation.setdefault("type", "graphql")
+        operation.setdefault("weight", 1)
+        if operation["type"] not in ("graphql", "login"):
+            raise ValueError(f"{operation['name']}: unknown type {operation['type']!r}")
+        if operation["type"] == "graphql" and not operation.get("query"):
+            raise ValueError(f"{operation['name']}: graphql operations need a query")
+        if operation["weight"] <= 0:
+            raise ValueError(f"{operation['name']}: weight must be positive")
+    if not scenario["users"]:
+        raise ValueError("Scenario must define at least one user")
+    return scenario
+
+def render(value, fields):
+    if isinstance(value, str):
+        return value.format(**fields)
+    if isinstance(value, dict):
+        return {key: render(item, fields) for key, item in value.items()}
+    if isinstance(value, list):
+        return [render(item, fields) for item in value]
+    return value
+
+class TokenStore:
+    """Access tokens per username, fetched from /auth/login once and reused."""
+    def __init__(self):
+        self._tokens = {}
+        self._locks = defaultdict(asyncio.Lock)
+
+    async def login(self, client, user):
+        response = await client.post("/auth/login", json=user)
+        if response.status_code == 200:
+            self._tokens[user["username"]] = response.json()["access_token"]
+        else:
+            self._tokens.pop(user["username"], None)
+        return response
+
+    async def get(self, client, user):
+        username = user["username"]
+        if username not in self._tokens:
+            async with self._locks[username]:
+                if username not in self._tokens:
+                    await self.login(client, user)
+        return self._tokens.get(username)
+
+    def invalidate(self, user):
+        self._tokens.pop(user["username"], None)
+
+class Pacer:
+    """Spaces request starts evenly so all workers together stay at `rps`."""
+    def __init__(self, rps):
+        self.interval = 1.0 / rps
+        self._next = time.perf_counter()
+
+    async def wait(self):
+        now = time.perf_counter()
+        slot = max(self._next, now)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+class Recorder:
+    def __init__(self, interval):
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.timeline = defaultdict(lambda: [0, 0])
+        self.sample_errors = {}
+
+    def record(self, name, seconds, status, ok, error=None):
+        self.statuses[name][status] += 1
+        slot = self.timeline[int((time.perf_counter() - self.started) // self.interval)]
+        if ok:
+            self.latencies[name].append(seconds)
+            slot[0] += 1
+        else:
+            self.errors[name] += 1
+            slot[1] += 1
+            if error:
+                self.sample_errors.setdefault(name, error)
+
+    def histogram(self, name):
+        counts = [0] * len(BUCKETS_MS)
+        for seconds in self.latencies[name]:
+            ms = seconds * 1000
+            counts[next(i for i, bound in enumerate(BUCKETS_MS) if ms <= bound)] += 1
+        return counts
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        operations = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            ok, errors = len(self.latencies[name]), self.errors[name]
+            operations[name] = {
+                "ok": ok,
+                "errors": errors,
+                "error_rate": errors / (ok + errors) if ok + errors else 0.0,
+                "rps": ok / elapsed if elapsed else 0.0,
+                "statuses": dict(self.statuses[name]),
+                "sample_error": self.sample_errors.get(name),
+                "histogram_ms": dict(zip(map(str, BUCKETS_MS), self.histogram(name))),
+                **summarize(self.latencies[name]),
+            }
+        timeline = [
+            {"t": slot * self.interval, "ok": ok, "errors": errors}
+            for slot, (ok, errors) in sorted(self.timeline.items())
+        ]
+        total_ok = sum(op["ok"] for op in operations.values())
+        total_errors = sum(op["errors"] for op in operations.values())
+        return {
+            "seconds": elapsed,
+            "requests": total_ok + total_errors,
+            "rps": total_ok / elapsed if elapsed else 0.0,
+            "error_rate": total_errors / (total_ok + total_errors) if total_ok + total_errors else 0.0,
+            "operations": operations,
+            "timeline": timeline,
+        }
+
+async def execute(client, tokens, operation, user, fields):
+    if operation["type"] == "login":
+        response = await tokens.login(client, user)
+        ok = response.status_code == 200
+        return response.status_code, ok, None if ok else response.text[:200]
+
+    headers = {}
+    if operation.get("auth"):
+        token = await tokens.get(client, user)
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+    payload = {"query": operation["query"], "variables": render(operation.get("variables", {}), fields)}
+    response = await client.post("/graphql/", json=payload, headers=headers)
+    if response.status_code == 401:
+        tokens.invalidate(user)
+    if response.status_code != 200:
+        return response.status_code, False, response.text[:200]
+    errors = response.json().get("errors")
+    return response.status_code, not errors, errors[0].get("message") if errors else None
+
+async def worker(number, client, scenario, tokens, recorder, pacer, deadline, rng):
+    operations = scenario["operations"]
+    weights = [operation["weight"] for operation in operations]
+    user = scenario["users"][number % len(scenario["users"])]
+    think_min, think_max = scenario["think_time"]
+
+    await asyncio.sleep(scenario["ramp_up"] * number / scenario["concurrency"])
+    seq = 0
+    while time.perf_counter() < deadline:
+        if pacer:
+            await pacer.wait()
+            if time.perf_counter() >= deadline:
+                return
+        operation = rng.choices(operations, weights=weights)[0]
+        id_range = operation.get("id_range", [1, 1])
+        fields = {"worker": number, "seq": seq, "rand": rng.randint(1, 10**9), "id": rng.randint(*id_range)}
+        seq += 1
+
+        started = time.perf_counter()
+        try:
+            status, ok, error = await execute(client, tokens, operation, user, fields)
+        except httpx.HTTPError as exc:
+            status, ok, error = type(exc).__name__, False, str(exc)
+        recorder.record(operation["name"], time.perf_counter() - started, status, ok, error)
+
+        if think_max > 0:
+            await asyncio.sleep(rng.uniform(think_min, think_max))
+
+async def print_progress(recorder, interval):
+    last = 0
+    while True:
+        await asyncio.sleep(interval)
+        current = int((time.perf_counter() - recorder.started) // interval)
+        for slot in range(last, current):
+            ok, errors = recorder.timeline.get(slot, (0, 0))
+            print(f"t={slot * interval:>6.0f}s  {ok / interval:>8.1f} req/s  {errors:>5} errors", file=sys.stderr)
+        last = current
+
+async def run(scenario, url, interval=5.0, seed=42):
+    concurrency = scenario["concurrency"]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    tokens = TokenStore()
+    recorder = Recorder(interval)
+    pacer = Pacer(scenario["target_rps"]) if scenario["target_rps"] else None
+    deadline = time.perf_counter() + scenario["duration"]
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        # Log every user in before the clock starts so the first requests aren't all logins
+        for user in scenario["users"]:
+            response = await tokens.login(client, user)
+            if response.status_code != 200:
+                print(f"Login failed for {user['username']}: {response.status_code}", file=sys.stderr)
+
+        recorder.started = time.perf_counter()
+        progress = asyncio.create_task(print_progress(recorder, interval))
+        try:
+            await asyncio.gather(*(
+                worker(number, client, scenario, tokens, recorder, pacer, deadline, random.Random(seed + number))
+                for number in range(concurrency)
+            ))
+        finally:
+            progress.cancel()
+    return recorder.report()
+
+def print_report(report):
+    print(
+        f"\n{report['requests']} requests in {report['seconds']:.1f}s, "
+        f"{report['rps']:.1f} req/s, {report['error_rate']:.2%} errors\n"
+    )
+    print(f"{'operation':<20} {'ok':>7} {'errors':>7} {'err %':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, op in report["operations"].items():
+        print(
+            f"{name:<20} {op['ok']:>7} {op['errors']:>7} {op['error_rate']:>6.1%} {op['rps']:>8.1f} "
+            f"{op['p50_ms']:>8.1f} {op['p95_ms']:>8.1f} {op['p99_ms']:>8.1f}"
+        )
+    for name, op in report["operations"].items():
+        if op["sample_error"]:
+            print(f"{name} error sample: {op['sample_error']}")
+    for name, op in report["operations"].items():
+        total = op["ok"] or 1
+        print(f"\n{name} latency histogram")
+        for bound, count in op["histogram_ms"].items():
+            if count:
+                label = f"<= {float(bound):g} ms" if bound != "inf" else "> 5000 ms"
+                print(f"  {label:>12} {count:>7} {'#' * max(1, round(40 * count / total))}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenario", help="Path to a JSON scenario file")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, help="Override the scenario duration (seconds)")
+    parser.add_argument("--concurrency", type=int, help="Override the number of virtual users")
+    parser.add_argument("--rps", type=float, help="Override the target request rate")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds per throughput timeline bucket")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the full report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    try:
+        scenario = load_scenario(args.scenario)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    for key, value in (("duration", args.duration), ("concurrency", args.concurrency), ("target_rps", args.rps)):
+        if value is not None:
+            scenario[key] = value
+
+    report = asyncio.run(run(scenario, args.url, args.interval, args.seed))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as stream:
+            json.dump({"scenario": scenario, **report}, stream, indent=2)
+        print(f"\nReport written to {args.output}")
+    return report
+
+if __name__ == "__main__":
+    main()
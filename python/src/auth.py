@@ -2,16 +2,59 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
+import hashlib
 import logging
+import threading
+import time
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from .database import get_db_connection
-from .config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from .cache import TTLCache, MISSING
+from .config import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES,
+    AUTH_TOKEN_CACHE_SIZE, AUTH_TOKEN_CACHE_TTL, BCRYPT_ROUNDS,
+)
 
 logger = logging.getLogger("starwars_api.auth")
 
 security = HTTPBearer(auto_error=False)
 
+token_cache = TTLCache(AUTH_TOKEN_CACHE_SIZE, AUTH_TOKEN_CACHE_TTL, "tokens")
+_token_stats = {"decodes": 0, "cache_hits": 0, "request_hits": 0}
+_token_stats_lock = threading.Lock()
+_REQUEST_USER = "starwars_api.user"
+
+def _count(name):
+    with _token_stats_lock:
+        _token_stats[name] += 1
+
+def decode_token(token: str) -> dict:
+    """
+    jwt.decode with a process-wide LRU keyed by the token digest.
+    Entries never outlive the token's `exp`; failures are not cached and
+    raise the usual jose errors.
+    """
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(key)
+    if payload is not MISSING:
+        _count("cache_hits")
+        return payload
+
+    _count("decodes")
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    ttl = AUTH_TOKEN_CACHE_TTL
+    if isinstance(payload.get("exp"), (int, float)):
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(key, payload, ttl=ttl)
+    return payload
+
+def get_token_stats():
+    with _token_stats_lock:
+        stats = dict(_token_stats)
+    stats.update(size=token_cache.stats()["size"], max_size=token_cache.max_size)
+    return stats
+
 def _truncate_password_bytes(password: str) -> bytes:
     password_bytes = password.encode('utf-8')
     if len(password_bytes) > 72:
@@ -25,10 +68,17 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     password_bytes = _truncate_password_bytes(password)
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
+def needs_rehash(hashed_password: str) -> bool:
+    """True when the stored hash was made with a different BCRYPT_ROUNDS."""
+    try:
+        return int(hashed_password.split('$')[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -74,7 +124,7 @@ def verify_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(s
     
     logger.debug(f"Verifying token: {token[:20]}... (length: {len(token)})")
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         username: str = payload.get("sub")
         if username is None:
             logger.warning("Token missing username field")
@@ -118,10 +168,27 @@ def is_admin(user: dict = Depends(get_current_user)) -> bool:
     return user.get("role") == "admin"
 
 def get_user_from_context(info):
-    request = info.context.get("request")
+    return get_user_from_request(info.context.get("request"))
+
+def get_user_from_request(request):
+    """
+    Return the JWT payload for `request`, or None. The result is memoized
+    on the ASGI scope, so every resolver in a request shares one decode.
+    """
     if not request:
         return None
 
+    scope = getattr(request, "scope", None)
+    if isinstance(scope, dict) and _REQUEST_USER in scope:
+        _count("request_hits")
+        return scope[_REQUEST_USER]
+
+    user = _decode_request_token(request)
+    if isinstance(scope, dict):
+        scope[_REQUEST_USER] = user
+    return user
+
+def _decode_request_token(request):
     auth_header = None
     headers = request.headers if hasattr(request, 'headers') else {}
 
@@ -148,8 +215,7 @@ def get_user_from_context(info):
         return None
     
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        return decode_token(token)
     except JWTError as e:
         logger.debug(f"JWT decode error: {e}")
         return None
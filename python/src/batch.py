@@ -0,0 +1,47 @@
+import asyncio
+import logging
+from ariadne.exceptions import HttpError
+from starlette.responses import PlainTextResponse
+from .config import GRAPHQL_BATCH_MAX_SIZE
+from .resolvers import create_dataloaders
+
+logger = logging.getLogger("starwars_api.batch")
+
+class BatchRequestMixin:
+    """
+    GraphQLHTTPHandler mixin accepting a JSON array of operations. All
+    operations in the array run concurrently and share one set of
+    DataLoaders, so lookups from different operations are coalesced into
+    the same batched queries. The response is an array in request order.
+    """
+    def __init__(self, *args, batch_max_size=GRAPHQL_BATCH_MAX_SIZE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batch_max_size = batch_max_size
+
+    async def graphql_http_server(self, request):
+        try:
+            data = await self.extract_data_from_request(request)
+        except HttpError as error:
+            return PlainTextResponse(error.message or error.status, status_code=400)
+
+        if not isinstance(data, list):
+            success, result = await self.execute_graphql_query(request, data)
+            return await self.create_json_response(request, result, success)
+
+        if not data or len(data) > self.batch_max_size:
+            message = f"Batch harus berisi 1 sampai {self.batch_max_size} operasi."
+            return await self.create_json_response(request, {"errors": [{"message": message}]}, False)
+
+        dataloaders = create_dataloaders()
+        outcomes = await asyncio.gather(
+            *(self._execute_batched(request, operation, dataloaders) for operation in data)
+        )
+        logger.debug(f"Executed batch of {len(data)} operations")
+        success = any(ok for ok, _ in outcomes)
+        return await self.create_json_response(request, [result for _, result in outcomes], success)
+
+    async def _execute_batched(self, request, data, dataloaders):
+        context_value = await self.get_context_for_request(request, data)
+        if isinstance(context_value, dict):
+            context_value["dataloaders"] = dataloaders
+        return await self.execute_graphql_query(request, data, context_value=context_value)
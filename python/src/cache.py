@@ -0,0 +1,178 @@
+import threading
+import time
+from collections import OrderedDict
+from .config import ENTITY_CACHE_SIZE, ENTITY_CACHE_TTL, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+
+MISSING = object()
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with a per-entry time-to-live.
+    Entries can carry tags so a group of keys can be dropped at once
+    with invalidate_tag(). max_size=0 disables the cache.
+
+    Readers that compute a value outside the lock take a generation()
+    token first and pass it to set(); the write is dropped if anything it
+    covers was invalidated meanwhile, so a read that raced a mutation
+    cannot store the pre-mutation value after the purge.
+    """
+    def __init__(self, max_size, ttl, name=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.name = name
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_writes = 0
+        # Bumped by every delete/invalidate_tag; the epoch by clear()
+        self._changes = 0
+        self._epoch = 0
+        self._tag_generations = {}
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self, tags=None):
+        """
+        Token for a later set(). With `tags`, only invalidations of those
+        tags (or clear()) make it stale; without, any invalidation does.
+        """
+        with self._lock:
+            return self._generation(tags)
+
+    def _generation(self, tags):
+        if tags is None:
+            return self._epoch, None, self._changes
+        tags = tuple(tags)
+        return self._epoch, tags, tuple(self._tag_generations.get(tag, 0) for tag in tags)
+
+    def set(self, key, value, tags=(), ttl=None, generation=None):
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if generation is not None and generation != self._generation(generation[1]):
+                self.stale_writes += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._changes += 1
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+                return True
+            return False
+
+    def invalidate_tag(self, tag):
+        with self._lock:
+            self._changes += 1
+            self._tag_generations[tag] = self._tag_generations.get(tag, 0) + 1
+            if len(self._tag_generations) > max(self.max_size, 1024):
+                # Bound the bookkeeping; a new epoch conservatively stales every token
+                self._tag_generations.clear()
+                self._epoch += 1
+            keys = self._tags.pop(tag, set())
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+                    self.invalidations += 1
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._tag_generations.clear()
+            self._epoch += 1
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_writes": self.stale_writes,
+            }
+
+entity_cache = {
+    name: TTLCache(ENTITY_CACHE_SIZE, ENTITY_CACHE_TTL, name)
+    for name in ("planets", "characters", "starships")
+}
+
+relation_cache = {
+    name: TTLCache(ENTITY_CACHE_SIZE, ENTITY_CACHE_TTL, name)
+    for name in ("planet_residents", "starship_pilots", "character_starships")
+}
+
+response_cache = TTLCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, "responses")
+
+def entity_tag(kind, entity_id):
+    return f"{kind}:{int(entity_id)}"
+
+def invalidate_entity(name, entity_id):
+    entity_cache[name].delete(int(entity_id))
+
+def invalidate_relations(name, kind, entity_id):
+    """Drop every cached `name` list whose parent or members include kind:entity_id."""
+    relation_cache[name].invalidate_tag(entity_tag(kind, entity_id))
+
+def table_tag(table):
+    return f"table:{table}"
+
+def invalidate_tables(*tables):
+    """Purge cached GraphQL responses that read any of `tables`."""
+    for table in tables:
+        response_cache.invalidate_tag(table_tag(table))
+
+def clear_caches():
+    for cache in (*entity_cache.values(), *relation_cache.values(), response_cache):
+        cache.clear()
+
+def get_cache_stats():
+    stats = {
+        name: cache.stats()
+        for name, cache in (*entity_cache.items(), *relation_cache.items())
+    }
+    stats["responses"] = response_cache.stats()
+    return stats
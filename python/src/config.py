@@ -1,3 +1,4 @@
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -6,12 +7,62 @@ env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
 DATABASE_NAME = os.getenv("DATABASE_NAME", "starwars.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5.0"))
+DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", "30"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_SIZE)))
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL")
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+DB_CACHE_SIZE = int(os.getenv("DB_CACHE_SIZE", "-20000"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_TEMP_STORE = os.getenv("DB_TEMP_STORE", "MEMORY")
+DB_BUSY_TIMEOUT = int(os.getenv("DB_BUSY_TIMEOUT", "5000"))
+DB_WAL_CHECKPOINT_INTERVAL = float(os.getenv("DB_WAL_CHECKPOINT_INTERVAL", "300"))
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "1024"))
+AUTH_TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "300"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", "2"))
+AUTH_HASH_QUEUE_LIMIT = int(os.getenv("AUTH_HASH_QUEUE_LIMIT", "16"))
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "20"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "100"))
+
+DATALOADER_MAX_BATCH_SIZE = int(os.getenv("DATALOADER_MAX_BATCH_SIZE", "500"))
+
+ENTITY_CACHE_SIZE = int(os.getenv("ENTITY_CACHE_SIZE", "10000"))
+ENTITY_CACHE_TTL = float(os.getenv("ENTITY_CACHE_TTL", "60"))
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "False").lower() == "true"
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+DOCUMENT_CACHE_SIZE = int(os.getenv("DOCUMENT_CACHE_SIZE", "500"))
+
+PERSISTED_QUERIES_MAX_SIZE = int(os.getenv("PERSISTED_QUERIES_MAX_SIZE", "1000"))
+PERSISTED_QUERIES_STRICT = os.getenv("PERSISTED_QUERIES_STRICT", "False").lower() == "true"
+PERSISTED_QUERIES_MANIFEST = os.getenv("PERSISTED_QUERIES_MANIFEST", "")
+
+BULK_MUTATION_MAX_ITEMS = int(os.getenv("BULK_MUTATION_MAX_ITEMS", "50000"))
+GRAPHQL_BATCH_MAX_SIZE = int(os.getenv("GRAPHQL_BATCH_MAX_SIZE", "20"))
+
+QUERY_MAX_DEPTH = int(os.getenv("QUERY_MAX_DEPTH", "10"))
+QUERY_MAX_COST = int(os.getenv("QUERY_MAX_COST", "10000"))
+QUERY_DEFAULT_LIST_SIZE = int(os.getenv("QUERY_DEFAULT_LIST_SIZE", "20"))
+QUERY_FIELD_WEIGHTS = json.loads(os.getenv("QUERY_FIELD_WEIGHTS", "{}"))
+QUERY_LIST_SIZES = json.loads(os.getenv("QUERY_LIST_SIZES", "{}"))
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+METRICS_RESOLVER_SAMPLE_RATE = float(os.getenv("METRICS_RESOLVER_SAMPLE_RATE", "1.0"))
+METRICS_MAX_SERIES = int(os.getenv("METRICS_MAX_SERIES", "500"))
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_LOG_FILE = os.getenv("SLOW_QUERY_LOG_FILE", "slow_queries.log")
 
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+FAST_STARTUP = os.getenv("FAST_STARTUP", "True").lower() == "true"
 PORT = int(os.getenv("PORT", "8000"))
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
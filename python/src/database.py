@@ -1,14 +1,414 @@
 import sqlite3
 import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
+from .config import (
+    DB_POOL_SIZE, DB_POOL_TIMEOUT,
+    DB_POOL_HEALTH_CHECK_INTERVAL, DB_STATEMENT_CACHE_SIZE,
+    DB_JOURNAL_MODE, DB_SYNCHRONOUS, DB_CACHE_SIZE, DB_MMAP_SIZE,
+    DB_TEMP_STORE, DB_BUSY_TIMEOUT,
+)
 
 PROJECT_ROOT = Path(__file__).parent.parent
 DATABASE_NAME = os.path.join(PROJECT_ROOT, "starwars.db")
 
+# PRAGMAs applied to every new connection, in this order. journal_mode
+# is persistent in the file; the rest are per-connection.
+PERFORMANCE_PROFILE = {
+    "journal_mode": DB_JOURNAL_MODE,
+    "synchronous": DB_SYNCHRONOUS,
+    "cache_size": DB_CACHE_SIZE,
+    "mmap_size": DB_MMAP_SIZE,
+    "temp_store": DB_TEMP_STORE,
+    "busy_timeout": DB_BUSY_TIMEOUT,
+}
+
+# SQLite's own defaults, kept for benchmarking against the profile above.
+LEGACY_PROFILE = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "cache_size": -2000,
+    "mmap_size": 0,
+    "temp_store": "DEFAULT",
+    "busy_timeout": 5000,
+}
+
+_PRAGMA_CHOICES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+
+def _pragma_statements(pragmas):
+    statements = []
+    for name, value in pragmas.items():
+        if name in _PRAGMA_CHOICES:
+            value = str(value).upper()
+            if value not in _PRAGMA_CHOICES[name]:
+                raise ValueError(f"Invalid value for PRAGMA {name}: {value}")
+        elif name in ("cache_size", "mmap_size", "busy_timeout"):
+            value = int(value)
+        else:
+            raise ValueError(f"Unsupported PRAGMA: {name}")
+        statements.append(f"PRAGMA {name} = {value}")
+    return statements
+
+class PoolTimeoutError(Exception):
+    pass
+
+# (on_execute, on_fetch) pairs installed by add_sql_observer()
+_sql_observers = ()
+
+def add_sql_observer(on_execute=None, on_fetch=None):
+    """
+    Observe every statement run through a pooled connection:
+    on_execute(cursor, sql, seconds) after execute/executemany, and
+    on_fetch(cursor, sql, rows, seconds) after fetchone/fetchmany/fetchall.
+    The cursor carries the statement's `parameters` (None for
+    executemany) and its cumulative `elapsed` time and `rows`. Rows read by iterating the cursor are not
+    counted. Returns a handle for remove_sql_observer().
+    """
+    global _sql_observers
+    handle = (on_execute, on_fetch)
+    _sql_observers = (*_sql_observers, handle)
+    return handle
+
+def remove_sql_observer(handle):
+    global _sql_observers
+    _sql_observers = tuple(observer for observer in _sql_observers if observer is not handle)
+
+class ObservedCursor(sqlite3.Cursor):
+    sql = None
+    parameters = ()
+    elapsed = 0.0
+    rows = 0
+
+    def _observe_execute(self, method, sql, parameters, many=False):
+        observers = _sql_observers
+        started = time.perf_counter()
+        method(sql, parameters)
+        seconds = time.perf_counter() - started
+        self.sql = sql
+        self.parameters = None if many else parameters
+        self.elapsed = seconds
+        self.rows = 0
+        for on_execute, _ in observers:
+            if on_execute:
+                on_execute(self, sql, seconds)
+        return self
+
+    def execute(self, sql, parameters=()):
+        return self._observe_execute(super().execute, sql, parameters)
+
+    def executemany(self, sql, parameters):
+        return self._observe_execute(super().executemany, sql, parameters, many=True)
+
+    def _observe_fetch(self, method, *args):
+        observers = _sql_observers
+        started = time.perf_counter()
+        result = method(*args)
+        if self.sql is None:
+            return result
+        seconds = time.perf_counter() - started
+        rows = len(result) if isinstance(result, list) else int(result is not None)
+        self.elapsed += seconds
+        self.rows += rows
+        for _, on_fetch in observers:
+            if on_fetch:
+                on_fetch(self, self.sql, rows, seconds)
+        return result
+
+    def fetchone(self):
+        return self._observe_fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._observe_fetch(super().fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._observe_fetch(super().fetchall)
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3 connection owned by a ConnectionPool.
+    close() hands the connection back to the pool instead of closing it,
+    so existing `conn = get_db_connection() ... conn.close()` code borrows
+    and returns without changes.
+    """
+    _pool = None
+    _checked_out = False
+    _last_used = 0.0
+
+    def execute(self, sql, parameters=()):
+        if not _sql_observers:
+            return super().execute(sql, parameters)
+        return self.cursor(ObservedCursor).execute(sql, parameters)
+
+    def executemany(self, sql, parameters):
+        if not _sql_observers:
+            return super().executemany(sql, parameters)
+        return self.cursor(ObservedCursor).executemany(sql, parameters)
+
+    def close(self):
+        if self._pool is None:
+            super().close()
+        elif self._checked_out:
+            self._pool.release(self)
+
+    def dispose(self):
+        self._pool = None
+        super().close()
+
+class ConnectionPool:
+    def __init__(self, database, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL,
+                 statement_cache_size=DB_STATEMENT_CACHE_SIZE, pragmas=None):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.pragmas = dict(PERFORMANCE_PROFILE if pragmas is None else pragmas)
+        self._pragma_statements = _pragma_statements(self.pragmas)
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.statement_cache_size = statement_cache_size
+        self._idle = deque()
+        self._lock = threading.Condition(threading.Lock())
+        self._open = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._created = 0
+        self._discarded = 0
+        self._timeouts = 0
+        self._checkpoints = 0
+        self._last_checkpoint = None
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.database,
+            factory=PooledConnection,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size,
+        )
+        try:
+            for statement in self._pragma_statements:
+                conn.execute(statement)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        conn.row_factory = sqlite3.Row
+        conn._pool = self
+        return conn
+
+    def checkpoint(self, mode="PASSIVE"):
+        """
+        Run a WAL checkpoint so the -wal file does not grow without bound
+        between SQLite's automatic checkpoints. No-op outside WAL mode.
+        """
+        mode = mode.upper()
+        if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError(f"Invalid checkpoint mode: {mode}")
+        conn = self.acquire()
+        try:
+            busy, log_frames, checkpointed = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        finally:
+            conn.close()
+        result = {"busy": busy, "log_frames": log_frames, "checkpointed": checkpointed, "at": time.time()}
+        with self._lock:
+            self._checkpoints += 1
+            self._last_checkpoint = result
+        return result
+
+    def profile(self):
+        """Configured PRAGMAs next to the values SQLite actually reports."""
+        conn = self.acquire()
+        try:
+            effective = {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in self.pragmas}
+        finally:
+            conn.close()
+        with self._lock:
+            return {
+                "configured": dict(self.pragmas),
+                "effective": effective,
+                "checkpoints": self._checkpoints,
+                "last_checkpoint": self._last_checkpoint,
+            }
+
+    def _is_healthy(self, conn):
+        if time.monotonic() - conn._last_used < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        conn = None
+        with self._lock:
+            self._waiting += 1
+            try:
+                while not self._idle and self._open >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._lock.wait(remaining):
+                        if not self._idle and self._open >= self.size:
+                            self._timeouts += 1
+                            raise PoolTimeoutError(
+                                f"Timed out after {timeout}s waiting for a database connection "
+                                f"(pool size {self.size})"
+                            )
+                if self._idle:
+                    conn = self._idle.pop()
+                else:
+                    self._open += 1
+                    self._created += 1
+                self._in_use += 1
+            finally:
+                self._waiting -= 1
+
+        try:
+            if conn is not None and not self._is_healthy(conn):
+                self._discard(conn, opened_replacement=True)
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._lock:
+                self._open -= 1
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+
+        conn._checked_out = True
+        return conn
+
+    def _discard(self, conn, opened_replacement=False):
+        try:
+            conn.dispose()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._discarded += 1
+            if opened_replacement:
+                self._created += 1
+
+    def release(self, conn):
+        conn._checked_out = False
+        reusable = True
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            reusable = False
+
+        if not reusable:
+            self._discard(conn)
+        conn._last_used = time.monotonic()
+        with self._lock:
+            self._in_use -= 1
+            if reusable:
+                self._idle.append(conn)
+            else:
+                self._open -= 1
+            self._lock.notify()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "created": self._created,
+                "discarded": self._discarded,
+                "timeouts": self._timeouts,
+            }
+
+    def close_all(self):
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+        for conn in idle:
+            conn.dispose()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DATABASE_NAME)
+    return _pool
+
+def configure_pool(database=DATABASE_NAME, **options):
+    """Replace the shared pool, e.g. to point tests or benchmarks at another file."""
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, ConnectionPool(database, **options)
+    if old is not None:
+        old.close_all()
+    return _pool
+
+def get_pool_stats():
+    return get_pool().stats()
+
+def get_db_profile():
+    return get_pool().profile()
+
+def checkpoint_wal(mode="PASSIVE"):
+    return get_pool().checkpoint(mode)
+
 def get_db_connection():
-    conn = sqlite3.connect(DATABASE_NAME)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return get_pool().acquire()
+
+@contextmanager
+def indexes_dropped(conn, *tables):
+    """Drop the secondary indexes of `tables` for the duration of a bulk load, then rebuild them."""
+    indexes = []
+    for table in tables:
+        indexes += conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (table,),
+        ).fetchall()
+    for name, _ in indexes:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.commit()
+    try:
+        yield [name for name, _ in indexes]
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        for _, sql in indexes:
+            conn.execute(sql)
+        conn.commit()
+
+SCHEMA_VERSION = 1
+
+def get_schema_version():
+    conn = get_db_connection()
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+def ensure_db():
+    """
+    Run init_db() only when the schema version marker (PRAGMA user_version)
+    is behind SCHEMA_VERSION. Returns True when DDL was executed.
+    """
+    if get_schema_version() >= SCHEMA_VERSION:
+        return False
+    init_db()
+    return True
 
 def init_db():
     conn = get_db_connection()
@@ -68,6 +468,7 @@ def init_db():
     c.execute("CREATE INDEX IF NOT EXISTS idx_character_starships_starship ON character_starships(starship_id)")
     c.execute("CREATE INDEX IF NOT EXISTS idx_characters_name ON characters(name)")
     c.execute("CREATE INDEX IF NOT EXISTS idx_starships_name ON starships(name)")
+    c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
     conn.commit()
     conn.close()
@@ -1,164 +1,370 @@
 from aiodataloader import DataLoader
+from ariadne.types import Extension
 from .database import get_db_connection
+from .executor import run_db
+from .cache import entity_cache, relation_cache, entity_tag, MISSING
+from .config import METRICS_ENABLED, DATALOADER_MAX_BATCH_SIZE
+from .metrics import dataloader_batch_size, dataloader_batch_sql_duration, dataloader_keys
+import functools
 import logging
+import time
 
 logger = logging.getLogger("starwars_api.dataloaders")
 
-class PlanetLoader(DataLoader):
-    async def batch_load_fn(self, keys):
-        try:
-            conn = get_db_connection()
-            try:
-                placeholders = ','.join('?' * len(keys))
-                query = f"SELECT id, name, climate, terrain FROM planets WHERE id IN ({placeholders})"
-                planets = conn.execute(query, keys).fetchall()
-                planet_dict = {str(p['id']): dict(p) for p in planets}
-                result = [planet_dict.get(str(k)) for k in keys]
-                logger.debug(f"PlanetLoader: Loaded {len([r for r in result if r])} planets for {len(keys)} keys")
-                return result
-            finally:
-                conn.close()
-        except Exception as e:
-            logger.error(f"Error in PlanetLoader: {e}", exc_info=True)
-            return [None] * len(keys)
+DEBUG_HEADER = "x-debug-dataloaders"
 
-class CharacterLoader(DataLoader):
-    async def batch_load_fn(self, keys):
-        try:
-            conn = get_db_connection()
-            try:
-                placeholders = ','.join('?' * len(keys))
-                query = f"SELECT id, name, species, home_planet_id FROM characters WHERE id IN ({placeholders})"
-                characters = conn.execute(query, keys).fetchall()
-                character_dict = {str(c['id']): dict(c) for c in characters}
-                result = [character_dict.get(str(k)) for k in keys]
-                logger.debug(f"CharacterLoader: Loaded {len([r for r in result if r])} characters for {len(keys)} keys")
-                return result
-            finally:
-                conn.close()
-        except Exception as e:
-            logger.error(f"Error in CharacterLoader: {e}", exc_info=True)
-            return [None] * len(keys)
+class LoaderStats:
+    """
+    Activity of one loader instance. Updated on the event loop only, so
+    plain attributes are enough; per-batch values also go straight to the
+    metrics histograms, load/memo counts are published once per request.
+    """
+    def __init__(self):
+        self.loads = 0
+        self.memo_hits = 0
+        self.batches = 0
+        self.batch_keys = 0
+        self.max_batch_size = 0
+        self.cache_hits = 0
+        self.db_keys = 0
+        self.sql_seconds = 0.0
+        self.primed = 0
+        self._published_memo_hits = 0
 
-class StarshipLoader(DataLoader):
-    async def batch_load_fn(self, keys):
-        try:
-            conn = get_db_connection()
-            try:
-                placeholders = ','.join('?' * len(keys))
-                query = f"SELECT id, name, model, manufacturer FROM starships WHERE id IN ({placeholders})"
-                starships = conn.execute(query, keys).fetchall()
-                starship_dict = {str(s['id']): dict(s) for s in starships}
-                result = [starship_dict.get(str(k)) for k in keys]
-                logger.debug(f"StarshipLoader: Loaded {len([r for r in result if r])} starships for {len(keys)} keys")
-                return result
-            finally:
-                conn.close()
-        except Exception as e:
-            logger.error(f"Error in StarshipLoader: {e}", exc_info=True)
-            return [None] * len(keys)
+    def record_batch(self, name, size, cache_hits, sql_seconds=None):
+        self.batches += 1
+        self.batch_keys += size
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.cache_hits += cache_hits
+        self.db_keys += size - cache_hits
+        if sql_seconds is not None:
+            self.sql_seconds += sql_seconds
+        if not METRICS_ENABLED:
+            return
+        dataloader_batch_size.observe((name,), size)
+        if cache_hits:
+            dataloader_keys.inc((name, "cache"), cache_hits)
+        if size - cache_hits:
+            dataloader_keys.inc((name, "database"), size - cache_hits)
+        if sql_seconds is not None:
+            dataloader_batch_sql_duration.observe((name,), sql_seconds)
 
-class CharacterStarshipsLoader(DataLoader):
-    async def batch_load_fn(self, keys):
-        try:
-            conn = get_db_connection()
-            try:
-                placeholders = ','.join('?' * len(keys))
-                query = f"""
-                    SELECT cs.character_id, s.id, s.name, s.model, s.manufacturer
-                    FROM character_starships cs
-                    JOIN starships s ON cs.starship_id = s.id
-                    WHERE cs.character_id IN ({placeholders})
-                """
-                results = conn.execute(query, keys).fetchall()
-                
-                starships_by_character = {}
-                for row in results:
-                    char_id = str(row['character_id'])
-                    if char_id not in starships_by_character:
-                        starships_by_character[char_id] = []
-                    starships_by_character[char_id].append({
-                        'id': row['id'],
-                        'name': row['name'],
-                        'model': row['model'],
-                        'manufacturer': row['manufacturer']
-                    })
-                
-                result = [starships_by_character.get(str(k), []) for k in keys]
-                logger.debug(f"CharacterStarshipsLoader: Loaded starships for {len(keys)} characters")
-                return result
-            finally:
-                conn.close()
-        except Exception as e:
-            logger.error(f"Error in CharacterStarshipsLoader: {e}", exc_info=True)
-            return [[] for _ in keys]
+    def publish(self, name):
+        """Push memo hits not yet published; safe to call once per operation of a shared batch."""
+        if METRICS_ENABLED and self.memo_hits > self._published_memo_hits:
+            dataloader_keys.inc((name, "memo"), self.memo_hits - self._published_memo_hits)
+        self._published_memo_hits = self.memo_hits
+
+class InstrumentedLoader(DataLoader):
+    """DataLoader that counts loads, per-request memo hits and batches in `self.stats`."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = LoaderStats()
+
+    @property
+    def name(self):
+        return type(self).__name__
+
+    def load(self, key):
+        self.stats.loads += 1
+        if self.cache and key is not None and self.get_cache_key(key) in self._cache:
+            self.stats.memo_hits += 1
+        return super().load(key)
+
+def summarize_loaders(dataloaders):
+    """Per-request loader activity, grouped by loader class (windowed relation loaders are merged)."""
+    summary = {}
+    for loader in dataloaders.values():
+        stats = getattr(loader, "stats", None)
+        if stats is None or not (stats.loads or stats.primed):
+            continue
+        entry = summary.setdefault(loader.name, {
+            "loads": 0, "memoHits": 0, "batches": 0, "batchKeys": 0, "maxBatchSize": 0,
+            "cacheHits": 0, "databaseKeys": 0, "sqlMs": 0.0, "primed": 0,
+        })
+        entry["loads"] += stats.loads
+        entry["memoHits"] += stats.memo_hits
+        entry["batches"] += stats.batches
+        entry["batchKeys"] += stats.batch_keys
+        entry["maxBatchSize"] = max(entry["maxBatchSize"], stats.max_batch_size)
+        entry["cacheHits"] += stats.cache_hits
+        entry["databaseKeys"] += stats.db_keys
+        entry["sqlMs"] += stats.sql_seconds * 1000
+        entry["primed"] += stats.primed
+    for entry in summary.values():
+        entry["avgBatchSize"] = round(entry["batchKeys"] / entry["batches"], 2) if entry["batches"] else 0.0
+        entry["dedupRatio"] = round(entry["memoHits"] / entry["loads"], 3) if entry["loads"] else 0.0
+        entry["sqlMs"] = round(entry["sqlMs"], 3)
+    return summary
+
+class DataLoaderStatsExtension(Extension):
+    """
+    Publishes per-request memo hit counts to the metrics registry and, when
+    the request carries the X-Debug-DataLoaders header, adds a summary of
+    loader activity to the response `extensions`.
+    """
+    def request_finished(self, context):
+        for loader in _context_loaders(context).values():
+            stats = getattr(loader, "stats", None)
+            if stats is not None:
+                stats.publish(loader.name)
+
+    def format(self, context):
+        request = context.get("request") if isinstance(context, dict) else None
+        if request is None or not request.headers.get(DEBUG_HEADER):
+            return None
+        return {"dataloaders": summarize_loaders(_context_loaders(context))}
+
+def _context_loaders(context):
+    if isinstance(context, dict):
+        return context.get("dataloaders") or {}
+    return {}
+
+def _timed(load):
+    @functools.wraps(load)
+    def run(keys):
+        started = time.perf_counter()
+        result = load(keys)
+        return result, time.perf_counter() - started
+    return run
+
+async def load_cached(cache, keys, load, cache_key=int, tags=None, stats=None, name=None):
+    """
+    Serve keys from the shared cross-request cache and only send the
+    misses to `load` on the DB executor. Missing rows (None) are not cached.
+    """
+    results = [cache.get(cache_key(k)) for k in keys]
+    missing = [k for k, value in zip(keys, results) if value is MISSING]
+    if not missing:
+        if stats is not None:
+            stats.record_batch(name, len(keys), len(keys))
+        return results
+
+    # Taken before the read: a mutation invalidating during it stales the token
+    generation = cache.generation()
+    rows, sql_seconds = await run_db(_timed(load), missing)
+    if stats is not None:
+        stats.record_batch(name, len(keys), len(keys) - len(missing), sql_seconds)
+    loaded = dict(zip(missing, rows))
+    for key in missing:
+        value = loaded[key]
+        if value is not None:
+            cache.set(cache_key(key), value, tags(key, value) if tags else (), generation=generation)
+    return [loaded[k] if value is MISSING else value for k, value in zip(keys, results)]
+
+class Relation:
+    """
+    Declarative description of what a loader reads: rows of `table` (plus
+    an optional `join`) whose `key` column is in the batch, projected to
+    `columns`. One-to-one relations map each key to a row or None,
+    one-to-many relations to a list ordered by `order` (default: the
+    first column, the related id).
+    """
+    def __init__(self, table, key, columns, join="", many=False, order=None):
+        self.table = table
+        self.key = key
+        self.columns = tuple(columns)
+        self.join = join
+        self.many = many
+        self.order = order or self.columns[0]
+        self.fields = tuple(column.split(".")[-1] for column in self.columns)
+
+    @property
+    def source(self):
+        return f"{self.table} {self.join}".strip()
+
+class RelationLoader(InstrumentedLoader):
+    """
+    Generic loader engine for a `relation` definition. Batches larger than
+    `max_batch_size` keys are split by DataLoader into chunks dispatched
+    concurrently, each one a separate statement on the DB executor, which
+    keeps every IN list well under SQLite's bound-parameter limit.
+    """
+    relation = None
+    cache_name = None
+
+    def __init__(self, max_batch_size=DATALOADER_MAX_BATCH_SIZE, **kwargs):
+        super().__init__(max_batch_size=max_batch_size or None, **kwargs)
 
-class PlanetResidentsLoader(DataLoader):
     async def batch_load_fn(self, keys):
         try:
-            conn = get_db_connection()
-            try:
-                placeholders = ','.join('?' * len(keys))
-                query = f"""
-                    SELECT home_planet_id, id, name, species, home_planet_id
-                    FROM characters
-                    WHERE home_planet_id IN ({placeholders})
-                """
-                results = conn.execute(query, keys).fetchall()
-                
-                residents_by_planet = {}
-                for row in results:
-                    planet_id = str(row['home_planet_id'])
-                    if planet_id not in residents_by_planet:
-                        residents_by_planet[planet_id] = []
-                    residents_by_planet[planet_id].append({
-                        'id': row['id'],
-                        'name': row['name'],
-                        'species': row['species'],
-                        'home_planet_id': row['home_planet_id']
-                    })
-                
-                result = [residents_by_planet.get(str(k), []) for k in keys]
-                logger.debug(f"PlanetResidentsLoader: Loaded residents for {len(keys)} planets")
-                return result
-            finally:
-                conn.close()
+            return await self._load_cached(keys)
         except Exception as e:
-            logger.error(f"Error in PlanetResidentsLoader: {e}", exc_info=True)
-            return [[] for _ in keys]
+            logger.error(f"Error in {self.name}: {e}", exc_info=True)
+            return [[] for _ in keys] if self.relation.many else [None] * len(keys)
 
-class StarshipPilotsLoader(DataLoader):
-    async def batch_load_fn(self, keys):
+    def _select(self, conn, conditions, params):
+        relation = self.relation
+        columns = f"{relation.key} AS _key, {', '.join(relation.columns)}"
+        query = f"SELECT {columns} FROM {relation.source} WHERE {' AND '.join(conditions)}"
+        if relation.many:
+            query += f" ORDER BY {relation.order}"
+        return conn.execute(query, params).fetchall()
+
+    def _load(self, keys):
+        conn = get_db_connection()
         try:
-            conn = get_db_connection()
-            try:
-                placeholders = ','.join('?' * len(keys))
-                query = f"""
-                    SELECT cs.starship_id, c.id, c.name, c.species, c.home_planet_id
-                    FROM character_starships cs
-                    JOIN characters c ON cs.character_id = c.id
-                    WHERE cs.starship_id IN ({placeholders})
-                """
-                results = conn.execute(query, keys).fetchall()
-                
-                pilots_by_starship = {}
-                for row in results:
-                    starship_id = str(row['starship_id'])
-                    if starship_id not in pilots_by_starship:
-                        pilots_by_starship[starship_id] = []
-                    pilots_by_starship[starship_id].append({
-                        'id': row['id'],
-                        'name': row['name'],
-                        'species': row['species'],
-                        'home_planet_id': row['home_planet_id']
-                    })
-                
-                result = [pilots_by_starship.get(str(k), []) for k in keys]
-                logger.debug(f"StarshipPilotsLoader: Loaded pilots for {len(keys)} starships")
-                return result
-            finally:
-                conn.close()
-        except Exception as e:
-            logger.error(f"Error in StarshipPilotsLoader: {e}", exc_info=True)
-            return [[] for _ in keys]
+            placeholders = ','.join('?' * len(keys))
+            rows = self._select(conn, [f"{self.relation.key} IN ({placeholders})"], list(keys))
+            fields = self.relation.fields
+            if self.relation.many:
+                grouped = {}
+                for row in rows:
+                    grouped.setdefault(row['_key'], []).append({field: row[field] for field in fields})
+                result = [grouped.get(int(k), []) for k in keys]
+            else:
+                by_key = {row['_key']: {field: row[field] for field in fields} for row in rows}
+                result = [by_key.get(int(k)) for k in keys]
+            logger.debug(f"{self.name}: Loaded {len(rows)} rows for {len(keys)} keys")
+            return result
+        finally:
+            conn.close()
+
+class EntityLoader(RelationLoader):
+    """By-id loader for one entity table, backed by the cross-request entity cache."""
+
+    @property
+    def columns(self):
+        return self.relation.fields
+
+    def prime_row(self, row):
+        """
+        Prime with a row fetched elsewhere in the request. Only complete
+        rows are stored, reduced to the entity columns, so a later load()
+        returns exactly what the loader itself would have read.
+        """
+        if row is None or any(column not in row for column in self.columns):
+            return
+        key = self.get_cache_key(int(row['id']))
+        if key not in self._cache:
+            self.stats.primed += 1
+            self.prime(int(row['id']), {column: row[column] for column in self.columns})
+
+    async def _load_cached(self, keys):
+        return await load_cached(entity_cache[self.cache_name], keys, self._load, stats=self.stats, name=self.name)
+
+class EntityPrimer:
+    """
+    Per-request priming layer. Any loader or resolver that materializes
+    entity rows hands them here, and they are stored in the matching by-id
+    loader, so `character(id:)` after `residents` (or similar) in the same
+    request is served without another query. Runs on the event loop only.
+    """
+    def __init__(self, loaders):
+        self.loaders = loaders
+
+    def prime(self, kind, rows):
+        loader = self.loaders.get(kind)
+        if loader is None:
+            return
+        for row in rows:
+            loader.prime_row(row)
+            # Planets joined onto character rows by the list resolvers
+            if kind == 'character' and row is not None and row.get('home_planet') is not None:
+                self.prime('planet', [row['home_planet']])
+
+class RequestLoaders(dict):
+    """The loaders of one request by name, plus the primer they share."""
+    def __init__(self, primer, loaders):
+        super().__init__(loaders)
+        self.primer = primer
+
+class RelationWindowLoader(RelationLoader):
+    """
+    Base for one-to-many loaders. With `first`/`after` set, only the first
+    `first` related rows with id > `after` are returned per parent key,
+    still in a single statement per batch. Loaded rows are handed to the
+    request's primer as `member_kind` entities.
+    """
+    parent_kind = None
+    member_kind = None
+
+    def __init__(self, first=None, after=None, primer=None, **kwargs):
+        super().__init__(**kwargs)
+        self.first = first
+        self.after = after
+        self.primer = primer
+
+    async def _load_cached(self, keys):
+        def tags(key, rows):
+            return [entity_tag(self.parent_kind, key)] + [entity_tag(self.member_kind, r['id']) for r in rows]
+
+        results = await load_cached(
+            relation_cache[self.cache_name], keys, self._load,
+            cache_key=lambda k: (int(k), self.first, self.after),
+            tags=tags,
+            stats=self.stats,
+            name=self.name,
+        )
+        if self.primer is not None:
+            for rows in results:
+                self.primer.prime(self.member_kind, rows)
+        return results
+
+    def _select(self, conn, conditions, params):
+        relation = self.relation
+        conditions = list(conditions)
+        params = list(params)
+        if self.after is not None:
+            conditions.append(f"{relation.order} > ?")
+            params.append(self.after)
+        if self.first is None:
+            return super()._select(conn, conditions, params)
+
+        query = f"""
+            SELECT * FROM (
+                SELECT {relation.key} AS _key, {', '.join(relation.columns)},
+                       ROW_NUMBER() OVER (PARTITION BY {relation.key} ORDER BY {relation.order}) AS row_num
+                FROM {relation.source}
+                WHERE {' AND '.join(conditions)}
+            )
+            WHERE row_num <= ?
+            ORDER BY row_num
+        """
+        return conn.execute(query, (*params, self.first)).fetchall()
+
+PLANET_COLUMNS = ("id", "name", "climate", "terrain")
+CHARACTER_COLUMNS = ("id", "name", "species", "home_planet_id")
+STARSHIP_COLUMNS = ("id", "name", "model", "manufacturer")
+
+class PlanetLoader(EntityLoader):
+    cache_name = 'planets'
+    relation = Relation(table="planets", key="id", columns=PLANET_COLUMNS)
+
+class CharacterLoader(EntityLoader):
+    cache_name = 'characters'
+    relation = Relation(table="characters", key="id", columns=CHARACTER_COLUMNS)
+
+class StarshipLoader(EntityLoader):
+    cache_name = 'starships'
+    relation = Relation(table="starships", key="id", columns=STARSHIP_COLUMNS)
+
+class CharacterStarshipsLoader(RelationWindowLoader):
+    cache_name = 'character_starships'
+    parent_kind = 'character'
+    member_kind = 'starship'
+    relation = Relation(
+        table="character_starships cs",
+        join="JOIN starships s ON cs.starship_id = s.id",
+        key="cs.character_id",
+        columns=[f"s.{c}" for c in STARSHIP_COLUMNS],
+        many=True,
+    )
+
+class PlanetResidentsLoader(RelationWindowLoader):
+    cache_name = 'planet_residents'
+    parent_kind = 'planet'
+    member_kind = 'character'
+    relation = Relation(table="characters", key="home_planet_id", columns=CHARACTER_COLUMNS, many=True)
 
+class StarshipPilotsLoader(RelationWindowLoader):
+    cache_name = 'starship_pilots'
+    parent_kind = 'starship'
+    member_kind = 'character'
+    relation = Relation(
+        table="character_starships cs",
+        join="JOIN characters c ON cs.character_id = c.id",
+        key="cs.starship_id",
+        columns=[f"c.{c}" for c in CHARACTER_COLUMNS],
+        many=True,
+    )
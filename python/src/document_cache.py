@@ -0,0 +1,84 @@
+import threading
+import time
+from graphql import parse, validate, specified_rules
+from .cache import TTLCache, MISSING
+from .config import DOCUMENT_CACHE_SIZE
+
+SPECIFIED_RULES = frozenset(specified_rules)
+
+class DocumentCache:
+    """
+    LRU cache of parsed and spec-validated GraphQL documents, plugged into
+    Ariadne through `query_parser` and `query_validator`. Parsing is keyed
+    by query text; validation results are keyed by the parsed document, so
+    repeated operations skip lexing, parsing and the spec rules. Custom
+    rules (cost limits) depend on variables and always run.
+    """
+    def __init__(self, max_size=DOCUMENT_CACHE_SIZE):
+        self._documents = TTLCache(max_size, float("inf"), "documents")
+        self._validations = TTLCache(max_size, float("inf"), "validations")
+        self._schema = None
+        self._lock = threading.Lock()
+        self.parse_time_saved = 0.0
+        self.validation_time_saved = 0.0
+
+    def parse(self, context_value, data):
+        query = data["query"]
+        cached = self._documents.get(query)
+        if cached is not MISSING:
+            document, elapsed = cached
+            with self._lock:
+                self.parse_time_saved += elapsed
+            return document
+
+        started = time.perf_counter()
+        document = parse(query)
+        self._documents.set(query, (document, time.perf_counter() - started))
+        return document
+
+    def validate(self, schema, document, rules=None, max_errors=None, type_info=None):
+        if schema is not self._schema:
+            if self._schema is not None:
+                self.invalidate()
+            self._schema = schema
+
+        rules = specified_rules if rules is None else rules
+        spec_rules = [rule for rule in rules if rule in SPECIFIED_RULES]
+        custom_rules = [rule for rule in rules if rule not in SPECIFIED_RULES]
+
+        key = id(document)
+        cached = self._validations.get(key)
+        if cached is not MISSING and cached[0] is document:
+            _, errors, elapsed = cached
+            with self._lock:
+                self.validation_time_saved += elapsed
+        else:
+            started = time.perf_counter()
+            errors = validate(schema, document, spec_rules, max_errors=max_errors, type_info=type_info)
+            self._validations.set(key, (document, errors, time.perf_counter() - started))
+
+        if errors or not custom_rules:
+            return errors
+        return validate(schema, document, custom_rules, max_errors=max_errors, type_info=type_info)
+
+    def invalidate(self):
+        """Drop every cached document, e.g. after the executable schema was rebuilt."""
+        self._documents.clear()
+        self._validations.clear()
+
+    def stats(self):
+        documents = self._documents.stats()
+        validations = self._validations.stats()
+        return {
+            "size": documents["size"],
+            "max_size": documents["max_size"],
+            "parse_hits": documents["hits"],
+            "parse_misses": documents["misses"],
+            "validation_hits": validations["hits"],
+            "validation_misses": validations["misses"],
+            "evictions": documents["evictions"],
+            "parse_time_saved_ms": round(self.parse_time_saved * 1000, 3),
+            "validation_time_saved_ms": round(self.validation_time_saved * 1000, 3),
+        }
+
+document_cache = DocumentCache()
@@ -0,0 +1,148 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .config import DB_EXECUTOR_WORKERS, AUTH_HASH_WORKERS, AUTH_HASH_QUEUE_LIMIT
+
+# Attribution for SQL statements (see slow_query.py): the GraphQL operation
+# being executed, and the qualified name of the function doing the DB work
+current_operation = contextvars.ContextVar("current_operation", default=None)
+sql_source = contextvars.ContextVar("sql_source", default=None)
+
+_executor = None
+_executor_lock = threading.Lock()
+_workers = DB_EXECUTOR_WORKERS
+
+def get_db_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix="db")
+    return _executor
+
+def set_db_executor_workers(workers):
+    """
+    Resize the DB executor. workers=0 runs database work inline on the
+    event loop (the pre-executor behaviour, kept for benchmarking).
+    """
+    global _workers
+    shutdown_db_executor()
+    _workers = workers
+
+def shutdown_db_executor(wait=True):
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+def _run_tagged(fn, args, kwargs):
+    token = sql_source.set(getattr(fn, "__qualname__", None))
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        sql_source.reset(token)
+
+async def run_db(fn, *args, **kwargs):
+    """
+    Run blocking database work on the bounded DB thread pool, in a copy of
+    the caller's context with sql_source set to the function's name.
+    """
+    if _workers <= 0:
+        return _run_tagged(fn, args, kwargs)
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_db_executor(), context.run, _run_tagged, fn, args, kwargs)
+
+def db_bound(resolver):
+    """Turn a blocking resolver into an async one that runs on the DB executor."""
+    @functools.wraps(resolver)
+    async def wrapper(*args, **kwargs):
+        return await run_db(resolver, *args, **kwargs)
+    return wrapper
+
+class HashPoolSaturatedError(Exception):
+    pass
+
+class _Timing:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def summary(self):
+        avg = self.total / self.count if self.count else 0.0
+        return {"count": self.count, "avg_ms": round(avg * 1000, 3), "max_ms": round(self.max * 1000, 3)}
+
+_hash_executor = None
+_hash_lock = threading.Lock()
+_hash_pending = 0
+_hash_rejected = 0
+_hash_latency = _Timing()
+_hash_queue_wait = _Timing()
+
+def get_hash_executor():
+    global _hash_executor
+    if _hash_executor is None:
+        with _hash_lock:
+            if _hash_executor is None:
+                _hash_executor = ThreadPoolExecutor(max_workers=AUTH_HASH_WORKERS, thread_name_prefix="bcrypt")
+    return _hash_executor
+
+def shutdown_hash_executor(wait=True):
+    global _hash_executor
+    with _hash_lock:
+        executor, _hash_executor = _hash_executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+async def run_hash(fn, *args, **kwargs):
+    """
+    Run password hashing on the dedicated bcrypt pool. At most
+    AUTH_HASH_QUEUE_LIMIT calls may wait behind the busy workers; beyond
+    that HashPoolSaturatedError is raised immediately.
+    """
+    global _hash_pending, _hash_rejected
+    with _hash_lock:
+        if _hash_pending >= AUTH_HASH_WORKERS + AUTH_HASH_QUEUE_LIMIT:
+            _hash_rejected += 1
+            raise HashPoolSaturatedError("Password hashing pool is saturated")
+        _hash_pending += 1
+
+    submitted = time.perf_counter()
+
+    def timed():
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            finished = time.perf_counter()
+            with _hash_lock:
+                _hash_queue_wait.record(started - submitted)
+                _hash_latency.record(finished - started)
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_hash_executor(), timed)
+    finally:
+        with _hash_lock:
+            _hash_pending -= 1
+
+def get_hash_stats():
+    with _hash_lock:
+        return {
+            "workers": AUTH_HASH_WORKERS,
+            "queue_limit": AUTH_HASH_QUEUE_LIMIT,
+            "in_flight": _hash_pending,
+            "rejected": _hash_rejected,
+            "hash": _hash_latency.summary(),
+            "queue_wait": _hash_queue_wait.summary(),
+        }
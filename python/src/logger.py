@@ -3,7 +3,7 @@ import sys
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 from pythonjsonlogger import jsonlogger
-from .config import LOG_LEVEL, LOG_FILE
+from .config import LOG_LEVEL, LOG_FILE, SLOW_QUERY_LOG_FILE
 
 LOG_DIR = Path(__file__).parent.parent / "logs"
 LOG_DIR.mkdir(exist_ok=True)
@@ -46,6 +46,20 @@ logger.addHandler(console_handler)
 logger.addHandler(file_handler)
 logger.addHandler(error_file_handler)
 
+# Slow queries go to their own file only, one JSON object per statement
+slow_query_logger = logging.getLogger("starwars_api.slow_query")
+slow_query_logger.setLevel(logging.WARNING)
+slow_query_logger.propagate = False
+if slow_query_logger.handlers:
+    slow_query_logger.handlers.clear()
+slow_query_handler = RotatingFileHandler(
+    LOG_DIR / SLOW_QUERY_LOG_FILE,
+    maxBytes=10 * 1024 * 1024,
+    backupCount=5
+)
+slow_query_handler.setFormatter(jsonlogger.JsonFormatter('%(asctime)s %(name)s %(levelname)s %(message)s'))
+slow_query_logger.addHandler(slow_query_handler)
+
 def get_logger(name: str = None):
     if name:
         return logging.getLogger(f"starwars_api.{name}")
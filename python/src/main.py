@@ -1,17 +1,43 @@
+from .startup import startup_timer
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from ariadne import load_schema_from_path, make_executable_schema
 from ariadne.asgi import GraphQL
-from .database import init_db, get_db_connection
+from ariadne.asgi.handlers import GraphQLHTTPHandler
+from .database import (
+    init_db, ensure_db, get_db_connection, get_pool_stats, get_db_profile, checkpoint_wal,
+    add_sql_observer,
+)
+from .executor import (
+    run_db, run_hash, shutdown_db_executor, shutdown_hash_executor,
+    get_hash_stats, HashPoolSaturatedError,
+)
+from .cache import get_cache_stats
 from .resolvers import resolvers
-from .auth import create_access_token, verify_password, get_password_hash, get_current_user
+from .dataloaders import DataLoaderStatsExtension
+from .query_cost import cost_validation_rules, QueryCostExtension
+from .response_cache import ResponseCacheMixin
+from .document_cache import document_cache
+from .persisted_queries import PersistedQueryMixin, persisted_query_store
+from .batch import BatchRequestMixin
+from .metrics import registry as metrics_registry, MetricsMixin, metrics_extensions, observe_sql, observe_fetch
+from .slow_query import slow_query_log
+from .auth import (
+    create_access_token, verify_password, get_password_hash, needs_rehash,
+    get_current_user, get_token_stats,
+)
 from .validators import LoginInput, RegisterInput
 from .responses import (
     RootResponse, HealthResponse, LoginResponse, 
     RegisterResponse, MeResponse, ErrorResponse
 )
 from .logger import get_logger
-from .config import PORT, DEBUG
+from .config import (
+    PORT, DEBUG, FAST_STARTUP, PERSISTED_QUERIES_MANIFEST, DB_WAL_CHECKPOINT_INTERVAL, METRICS_ENABLED,
+    SLOW_QUERY_THRESHOLD_MS,
+)
+from starlette.responses import PlainTextResponse
+import asyncio
 import os
 from pathlib import Path
 
@@ -49,73 +75,101 @@ app = FastAPI(
 )
 
 schema_path = Path(__file__).parent / "schema.graphql"
-type_defs = load_schema_from_path(str(schema_path))
-schema = make_executable_schema(type_defs, resolvers)
+with startup_timer.phase("schema"):
+    type_defs = load_schema_from_path(str(schema_path))
+    schema = make_executable_schema(type_defs, resolvers)
 
 def get_context_value(request):
     return {
         "request": request,
     }
 
+class GraphQLHandler(BatchRequestMixin, MetricsMixin, PersistedQueryMixin, ResponseCacheMixin, GraphQLHTTPHandler):
+    pass
+
+if METRICS_ENABLED:
+    add_sql_observer(observe_sql, observe_fetch)
+    for _key in ("open", "idle", "in_use", "waiting"):
+        metrics_registry.gauge_callback(
+            f"db_pool_{_key}", f"Database pool connections: {_key}.", lambda key=_key: get_pool_stats()[key]
+        )
+if SLOW_QUERY_THRESHOLD_MS > 0:
+    add_sql_observer(slow_query_log.on_execute, slow_query_log.on_fetch)
+
 graphql_app = GraphQL(
     schema, 
     debug=DEBUG,
-    context_value=get_context_value
+    context_value=get_context_value,
+    query_parser=document_cache.parse,
+    query_validator=document_cache.validate,
+    validation_rules=cost_validation_rules,
+    http_handler=GraphQLHandler(extensions=[QueryCostExtension, DataLoaderStatsExtension, *metrics_extensions()]),
 )
 
 app.mount("/graphql", graphql_app)
 
+def _seed_if_empty():
+    conn = get_db_connection()
+    try:
+        if conn.execute("SELECT EXISTS (SELECT 1 FROM characters)").fetchone()[0]:
+            logger.info("Database already seeded")
+            return
+    finally:
+        conn.close()
+    
+    logger.info("Database is empty, seeding data...")
+    from .seed import seed_data
+    seed_data()
+    logger.info("Database seeded")
+
+def _ensure_admin():
+    conn = get_db_connection()
+    try:
+        if conn.execute("SELECT 1 FROM users WHERE username = ?", ("admin",)).fetchone():
+            return
+        conn.execute(
+            "INSERT INTO users (username, email, hashed_password, role) VALUES (?, ?, ?, ?)",
+            ("admin", "admin@starwars.com", get_password_hash("admin123"), "admin")
+        )
+        conn.commit()
+        logger.info("✅ Default admin user created: admin/admin123")
+    finally:
+        conn.close()
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting Star Wars GraphQL API...")
     
     try:
-        init_db()
-        logger.info("Database initialized successfully")
+        with startup_timer.phase("database"):
+            if FAST_STARTUP:
+                initialized = ensure_db()
+            else:
+                init_db()
+                initialized = True
+        logger.info("Database initialized successfully" if initialized else "Database schema is up to date")
     except Exception as e:
         logger.error(f"Error initializing database: {e}", exc_info=True)
         raise
     
     try:
-        conn = get_db_connection()
-        try:
-            count = conn.execute("SELECT COUNT(*) FROM characters").fetchone()[0]
-            if count == 0:
-                logger.info("Database is empty, seeding data...")
-                from .seed import seed_data
-                seed_data()
-                count = conn.execute("SELECT COUNT(*) FROM characters").fetchone()[0]
-                logger.info(f"Database seeded with {count} characters")
-            else:
-                logger.info(f"Database already has {count} characters")
-            
-            from .auth import get_password_hash
-            admin_check = conn.execute(
-                "SELECT id FROM users WHERE username = ?",
-                ("admin",)
-            ).fetchone()
-            
-            admin_password = get_password_hash("admin123")
-            
-            if not admin_check:
-                conn.execute(
-                    "INSERT INTO users (username, email, hashed_password, role) VALUES (?, ?, ?, ?)",
-                    ("admin", "admin@starwars.com", admin_password, "admin")
-                )
-                conn.commit()
-                logger.info("✅ Default admin user created: admin/admin123")
-            else:
-                conn.execute(
-                    "UPDATE users SET hashed_password = ? WHERE username = ?",
-                    (admin_password, "admin")
-                )
-                conn.commit()
-                logger.info("✅ Admin user password reset: admin/admin123")
-        finally:
-            conn.close()
+        with startup_timer.phase("seed"):
+            _seed_if_empty()
+        with startup_timer.phase("admin"):
+            _ensure_admin()
     except Exception as e:
         logger.error(f"Error during seeding: {e}", exc_info=True)
     
+    if PERSISTED_QUERIES_MANIFEST:
+        with startup_timer.phase("persisted_queries"):
+            persisted_query_store.load_manifest(PERSISTED_QUERIES_MANIFEST)
+    
+    if DB_WAL_CHECKPOINT_INTERVAL > 0:
+        app.state.checkpoint_task = asyncio.create_task(_checkpoint_periodically())
+    
+    startup_timer.finish()
+    logger.info(f"Startup timing: {startup_timer.report()}")
+    
     logger.info(f"API ready! Access GraphiQL at http://localhost:{PORT}/graphql")
     
     print("")
@@ -143,6 +197,39 @@ async def startup_event():
     print("═══════════════════════════════════════════════════════════")
     print("")
 
+async def _checkpoint_periodically():
+    while True:
+        await asyncio.sleep(DB_WAL_CHECKPOINT_INTERVAL)
+        try:
+            result = await run_db(checkpoint_wal)
+            logger.debug(f"WAL checkpoint: {result}")
+        except Exception as e:
+            logger.warning(f"WAL checkpoint failed: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    checkpoint_task = getattr(app.state, "checkpoint_task", None)
+    if checkpoint_task is not None:
+        checkpoint_task.cancel()
+    shutdown_db_executor()
+    shutdown_hash_executor()
+
+def _hashing_unavailable():
+    logger.warning("Password hashing pool saturated, rejecting request")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+def _check_database():
+    conn = get_db_connection()
+    try:
+        conn.execute("SELECT 1").fetchone()
+        return "connected"
+    finally:
+        conn.close()
+
 @app.get(
     "/",
     response_model=RootResponse,
@@ -177,22 +264,40 @@ async def root():
     description="Endpoint untuk mengecek status kesehatan API dan koneksi database."
 )
 async def health():
+    sqlite_profile = None
     try:
-        conn = get_db_connection()
-        try:
-            conn.execute("SELECT 1").fetchone()
-            db_status = "connected"
-        finally:
-            conn.close()
+        db_status = await run_db(_check_database)
+        sqlite_profile = await run_db(get_db_profile)
     except Exception as e:
         db_status = f"disconnected: {str(e)}"
     
     return {
         "status": "healthy" if db_status == "connected" else "unhealthy",
         "database": db_status,
+        "pool": get_pool_stats(),
+        "sqlite": sqlite_profile,
+        "auth": get_hash_stats(),
+        "startup": startup_timer.report(),
+        "cache": {
+            **get_cache_stats(),
+            "documents": document_cache.stats(),
+            "tokens": get_token_stats(),
+            "persisted_queries": persisted_query_store.stats(),
+        },
+        "slow_queries": slow_query_log.stats(),
         "version": "2.0.0"
     }
 
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    tags=["health"],
+    summary="Prometheus metrics",
+    description="Metrik request GraphQL, resolver, statement SQL dan pool dalam format teks Prometheus."
+)
+async def metrics():
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.post(
     "/auth/register",
     response_model=RegisterResponse,
@@ -204,41 +309,92 @@ async def health():
 async def register(input_data: RegisterInput):
     logger.info(f"Registration attempt for username: {input_data.username}")
     
-    conn = get_db_connection()
     try:
-        existing = conn.execute(
-            "SELECT id FROM users WHERE username = ? OR email = ?",
-            (input_data.username, input_data.email)
-        ).fetchone()
-        
-        if existing:
+        if await run_db(_find_existing_user, input_data.username, input_data.email):
             logger.warning(f"Registration failed: User already exists")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username or email already exists"
             )
         
-        hashed_password = get_password_hash(input_data.password)
-        conn.execute(
-            "INSERT INTO users (username, email, hashed_password, role) VALUES (?, ?, ?, ?)",
-            (input_data.username, input_data.email, hashed_password, input_data.role)
-        )
-        conn.commit()
+        hashed_password = await run_hash(get_password_hash, input_data.password)
+        await run_db(_insert_user, input_data.username, input_data.email, hashed_password, input_data.role)
         
         logger.info(f"User registered successfully: {input_data.username}")
         return {"message": "User registered successfully", "username": input_data.username}
     except HTTPException:
         raise
+    except HashPoolSaturatedError:
+        raise _hashing_unavailable()
     except Exception as e:
         logger.error(f"Error registering user: {e}", exc_info=True)
-        conn.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error registering user"
         )
+
+# Connections are only held around the queries, never while waiting on bcrypt.
+# All of these block (the INSERT/UPDATE commits may wait on the write lock), so
+# the handlers run them on the DB executor through run_db.
+def _find_existing_user(username, email):
+    conn = get_db_connection()
+    try:
+        return conn.execute(
+            "SELECT id FROM users WHERE username = ? OR email = ?",
+            (username, email)
+        ).fetchone()
     finally:
         conn.close()
 
+def _insert_user(username, email, hashed_password, role):
+    conn = get_db_connection()
+    try:
+        conn.execute(
+            "INSERT INTO users (username, email, hashed_password, role) VALUES (?, ?, ?, ?)",
+            (username, email, hashed_password, role)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+def _find_login_user(username):
+    conn = get_db_connection()
+    try:
+        return conn.execute(
+            "SELECT id, username, email, hashed_password, role FROM users WHERE username = ?",
+            (username,)
+        ).fetchone()
+    finally:
+        conn.close()
+
+def _update_password_hash(user_id, hashed_password):
+    conn = get_db_connection()
+    try:
+        conn.execute("UPDATE users SET hashed_password = ? WHERE id = ?", (hashed_password, user_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+_background_tasks = set()
+
+async def _rehash_password(user_id, password):
+    """Upgrade a hash made with an old BCRYPT_ROUNDS; best effort, retried on next login."""
+    try:
+        hashed_password = await run_hash(get_password_hash, password)
+        await run_db(_update_password_hash, user_id, hashed_password)
+    except HashPoolSaturatedError:
+        return
+    except Exception as e:
+        logger.warning(f"Password rehash failed for user id {user_id}: {e}")
+        return
+    logger.info(f"Password rehashed with updated cost factor for user id {user_id}")
+
+def _schedule_rehash(user_id, password):
+    # Runs after the response; the event loop only keeps weak references to tasks
+    task = asyncio.create_task(_rehash_password(user_id, password))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
 @app.post(
     "/auth/login",
     response_model=LoginResponse,
@@ -249,14 +405,10 @@ async def register(input_data: RegisterInput):
 async def login(input_data: LoginInput):
     logger.info(f"Login attempt for username: {input_data.username}")
     
-    conn = get_db_connection()
     try:
-        user = conn.execute(
-            "SELECT id, username, email, hashed_password, role FROM users WHERE username = ?",
-            (input_data.username,)
-        ).fetchone()
+        user = await run_db(_find_login_user, input_data.username)
         
-        if not user or not verify_password(input_data.password, user["hashed_password"]):
+        if not user or not await run_hash(verify_password, input_data.password, user["hashed_password"]):
             logger.warning(f"Login failed: Invalid credentials for {input_data.username}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -264,6 +416,9 @@ async def login(input_data: LoginInput):
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
+        if needs_rehash(user["hashed_password"]):
+            _schedule_rehash(user["id"], input_data.password)
+        
         access_token = create_access_token(
             data={"sub": user["username"], "role": user["role"], "id": user["id"]}
         )
@@ -281,14 +436,14 @@ async def login(input_data: LoginInput):
         }
     except HTTPException:
         raise
+    except HashPoolSaturatedError:
+        raise _hashing_unavailable()
     except Exception as e:
         logger.error(f"Error during login: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error during login"
         )
-    finally:
-        conn.close()
 
 @app.get(
     "/auth/me",
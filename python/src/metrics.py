@@ -0,0 +1,286 @@
+import random
+import re
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from ariadne.resolvers import is_default_resolver
+from ariadne.types import Extension
+from graphql.pyutils import is_awaitable
+from .config import METRICS_ENABLED, METRICS_RESOLVER_SAMPLE_RATE, METRICS_MAX_SERIES
+from .executor import current_operation
+
+# Upper bounds in seconds; resolvers and SQL statements are mostly sub-millisecond
+DURATION_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+OVERFLOW_LABEL = "other"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """
+    Aggregated metric family. Label sets beyond max_series are folded into
+    a single "other" series so client-controlled labels (operation names,
+    SQL shapes) cannot grow memory without bound.
+    """
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), max_series=METRICS_MAX_SERIES):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if labels in self._series or len(self._series) < self.max_series:
+            return labels
+        return (OVERFLOW_LABEL,) * len(self.labelnames)
+
+    def _labels(self, labels, extra=()):
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+        pairs.extend(f'{name}="{value}"' for name, value in extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = [(labels, self._snapshot(value)) for labels, value in self._series.items()]
+        for labels, value in series:
+            lines.extend(self._render_series(labels, value))
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, labels=()):
+        with self._lock:
+            return self._series.get(labels, 0)
+
+    def _snapshot(self, value):
+        return value
+
+    def _render_series(self, labels, value):
+        return [f"{self.name}{self._labels(labels)} {_format_value(value)}"]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS, **kwargs):
+        super().__init__(name, documentation, labelnames, **kwargs)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            key = self._key(labels)
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, labels=()):
+        with self._lock:
+            series = self._series.get(labels)
+            return series[2] if series else 0
+
+    def _snapshot(self, value):
+        return list(value[0]), value[1], value[2]
+
+    def _render_series(self, labels, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f"{self.name}_bucket{self._labels(labels, [('le', _format_value(bound))])} {cumulative}")
+        lines.append(f"{self.name}_sum{self._labels(labels)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{self._labels(labels)} {count}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._gauges = []
+
+    def counter(self, *args, **kwargs):
+        metric = Counter(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs):
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge_callback(self, name, documentation, collect):
+        """Register a gauge read at scrape time; `collect()` returns a number."""
+        self._gauges.append((name, documentation, collect))
+
+    def clear(self):
+        for metric in self._metrics:
+            metric.clear()
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for name, documentation, collect in self._gauges:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(collect())}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+graphql_requests = registry.counter(
+    "graphql_requests_total", "GraphQL operations executed, by operation name and status.",
+    ("operation", "status"),
+)
+graphql_request_duration = registry.histogram(
+    "graphql_request_duration_seconds", "Time spent executing a GraphQL operation.", ("operation",),
+)
+graphql_serialization_duration = registry.histogram(
+    "graphql_response_serialization_seconds", "Time spent serializing GraphQL results to JSON.",
+)
+resolver_duration = registry.histogram(
+    "graphql_resolver_duration_seconds", "Time spent in custom field resolvers (sampled).", ("type", "field"),
+)
+sql_duration = registry.histogram(
+    "sql_statement_duration_seconds", "Time spent executing SQL statements, by normalized statement.",
+    ("statement",),
+)
+sql_rows = registry.counter(
+    "sql_rows_returned_total", "Rows fetched from SQL statements, by normalized statement.", ("statement",),
+)
+sql_fetch_seconds = registry.counter(
+    "sql_fetch_seconds_total", "Time spent fetching rows after execution, by normalized statement.",
+    ("statement",),
+)
+
+dataloader_batch_size = registry.histogram(
+    "dataloader_batch_size", "Keys per DataLoader batch.", ("loader",),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+dataloader_batch_sql_duration = registry.histogram(
+    "dataloader_batch_sql_seconds", "Time spent in the SQL query of a DataLoader batch.", ("loader",),
+)
+dataloader_keys = registry.counter(
+    "dataloader_keys_total",
+    "DataLoader keys by where they were served from: memo (deduplicated within the request), "
+    "cache (cross-request entity cache) or database.",
+    ("loader", "source"),
+)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql):
+    """Collapse literals, placeholder lists and whitespace so one query shape is one label."""
+    shape = _WHITESPACE.sub(" ", sql).strip()
+    shape = _LITERALS.sub("?", shape)
+    return _PLACEHOLDER_LISTS.sub("(?, ...)", shape)
+
+def observe_sql(cursor, sql, seconds):
+    sql_duration.observe((normalize_sql(sql),), seconds)
+
+def observe_fetch(cursor, sql, rows, seconds):
+    statement = (normalize_sql(sql),)
+    sql_rows.inc(statement, rows)
+    sql_fetch_seconds.inc(statement, seconds)
+
+_OPERATION_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,63}$")
+
+def operation_label(data):
+    name = data.get("operationName") if isinstance(data, dict) else None
+    if not name:
+        return "anonymous"
+    return name if isinstance(name, str) and _OPERATION_NAME.match(name) else "invalid"
+
+@lru_cache(maxsize=None)
+def _is_traced(parent_type, field_name):
+    field = parent_type.fields.get(field_name)
+    if field is None or parent_type.name.startswith("__"):
+        return False
+    return not is_default_resolver(field.resolve)
+
+class MetricsExtension(Extension):
+    """
+    Records resolver durations for fields with a custom resolver. Default
+    attribute resolvers are skipped, and only METRICS_RESOLVER_SAMPLE_RATE
+    of requests are timed at all, to keep the per-field cost negligible.
+    """
+    def request_started(self, context):
+        self.sampled = random.random() < METRICS_RESOLVER_SAMPLE_RATE
+
+    def resolve(self, next_, obj, info, **kwargs):
+        if not self.sampled or not _is_traced(info.parent_type, info.field_name):
+            return next_(obj, info, **kwargs)
+
+        labels = (info.parent_type.name, info.field_name)
+        started = time.perf_counter()
+        result = next_(obj, info, **kwargs)
+        if not is_awaitable(result):
+            resolver_duration.observe(labels, time.perf_counter() - started)
+            return result
+
+        async def timed():
+            try:
+                return await result
+            finally:
+                resolver_duration.observe(labels, time.perf_counter() - started)
+        return timed()
+
+class MetricsMixin:
+    """
+    GraphQLHTTPHandler mixin recording operation counts and durations by
+    operation name and status, and time spent serializing the response.
+    Placed after BatchRequestMixin, each operation in a batch is counted.
+    """
+    async def execute_graphql_query(self, request, data, *, context_value=None, query_document=None):
+        # Attribute SQL run by this operation (slow-query log) even with metrics off
+        current_operation.set(operation_label(data))
+        if not METRICS_ENABLED:
+            return await super().execute_graphql_query(
+                request, data, context_value=context_value, query_document=query_document
+            )
+        started = time.perf_counter()
+        success, result = await super().execute_graphql_query(
+            request, data, context_value=context_value, query_document=query_document
+        )
+        operation = operation_label(data)
+        graphql_request_duration.observe((operation,), time.perf_counter() - started)
+        graphql_requests.inc((operation, "success" if success else "error"))
+        return success, result
+
+    async def create_json_response(self, request, result, success):
+        if not METRICS_ENABLED:
+            return await super().create_json_response(request, result, success)
+        started = time.perf_counter()
+        response = await super().create_json_response(request, result, success)
+        graphql_serialization_duration.observe((), time.perf_counter() - started)
+        return response
+
+def metrics_extensions():
+    return [MetricsExtension] if METRICS_ENABLED else []
@@ -0,0 +1,98 @@
+import base64
+from .config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+CURSOR_PREFIX = "cursor:"
+
+def encode_cursor(row_id):
+    return base64.b64encode(f"{CURSOR_PREFIX}{row_id}".encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor):
+    try:
+        decoded = base64.b64decode(cursor.encode("ascii"), validate=True).decode("utf-8")
+        if not decoded.startswith(CURSOR_PREFIX):
+            raise ValueError(cursor)
+        return int(decoded[len(CURSOR_PREFIX):])
+    except (ValueError, UnicodeError):
+        raise Exception(f"Cursor tidak valid: {cursor}")
+
+def page_size(first=None, last=None):
+    if first is not None and last is not None:
+        raise Exception("Gunakan 'first' atau 'last', tidak keduanya.")
+    size = first if first is not None else last
+    if size is None:
+        return DEFAULT_PAGE_SIZE
+    if size < 0:
+        raise Exception("'first' dan 'last' tidak boleh negatif.")
+    if size > MAX_PAGE_SIZE:
+        raise Exception(f"Maksimal {MAX_PAGE_SIZE} item per halaman.")
+    return size
+
+def relation_window(first=None, after=None):
+    """
+    Validate `first`/`after` on nested list fields. `after` is the id of
+    the last related item already received. Returns (None, None) when the
+    field should return every related row.
+    """
+    if first is None and after is None:
+        return None, None
+    limit = page_size(first)
+    try:
+        after_id = int(after) if after is not None else None
+    except (TypeError, ValueError):
+        raise Exception(f"'after' harus berupa ID: {after}")
+    return limit, after_id
+
+def paginate(conn, table, columns, first=None, after=None, last=None, before=None, join=""):
+    """
+    Keyset pagination over the integer primary key.
+    Each page is a single index range scan: `id > after AND id < before`
+    ordered by id, fetching one extra row to detect whether more exist.
+    `join` is appended after the table (e.g. a LEFT JOIN for a to-one
+    relation); columns must then be qualified with their table name.
+    Returns a connection dict; totalCount is resolved lazily from `table`.
+    """
+    limit = page_size(first, last)
+    after_id = decode_cursor(after) if after else None
+    before_id = decode_cursor(before) if before else None
+    backward = last is not None
+
+    conditions, params = [], []
+    if after_id is not None:
+        conditions.append(f"{table}.id > ?")
+        params.append(after_id)
+    if before_id is not None:
+        conditions.append(f"{table}.id < ?")
+        params.append(before_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    order = "DESC" if backward else "ASC"
+    rows = conn.execute(
+        f"SELECT {columns} FROM {table} {join} {where} ORDER BY {table}.id {order} LIMIT ?",
+        (*params, limit + 1),
+    ).fetchall()
+
+    has_more = len(rows) > limit
+    rows = [dict(r) for r in rows[:limit]]
+    if backward:
+        rows.reverse()
+
+    def exists(condition, value):
+        return conn.execute(f"SELECT 1 FROM {table} WHERE {condition} LIMIT 1", (value,)).fetchone() is not None
+
+    if backward:
+        has_previous_page = has_more
+        has_next_page = before_id is not None and exists("id >= ?", before_id)
+    else:
+        has_next_page = has_more
+        has_previous_page = after_id is not None and exists("id <= ?", after_id)
+
+    edges = [{"cursor": encode_cursor(r["id"]), "node": r} for r in rows]
+    return {
+        "table": table,
+        "edges": edges,
+        "pageInfo": {
+            "hasNextPage": has_next_page,
+            "hasPreviousPage": has_previous_page,
+            "startCursor": edges[0]["cursor"] if edges else None,
+            "endCursor": edges[-1]["cursor"] if edges else None,
+        },
+    }
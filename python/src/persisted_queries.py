@@ -0,0 +1,128 @@
+import hashlib
+import json
+import logging
+import threading
+from .cache import TTLCache, MISSING
+from .config import PERSISTED_QUERIES_MAX_SIZE, PERSISTED_QUERIES_STRICT
+
+logger = logging.getLogger("starwars_api.persisted_queries")
+
+NOT_FOUND = "PERSISTED_QUERY_NOT_FOUND"
+NOT_REGISTERED = "PERSISTED_QUERY_NOT_REGISTERED"
+HASH_MISMATCH = "PERSISTED_QUERY_HASH_MISMATCH"
+UNSUPPORTED_VERSION = "PERSISTED_QUERY_UNSUPPORTED_VERSION"
+
+class PersistedQueryError(Exception):
+    def __init__(self, message, code, status_ok=False):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.status_ok = status_ok
+
+def query_hash(query):
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+class PersistedQueryStore:
+    """
+    Server-side store for automatic persisted queries.
+    Manifest entries are pinned; hashes registered by clients live in a
+    bounded LRU. In strict mode only manifest hashes are accepted.
+    """
+    def __init__(self, max_size=PERSISTED_QUERIES_MAX_SIZE, strict=PERSISTED_QUERIES_STRICT):
+        self.strict = strict
+        self._manifest = {}
+        self._registered = TTLCache(max_size, float("inf"), "persisted_queries")
+        self._lock = threading.Lock()
+
+    def load_manifest(self, path):
+        """
+        Load pre-registered queries. Accepts a plain {"<sha256>": "<query>"}
+        object or an Apollo persisted-query manifest with an `operations` list.
+        """
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if isinstance(manifest, dict) and "operations" in manifest:
+            entries = {op["id"]: op["body"] for op in manifest["operations"]}
+        else:
+            entries = dict(manifest)
+
+        for sha, query in entries.items():
+            if query_hash(query) != sha:
+                raise ValueError(f"Manifest hash {sha} does not match its query")
+        with self._lock:
+            self._manifest.update(entries)
+        logger.info(f"Loaded {len(entries)} persisted queries from {path}")
+        return len(entries)
+
+    def get(self, sha):
+        with self._lock:
+            query = self._manifest.get(sha)
+        if query is not None:
+            return query
+        if self.strict:
+            return None
+        query = self._registered.get(sha)
+        return None if query is MISSING else query
+
+    def register(self, sha, query):
+        self._registered.set(sha, query)
+
+    def stats(self):
+        stats = self._registered.stats()
+        stats["manifest"] = len(self._manifest)
+        stats["strict"] = self.strict
+        return stats
+
+    def resolve(self, data):
+        """
+        Return request data with `query` filled in from the store, following
+        the persisted-query handshake. Raises PersistedQueryError otherwise.
+        """
+        extensions = data.get("extensions") or {}
+        persisted = extensions.get("persistedQuery") if isinstance(extensions, dict) else None
+        query = data.get("query")
+
+        if not isinstance(persisted, dict):
+            if self.strict and isinstance(query, str) and self.get(query_hash(query)) is None:
+                raise PersistedQueryError("Query tidak terdaftar di persisted query manifest.", NOT_REGISTERED)
+            return data
+
+        if persisted.get("version", 1) != 1:
+            raise PersistedQueryError("Versi persisted query tidak didukung.", UNSUPPORTED_VERSION)
+        sha = persisted.get("sha256Hash")
+        if not isinstance(sha, str):
+            raise PersistedQueryError("persistedQuery.sha256Hash wajib diisi.", NOT_FOUND)
+
+        if isinstance(query, str):
+            if query_hash(query) != sha:
+                raise PersistedQueryError("sha256Hash tidak cocok dengan query.", HASH_MISMATCH)
+            if self.strict:
+                if self.get(sha) is None:
+                    raise PersistedQueryError("Query tidak terdaftar di persisted query manifest.", NOT_REGISTERED)
+            else:
+                self.register(sha, query)
+            return data
+
+        stored = self.get(sha)
+        if stored is None:
+            if self.strict:
+                raise PersistedQueryError("Query tidak terdaftar di persisted query manifest.", NOT_REGISTERED)
+            raise PersistedQueryError("PersistedQueryNotFound", NOT_FOUND, status_ok=True)
+        return {**data, "query": stored}
+
+persisted_query_store = PersistedQueryStore()
+
+class PersistedQueryMixin:
+    """GraphQLHTTPHandler mixin implementing the `persistedQuery` request extension."""
+    persisted_query_store = persisted_query_store
+
+    async def execute_graphql_query(self, request, data, *, context_value=None, query_document=None):
+        if isinstance(data, dict):
+            try:
+                data = self.persisted_query_store.resolve(data)
+            except PersistedQueryError as error:
+                result = {"errors": [{"message": error.message, "extensions": {"code": error.code}}]}
+                return error.status_ok, result
+        return await super().execute_graphql_query(
+            request, data, context_value=context_value, query_document=query_document
+        )
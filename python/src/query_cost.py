@@ -0,0 +1,133 @@
+import logging
+from graphql import (
+    GraphQLError, OperationDefinitionNode, FragmentDefinitionNode, ValidationRule,
+    get_named_type, get_nullable_type, is_list_type, is_leaf_type,
+)
+from graphql.language.visitor import BREAK
+from graphql.utilities import value_from_ast_untyped
+from ariadne.types import Extension
+from .selection import collect_fields
+from .config import (
+    QUERY_MAX_DEPTH, QUERY_MAX_COST, QUERY_DEFAULT_LIST_SIZE,
+    QUERY_FIELD_WEIGHTS, QUERY_LIST_SIZES, DEFAULT_PAGE_SIZE
+)
+
+logger = logging.getLogger("starwars_api.query_cost")
+
+PAGINATION_ARGS = ("first", "last")
+
+class QueryCostRule(ValidationRule):
+    """
+    Static cost analysis of the executed operation.
+
+    Every field costs its weight (`Type.field` in QUERY_FIELD_WEIGHTS,
+    otherwise 1 for object fields and 0 for scalars) times the number of
+    parent objects it is resolved for. List fields multiply the cost of
+    their selections by `first`/`last` when given, or by an estimate
+    (QUERY_LIST_SIZES, QUERY_DEFAULT_LIST_SIZE) when unbounded.
+    """
+    context_value = None
+    variables = None
+    operation_name = None
+    max_depth = QUERY_MAX_DEPTH
+    max_cost = QUERY_MAX_COST
+
+    def enter_document(self, node, *_):
+        self.fragments = {
+            d.name.value: d for d in node.definitions if isinstance(d, FragmentDefinitionNode)
+        }
+        operations = [d for d in node.definitions if isinstance(d, OperationDefinitionNode)]
+        if self.operation_name:
+            operations = [op for op in operations if op.name and op.name.value == self.operation_name]
+        elif len(operations) > 1:
+            return BREAK
+
+        for operation in operations:
+            root_type = self.context.schema.get_root_type(operation.operation)
+            if root_type is None:
+                continue
+            cost, depth = self._analyze(operation.selection_set, root_type, 1, 1, frozenset())
+            self._report(cost, depth)
+        return BREAK
+
+    def _report(self, cost, depth):
+        if isinstance(self.context_value, dict):
+            self.context_value["query_cost"] = {
+                "cost": cost,
+                "depth": depth,
+                "maxCost": self.max_cost,
+                "maxDepth": self.max_depth,
+            }
+        if depth > self.max_depth:
+            logger.warning(f"Rejected operation: depth {depth} exceeds {self.max_depth}")
+            self.report_error(GraphQLError(
+                f"Query terlalu dalam: kedalaman {depth} melebihi batas {self.max_depth}."
+            ))
+        if cost > self.max_cost:
+            logger.warning(f"Rejected operation: cost {cost} exceeds {self.max_cost}")
+            self.report_error(GraphQLError(
+                f"Query terlalu mahal: biaya {cost} melebihi batas {self.max_cost}."
+            ))
+
+    def _analyze(self, selection_set, parent_type, multiplier, depth, fragments_seen):
+        cost, max_depth = 0, depth - 1
+        for selection, field_parent, seen in collect_fields(
+            [selection_set], self.fragments, self.context.schema, parent_type, fragments_seen
+        ):
+            name = selection.name.value
+            field_def = getattr(field_parent, "fields", {}).get(name)
+            if field_def is None or name.startswith("__"):
+                continue
+            cost += multiplier * self._weight(field_parent, name, field_def)
+            child_depth = depth
+            if selection.selection_set:
+                size = self._list_size(selection, field_parent, field_def)
+                child_cost, child_depth = self._analyze(
+                    selection.selection_set, get_named_type(field_def.type),
+                    multiplier * size, depth + 1, seen,
+                )
+                cost += child_cost
+            max_depth = max(max_depth, child_depth)
+        return cost, max_depth
+
+    def _weight(self, parent_type, name, field_def):
+        key = f"{parent_type.name}.{name}"
+        if key in QUERY_FIELD_WEIGHTS:
+            return QUERY_FIELD_WEIGHTS[key]
+        return 0 if is_leaf_type(get_named_type(field_def.type)) else 1
+
+    def _list_size(self, field_node, parent_type, field_def):
+        for argument in field_node.arguments:
+            if argument.name.value in PAGINATION_ARGS:
+                value = value_from_ast_untyped(argument.value, self.variables)
+                if isinstance(value, int):
+                    return max(value, 0)
+
+        is_list = is_list_type(get_nullable_type(field_def.type))
+        if not is_list:
+            paginated = any(arg in field_def.args for arg in PAGINATION_ARGS)
+            return DEFAULT_PAGE_SIZE if paginated else 1
+        if parent_type.name.endswith("Connection") and field_node.name.value == "edges":
+            return 1
+        return QUERY_LIST_SIZES.get(f"{parent_type.name}.{field_node.name.value}", QUERY_DEFAULT_LIST_SIZE)
+
+def query_cost_rule(context_value=None, variables=None, operation_name=None,
+                    max_depth=QUERY_MAX_DEPTH, max_cost=QUERY_MAX_COST):
+    class _QueryCostRule(QueryCostRule):
+        pass
+
+    _QueryCostRule.context_value = context_value
+    _QueryCostRule.variables = variables
+    _QueryCostRule.operation_name = operation_name
+    _QueryCostRule.max_depth = max_depth
+    _QueryCostRule.max_cost = max_cost
+    return _QueryCostRule
+
+def cost_validation_rules(context_value, document, data):
+    return [query_cost_rule(context_value, data.get("variables"), data.get("operationName"))]
+
+class QueryCostExtension(Extension):
+    def format(self, context):
+        if isinstance(context, dict) and "query_cost" in context:
+            return {"cost": context["query_cost"]}
+        return None
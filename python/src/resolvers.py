@@ -1,5 +1,10 @@
 from ariadne import QueryType, MutationType, ObjectType
 from .database import get_db_connection
+from .executor import db_bound
+from .pagination import paginate, relation_window
+from .selection import selected_fields, project
+from .config import BULK_MUTATION_MAX_ITEMS
+from .cache import invalidate_entity, invalidate_relations, invalidate_tables
 from .auth import require_auth, require_admin, get_user_from_context
 from .validators import (
     CreatePlanetInput, UpdatePlanetInput,
@@ -8,14 +13,28 @@ from .validators import (
     AssignStarshipInput
 )
 from .dataloaders import (
-    PlanetLoader, CharacterLoader, StarshipLoader,
+    PlanetLoader, CharacterLoader, StarshipLoader, EntityPrimer, RequestLoaders,
     CharacterStarshipsLoader, PlanetResidentsLoader, StarshipPilotsLoader
 )
+import functools
+import json
 import logging
 import sqlite3
 
 logger = logging.getLogger("starwars_api.resolvers")
 
+def create_dataloaders():
+    planets, characters, starships = PlanetLoader(), CharacterLoader(), StarshipLoader()
+    primer = EntityPrimer({'planet': planets, 'character': characters, 'starship': starships})
+    return RequestLoaders(primer, {
+        'planets': planets,
+        'characters': characters,
+        'starships': starships,
+        'character_starships': CharacterStarshipsLoader(primer=primer),
+        'planet_residents': PlanetResidentsLoader(primer=primer),
+        'starship_pilots': StarshipPilotsLoader(primer=primer),
+    })
+
 def get_dataloaders(info):
 
 
@@ -23,29 +42,92 @@ def get_dataloaders(info):
         info.context = {}
     
     if 'dataloaders' not in info.context:
-        info.context['dataloaders'] = {
-            'planets': PlanetLoader(),
-            'characters': CharacterLoader(),
-            'starships': StarshipLoader(),
-            'character_starships': CharacterStarshipsLoader(),
-            'planet_residents': PlanetResidentsLoader(),
-            'starship_pilots': StarshipPilotsLoader(),
-        }
+        info.context['dataloaders'] = create_dataloaders()
     return info.context['dataloaders']
 
+RELATION_LOADERS = {
+    'character_starships': CharacterStarshipsLoader,
+    'planet_residents': PlanetResidentsLoader,
+    'starship_pilots': StarshipPilotsLoader,
+}
+
+def get_relation_loader(info, name, first=None, after=None):
+    """
+    Loader for a nested list field. Each distinct (first, after) window
+    gets its own loader so all parents requesting the same page are
+    batched into one windowed query.
+    """
+    dataloaders = get_dataloaders(info)
+    if first is None and after is None:
+        return dataloaders[name]
+    key = (name, first, after)
+    if key not in dataloaders:
+        dataloaders[key] = RELATION_LOADERS[name](first=first, after=after, primer=dataloaders.primer)
+    return dataloaders[key]
+
+def primes(kind):
+    """
+    Prime the request's by-id loader with the rows a root list resolver
+    returns (a list, or a connection's edge nodes). Applied outside
+    @db_bound so priming happens on the event loop.
+    """
+    def decorate(resolver):
+        @functools.wraps(resolver)
+        async def wrapper(obj, info, **kwargs):
+            result = await resolver(obj, info, **kwargs)
+            rows = [edge["node"] for edge in result["edges"]] if isinstance(result, dict) else result
+            get_dataloaders(info).primer.prime(kind, rows)
+            return result
+        return wrapper
+    return decorate
+
 query = QueryType()
 mutation = MutationType()
 character_type = ObjectType("Character")
 planet_type = ObjectType("Planet")
 starship_type = ObjectType("Starship")
+character_connection_type = ObjectType("CharacterConnection")
+planet_connection_type = ObjectType("PlanetConnection")
+starship_connection_type = ObjectType("StarshipConnection")
+
+CHARACTER_COLUMNS = {"name": "name", "species": "species", "homePlanet": "home_planet_id"}
+PLANET_COLUMNS = {"name": "name", "climate": "climate", "terrain": "terrain"}
+STARSHIP_COLUMNS = {"name": "name", "model": "model", "manufacturer": "manufacturer"}
+
+HOME_PLANET_PREFIX = "home_planet__"
+HOME_PLANET_JOIN = "LEFT JOIN planets ON planets.id = characters.home_planet_id"
+HOME_PLANET_COLUMNS = ", ".join(f"planets.{c} AS {HOME_PLANET_PREFIX}{c}" for c in ("id", "name", "climate", "terrain"))
+
+def character_query(info, *path):
+    """
+    Columns and join for a root character list. Only the selected columns
+    are read; when `homePlanet` is selected the planet comes from a LEFT
+    JOIN in the same statement instead of a PlanetLoader batch. The joined
+    planet is read in full so it can prime the per-request loader.
+    """
+    selected = selected_fields(info, *path)
+    columns = ", ".join(f"characters.{c}" for c in project(selected, CHARACTER_COLUMNS))
+    if selected is None or "homePlanet" not in selected:
+        return columns, ""
+    return f"{columns}, {HOME_PLANET_COLUMNS}", HOME_PLANET_JOIN
+
+def attach_home_planet(row):
+    """Move joined planet columns into row['home_planet'] (None when the planet is missing)."""
+    planet = {key[len(HOME_PLANET_PREFIX):]: row.pop(key) for key in list(row) if key.startswith(HOME_PLANET_PREFIX)}
+    if planet:
+        row["home_planet"] = planet if planet["id"] is not None else None
+    return row
 
 @query.field("allCharacters")
+@primes("character")
+@db_bound
 def resolve_all_characters(_, info):
     logger.info("Fetching all characters")
+    columns, join = character_query(info)
     conn = get_db_connection()
     try:
-        characters = conn.execute("SELECT id, name, species, home_planet_id FROM characters").fetchall()
-        result = [dict(char) for char in characters]
+        characters = conn.execute(f"SELECT {columns} FROM characters {join}").fetchall()
+        result = [attach_home_planet(dict(char)) for char in characters]
         logger.info(f"Retrieved {len(result)} characters")
         return result
     except Exception as e:
@@ -54,25 +136,42 @@ def resolve_all_characters(_, info):
     finally:
         conn.close()
 
-@query.field("character")
-def resolve_character(_, info, id):
-    logger.debug(f"Fetching character with ID: {id}")
+@query.field("characters")
+@primes("character")
+@db_bound
+def resolve_characters_connection(_, info, first=None, after=None, last=None, before=None):
+    logger.debug(f"Fetching characters page: first={first} after={after} last={last} before={before}")
+    columns, join = character_query(info, "edges", "node")
     conn = get_db_connection()
     try:
-        character = conn.execute("SELECT id, name, species, home_planet_id FROM characters WHERE id = ?", (id,)).fetchone()
-        return dict(character) if character else None
+        page = paginate(conn, "characters", columns, first=first, after=after, last=last, before=before, join=join)
+        for edge in page["edges"]:
+            attach_home_planet(edge["node"])
+        return page
     except Exception as e:
-        logger.error(f"Error fetching character {id}: {e}", exc_info=True)
+        logger.error(f"Error fetching characters page: {e}", exc_info=True)
         raise
     finally:
         conn.close()
 
+@query.field("character")
+async def resolve_character(_, info, id):
+    logger.debug(f"Fetching character with ID: {id}")
+    try:
+        character_id = int(id)
+    except (TypeError, ValueError):
+        return None
+    return await get_dataloaders(info)['characters'].load(character_id)
+
 @query.field("allPlanets")
+@primes("planet")
+@db_bound
 def resolve_all_planets(_, info):
     logger.info("Fetching all planets")
     conn = get_db_connection()
     try:
-        planets = conn.execute("SELECT id, name, climate, terrain FROM planets").fetchall()
+        columns = ", ".join(project(selected_fields(info), PLANET_COLUMNS))
+        planets = conn.execute(f"SELECT {columns} FROM planets").fetchall()
         return [dict(p) for p in planets]
     except Exception as e:
         logger.error(f"Error fetching all planets: {e}", exc_info=True)
@@ -80,25 +179,39 @@ def resolve_all_planets(_, info):
     finally:
         conn.close()
 
-@query.field("planet")
-def resolve_planet(_, info, id):
-    logger.debug(f"Fetching planet with ID: {id}")
+@query.field("planets")
+@primes("planet")
+@db_bound
+def resolve_planets_connection(_, info, first=None, after=None, last=None, before=None):
+    logger.debug(f"Fetching planets page: first={first} after={after} last={last} before={before}")
     conn = get_db_connection()
     try:
-        planet = conn.execute("SELECT id, name, climate, terrain FROM planets WHERE id = ?", (id,)).fetchone()
-        return dict(planet) if planet else None
+        columns = ", ".join(project(selected_fields(info, "edges", "node"), PLANET_COLUMNS))
+        return paginate(conn, "planets", columns, first=first, after=after, last=last, before=before)
     except Exception as e:
-        logger.error(f"Error fetching planet {id}: {e}", exc_info=True)
+        logger.error(f"Error fetching planets page: {e}", exc_info=True)
         raise
     finally:
         conn.close()
 
+@query.field("planet")
+async def resolve_planet(_, info, id):
+    logger.debug(f"Fetching planet with ID: {id}")
+    try:
+        planet_id = int(id)
+    except (TypeError, ValueError):
+        return None
+    return await get_dataloaders(info)['planets'].load(planet_id)
+
 @query.field("allStarships")
+@primes("starship")
+@db_bound
 def resolve_all_starships(_, info):
     logger.info("Fetching all starships")
     conn = get_db_connection()
     try:
-        starships = conn.execute("SELECT id, name, model, manufacturer FROM starships").fetchall()
+        columns = ", ".join(project(selected_fields(info), STARSHIP_COLUMNS))
+        starships = conn.execute(f"SELECT {columns} FROM starships").fetchall()
         return [dict(s) for s in starships]
     except Exception as e:
         logger.error(f"Error fetching all starships: {e}", exc_info=True)
@@ -106,24 +219,49 @@ def resolve_all_starships(_, info):
     finally:
         conn.close()
 
-@query.field("starship")
-def resolve_starship(_, info, id):
-    logger.debug(f"Fetching starship with ID: {id}")
+@query.field("starships")
+@primes("starship")
+@db_bound
+def resolve_starships_connection(_, info, first=None, after=None, last=None, before=None):
+    logger.debug(f"Fetching starships page: first={first} after={after} last={last} before={before}")
     conn = get_db_connection()
     try:
-        starship = conn.execute("SELECT id, name, model, manufacturer FROM starships WHERE id = ?", (id,)).fetchone()
-        return dict(starship) if starship else None
+        columns = ", ".join(project(selected_fields(info, "edges", "node"), STARSHIP_COLUMNS))
+        return paginate(conn, "starships", columns, first=first, after=after, last=last, before=before)
     except Exception as e:
-        logger.error(f"Error fetching starship {id}: {e}", exc_info=True)
+        logger.error(f"Error fetching starships page: {e}", exc_info=True)
         raise
     finally:
         conn.close()
 
+@query.field("starship")
+async def resolve_starship(_, info, id):
+    logger.debug(f"Fetching starship with ID: {id}")
+    try:
+        starship_id = int(id)
+    except (TypeError, ValueError):
+        return None
+    return await get_dataloaders(info)['starships'].load(starship_id)
+
+@character_connection_type.field("totalCount")
+@planet_connection_type.field("totalCount")
+@starship_connection_type.field("totalCount")
+@db_bound
+def resolve_connection_total_count(connection, info):
+    conn = get_db_connection()
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {connection['table']}").fetchone()[0]
+    finally:
+        conn.close()
+
 @character_type.field("homePlanet")
 async def resolve_character_home_planet(character_obj, info):
     home_planet_id = character_obj.get("home_planet_id")
     if not home_planet_id:
         return None
+    if "home_planet" in character_obj:
+        # Joined by the list resolver, which also primed the loader with it
+        return character_obj["home_planet"]
     try:
         dataloaders = get_dataloaders(info)
         planet = await dataloaders['planets'].load(int(home_planet_id))
@@ -133,45 +271,49 @@ async def resolve_character_home_planet(character_obj, info):
         return None
 
 @character_type.field("pilotedStarships")
-async def resolve_character_piloted_starships(character_obj, info):
+async def resolve_character_piloted_starships(character_obj, info, first=None, after=None):
     character_id = character_obj.get("id")
     if not character_id:
         return []
+    first, after = relation_window(first, after)
     try:
-        dataloaders = get_dataloaders(info)
-        starships = await dataloaders['character_starships'].load(int(character_id))
+        loader = get_relation_loader(info, 'character_starships', first, after)
+        starships = await loader.load(int(character_id))
         return starships or []
     except Exception as e:
         logger.error(f"Error loading starships for character {character_id}: {e}", exc_info=True)
         return []
 
 @planet_type.field("residents")
-async def resolve_planet_residents(planet_obj, info):
+async def resolve_planet_residents(planet_obj, info, first=None, after=None):
     planet_id = planet_obj.get("id")
     if not planet_id:
         return []
+    first, after = relation_window(first, after)
     try:
-        dataloaders = get_dataloaders(info)
-        residents = await dataloaders['planet_residents'].load(int(planet_id))
+        loader = get_relation_loader(info, 'planet_residents', first, after)
+        residents = await loader.load(int(planet_id))
         return residents or []
     except Exception as e:
         logger.error(f"Error loading residents for planet {planet_id}: {e}", exc_info=True)
         return []
 
 @starship_type.field("pilots")
-async def resolve_starship_pilots(starship_obj, info):
+async def resolve_starship_pilots(starship_obj, info, first=None, after=None):
     starship_id = starship_obj.get("id")
     if not starship_id:
         return []
+    first, after = relation_window(first, after)
     try:
-        dataloaders = get_dataloaders(info)
-        pilots = await dataloaders['starship_pilots'].load(int(starship_id))
+        loader = get_relation_loader(info, 'starship_pilots', first, after)
+        pilots = await loader.load(int(starship_id))
         return pilots or []
     except Exception as e:
         logger.error(f"Error loading pilots for starship {starship_id}: {e}", exc_info=True)
         return []
 
 @mutation.field("createPlanet")
+@db_bound
 def resolve_create_planet(_, info, input):
     user = require_auth(info)
     logger.info(f"User {user.get('username')} creating planet: {input.get('name')}")
@@ -189,6 +331,7 @@ def resolve_create_planet(_, info, input):
             (validated.name, validated.climate, validated.terrain),
         )
         conn.commit()
+        invalidate_tables('planets')
         planet_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
         planet = conn.execute("SELECT id, name, climate, terrain FROM planets WHERE id = ?", (planet_id,)).fetchone()
         logger.info(f"Planet created successfully: {planet_id}")
@@ -205,6 +348,7 @@ def resolve_create_planet(_, info, input):
         conn.close()
 
 @mutation.field("updatePlanet")
+@db_bound
 def resolve_update_planet(_, info, input):
     user = require_auth(info)
     logger.info(f"User {user.get('username')} updating planet: {input.get('id')}")
@@ -230,6 +374,8 @@ def resolve_update_planet(_, info, input):
             ),
         )
         conn.commit()
+        invalidate_entity('planets', validated.id)
+        invalidate_tables('planets')
         updated_planet = conn.execute("SELECT id, name, climate, terrain FROM planets WHERE id = ?", (validated.id,)).fetchone()
         logger.info(f"Planet updated successfully: {validated.id}")
         return dict(updated_planet)
@@ -245,6 +391,7 @@ def resolve_update_planet(_, info, input):
         conn.close()
 
 @mutation.field("deletePlanet")
+@db_bound
 def resolve_delete_planet(_, info, id):
     user = require_admin(info)
     logger.warning(f"Admin {user.get('username')} deleting planet: {id}")
@@ -259,6 +406,9 @@ def resolve_delete_planet(_, info, id):
             raise Exception(f"Tidak dapat menghapus planet dengan {residents} penduduk.")
         conn.execute("DELETE FROM planets WHERE id = ?", (id,))
         conn.commit()
+        invalidate_entity('planets', id)
+        invalidate_relations('planet_residents', 'planet', id)
+        invalidate_tables('planets')
         logger.info(f"Planet deleted successfully: {id}")
         return True
     except Exception as e:
@@ -269,6 +419,7 @@ def resolve_delete_planet(_, info, id):
         conn.close()
 
 @mutation.field("createCharacter")
+@db_bound
 def resolve_create_character(_, info, input):
     user = require_auth(info)
     logger.info(f"User {user.get('username')} creating character: {input.get('name')}")
@@ -290,6 +441,9 @@ def resolve_create_character(_, info, input):
             (validated.name, validated.species, validated.homePlanetId),
         )
         conn.commit()
+        if validated.homePlanetId:
+            invalidate_relations('planet_residents', 'planet', validated.homePlanetId)
+        invalidate_tables('characters')
         char_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
         character = conn.execute(
             "SELECT id, name, species, home_planet_id FROM characters WHERE id = ?", (char_id,)
@@ -308,6 +462,7 @@ def resolve_create_character(_, info, input):
         conn.close()
 
 @mutation.field("updateCharacter")
+@db_bound
 def resolve_update_character(_, info, input):
     user = require_auth(info)
     logger.info(f"User {user.get('username')} updating character: {input.get('id')}")
@@ -339,6 +494,12 @@ def resolve_update_character(_, info, input):
             ),
         )
         conn.commit()
+        invalidate_entity('characters', validated.id)
+        invalidate_relations('planet_residents', 'character', validated.id)
+        invalidate_relations('starship_pilots', 'character', validated.id)
+        if validated.homePlanetId:
+            invalidate_relations('planet_residents', 'planet', validated.homePlanetId)
+        invalidate_tables('characters')
         updated_character = conn.execute(
             "SELECT id, name, species, home_planet_id FROM characters WHERE id = ?", (validated.id,)
         ).fetchone()
@@ -356,6 +517,7 @@ def resolve_update_character(_, info, input):
         conn.close()
 
 @mutation.field("deleteCharacter")
+@db_bound
 def resolve_delete_character(_, info, id):
     user = require_admin(info)
     logger.warning(f"Admin {user.get('username')} deleting character: {id}")
@@ -369,6 +531,11 @@ def resolve_delete_character(_, info, id):
         conn.execute("DELETE FROM character_starships WHERE character_id = ?", (id,))
         conn.execute("DELETE FROM characters WHERE id = ?", (id,))
         conn.commit()
+        invalidate_entity('characters', id)
+        invalidate_relations('planet_residents', 'character', id)
+        invalidate_relations('starship_pilots', 'character', id)
+        invalidate_relations('character_starships', 'character', id)
+        invalidate_tables('characters', 'character_starships')
         logger.info(f"Character deleted successfully: {id}")
         return True
     except Exception as e:
@@ -379,6 +546,7 @@ def resolve_delete_character(_, info, id):
         conn.close()
 
 @mutation.field("createStarship")
+@db_bound
 def resolve_create_starship(_, info, input):
     user = require_auth(info)
     logger.info(f"User {user.get('username')} creating starship: {input.get('name')}")
@@ -396,6 +564,7 @@ def resolve_create_starship(_, info, input):
             (validated.name, validated.model, validated.manufacturer),
         )
         conn.commit()
+        invalidate_tables('starships')
         starship_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
         starship = conn.execute(
             "SELECT id, name, model, manufacturer FROM starships WHERE id = ?", (starship_id,)
@@ -414,6 +583,7 @@ def resolve_create_starship(_, info, input):
         conn.close()
 
 @mutation.field("updateStarship")
+@db_bound
 def resolve_update_starship(_, info, input):
     user = require_auth(info)
     logger.info(f"User {user.get('username')} updating starship: {input.get('id')}")
@@ -440,6 +610,9 @@ def resolve_update_starship(_, info, input):
             ),
         )
         conn.commit()
+        invalidate_entity('starships', validated.id)
+        invalidate_relations('character_starships', 'starship', validated.id)
+        invalidate_tables('starships')
         updated_starship = conn.execute(
             "SELECT id, name, model, manufacturer FROM starships WHERE id = ?", (validated.id,)
         ).fetchone()
@@ -457,6 +630,7 @@ def resolve_update_starship(_, info, input):
         conn.close()
 
 @mutation.field("deleteStarship")
+@db_bound
 def resolve_delete_starship(_, info, id):
     user = require_admin(info)
     logger.warning(f"Admin {user.get('username')} deleting starship: {id}")
@@ -470,6 +644,10 @@ def resolve_delete_starship(_, info, id):
         conn.execute("DELETE FROM character_starships WHERE starship_id = ?", (id,))
         conn.execute("DELETE FROM starships WHERE id = ?", (id,))
         conn.commit()
+        invalidate_entity('starships', id)
+        invalidate_relations('character_starships', 'starship', id)
+        invalidate_relations('starship_pilots', 'starship', id)
+        invalidate_tables('starships', 'character_starships')
         logger.info(f"Starship deleted successfully: {id}")
         return True
     except Exception as e:
@@ -480,6 +658,7 @@ def resolve_delete_starship(_, info, id):
         conn.close()
 
 @mutation.field("assignStarship")
+@db_bound
 def resolve_assign_starship(_, info, input):
     user = require_auth(info)
     logger.info(f"User {user.get('username')} assigning starship {input.get('starshipId')} to character {input.get('characterId')}")
@@ -503,6 +682,9 @@ def resolve_assign_starship(_, info, input):
             (validated.characterId, validated.starshipId),
         )
         conn.commit()
+        invalidate_relations('character_starships', 'character', validated.characterId)
+        invalidate_relations('starship_pilots', 'starship', validated.starshipId)
+        invalidate_tables('character_starships')
         character = conn.execute(
             "SELECT id, name, species, home_planet_id FROM characters WHERE id = ?",
             (validated.characterId,),
@@ -516,5 +698,192 @@ def resolve_assign_starship(_, info, input):
     finally:
         conn.close()
 
-resolvers = [query, mutation, character_type, planet_type, starship_type]
+def _validate_items(items, model):
+    """Validate every input up front; returns ({index: model}, {index: error})."""
+    validated, errors = {}, {}
+    for index, item in enumerate(items):
+        try:
+            validated[index] = model(**item)
+        except Exception as e:
+            errors[index] = f"Validation error: {str(e)}"
+    return validated, errors
+
+def _existing(conn, table, column, values):
+    """Set-based existence check: one query regardless of how many values."""
+    if not values:
+        return set()
+    rows = conn.execute(
+        f"SELECT {column} FROM {table} WHERE {column} IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(values)),),
+    )
+    return {row[0] for row in rows}
+
+def _check_bulk_size(inputs):
+    if len(inputs) > BULK_MUTATION_MAX_ITEMS:
+        raise Exception(f"Maksimal {BULK_MUTATION_MAX_ITEMS} item per bulk mutation.")
+
+def _bulk_create(inputs, model, table, columns, label, foreign_keys=()):
+    """
+    Insert many named entities in one transaction. Names already in the
+    table or repeated in the input, and dangling foreign keys, become
+    per-item errors; the remaining rows go in with a single executemany.
+    """
+    _check_bulk_size(inputs)
+    validated, errors = _validate_items(inputs, model)
+
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        existing = _existing(conn, table, "name", {item.name for item in validated.values()})
+        seen = set()
+        for index, item in list(validated.items()):
+            if item.name in existing:
+                errors[index] = f"{label} '{item.name}' sudah ada."
+            elif item.name in seen:
+                errors[index] = f"{label} '{item.name}' muncul lebih dari sekali di input."
+            else:
+                seen.add(item.name)
+                continue
+            del validated[index]
+
+        for attr, ref_table, ref_label in foreign_keys:
+            wanted = {getattr(item, attr) for item in validated.values() if getattr(item, attr)}
+            found = _existing(conn, ref_table, "id", wanted)
+            for index, item in list(validated.items()):
+                value = getattr(item, attr)
+                if value and value not in found:
+                    errors[index] = f"{ref_label} dengan ID {value} tidak ditemukan."
+                    del validated[index]
+
+        placeholders = ", ".join("?" for _ in columns)
+        conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+            [tuple(getattr(item, field) for field in columns.values()) for item in validated.values()],
+        )
+        created = {
+            row["name"]: dict(row)
+            for row in conn.execute(
+                f"SELECT id, {', '.join(columns)} FROM {table} WHERE name IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(seen)),),
+            )
+        }
+        conn.commit()
+    except Exception as e:
+        logger.error(f"Error bulk creating {table}: {e}", exc_info=True)
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    logger.info(f"Bulk created {len(created)} {table}, {len(errors)} rejected")
+    return [
+        (index, created[validated[index].name] if index in validated else None, errors.get(index))
+        for index in range(len(inputs))
+    ]
+
+@mutation.field("createPlanets")
+@db_bound
+def resolve_create_planets(_, info, inputs):
+    user = require_auth(info)
+    logger.info(f"User {user.get('username')} bulk creating {len(inputs)} planets")
+    results = _bulk_create(
+        inputs, CreatePlanetInput, "planets",
+        {"name": "name", "climate": "climate", "terrain": "terrain"}, "Planet",
+    )
+    invalidate_tables('planets')
+    return [{"index": i, "planet": planet, "error": error} for i, planet, error in results]
+
+@mutation.field("createCharacters")
+@db_bound
+def resolve_create_characters(_, info, inputs):
+    user = require_auth(info)
+    logger.info(f"User {user.get('username')} bulk creating {len(inputs)} characters")
+    results = _bulk_create(
+        inputs, CreateCharacterInput, "characters",
+        {"name": "name", "species": "species", "home_planet_id": "homePlanetId"}, "Karakter",
+        foreign_keys=[("homePlanetId", "planets", "Planet")],
+    )
+    for planet_id in {c["home_planet_id"] for _, c, _ in results if c and c["home_planet_id"]}:
+        invalidate_relations('planet_residents', 'planet', planet_id)
+    invalidate_tables('characters')
+    return [{"index": i, "character": character, "error": error} for i, character, error in results]
+
+@mutation.field("createStarships")
+@db_bound
+def resolve_create_starships(_, info, inputs):
+    user = require_auth(info)
+    logger.info(f"User {user.get('username')} bulk creating {len(inputs)} starships")
+    results = _bulk_create(
+        inputs, CreateStarshipInput, "starships",
+        {"name": "name", "model": "model", "manufacturer": "manufacturer"}, "Kapal",
+    )
+    invalidate_tables('starships')
+    return [{"index": i, "starship": starship, "error": error} for i, starship, error in results]
+
+@mutation.field("assignStarships")
+@db_bound
+def resolve_assign_starships(_, info, inputs):
+    user = require_auth(info)
+    logger.info(f"User {user.get('username')} bulk assigning {len(inputs)} starships")
+    _check_bulk_size(inputs)
+    validated, errors = _validate_items(inputs, AssignStarshipInput)
+    pairs = {}
+    for index, item in validated.items():
+        try:
+            pairs[index] = (int(item.characterId), int(item.starshipId))
+        except ValueError:
+            errors[index] = "Validation error: ID harus berupa angka."
+
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        characters = _existing(conn, "characters", "id", {c for c, _ in pairs.values()})
+        starships = _existing(conn, "starships", "id", {s for _, s in pairs.values()})
+        for index, (character_id, starship_id) in list(pairs.items()):
+            if character_id not in characters:
+                errors[index] = f"Karakter dengan ID {character_id} tidak ditemukan."
+            elif starship_id not in starships:
+                errors[index] = f"Kapal dengan ID {starship_id} tidak ditemukan."
+            else:
+                continue
+            del pairs[index]
+
+        conn.executemany(
+            "INSERT OR IGNORE INTO character_starships (character_id, starship_id) VALUES (?, ?)",
+            list(pairs.values()),
+        )
+        assigned = {
+            row["id"]: dict(row)
+            for row in conn.execute(
+                "SELECT id, name, species, home_planet_id FROM characters "
+                "WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(sorted({c for c, _ in pairs.values()})),),
+            )
+        }
+        conn.commit()
+    except Exception as e:
+        logger.error(f"Error bulk assigning starships: {e}", exc_info=True)
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    for character_id, starship_id in set(pairs.values()):
+        invalidate_relations('character_starships', 'character', character_id)
+        invalidate_relations('starship_pilots', 'starship', starship_id)
+    invalidate_tables('character_starships')
+    logger.info(f"Bulk assigned {len(pairs)} starships, {len(errors)} rejected")
+    return [
+        {
+            "index": index,
+            "character": assigned[pairs[index][0]] if index in pairs else None,
+            "error": errors.get(index),
+        }
+        for index in range(len(inputs))
+    ]
+
+resolvers = [
+    query, mutation, character_type, planet_type, starship_type,
+    character_connection_type, planet_connection_type, starship_connection_type,
+]
 
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import logging
+from graphql import (
+    FieldNode, FragmentDefinitionNode,
+    OperationType, GraphQLError, print_ast, visit, get_named_type, get_operation_ast,
+)
+from graphql.language import Visitor
+from .auth import get_user_from_request
+from .document_cache import document_cache
+from .cache import TTLCache, response_cache, table_tag, MISSING
+from .config import RESPONSE_CACHE_ENABLED, DOCUMENT_CACHE_SIZE
+from .selection import collect_fields
+
+logger = logging.getLogger("starwars_api.response_cache")
+
+TYPE_TABLES = {
+    "Character": "characters",
+    "Planet": "planets",
+    "Starship": "starships",
+}
+
+FIELD_TABLES = {
+    "Character.pilotedStarships": "character_starships",
+    "Starship.pilots": "character_starships",
+}
+
+class _StripAliases(Visitor):
+    def leave_field(self, node, *_):
+        if node.alias is None:
+            return None
+        return FieldNode(
+            name=node.name,
+            arguments=node.arguments,
+            directives=node.directives,
+            selection_set=node.selection_set,
+        )
+
+def _fragments(document):
+    return {d.name.value: d for d in document.definitions if isinstance(d, FragmentDefinitionNode)}
+
+def _can_strip_aliases(selection_sets, fragments, seen=frozenset()):
+    """
+    Aliases can be dropped unless they are what keeps two selections of
+    the same field with different arguments apart.
+    """
+    by_name = {}
+    for field, _, field_seen in collect_fields(selection_sets, fragments, seen=seen):
+        fields, names = by_name.get(field.name.value, ([], frozenset()))
+        by_name[field.name.value] = (fields + [field], names | field_seen)
+    for fields, names in by_name.values():
+        signatures = {tuple(print_ast(arg) for arg in field.arguments) for field in fields}
+        if len(signatures) > 1:
+            return False
+        if not _can_strip_aliases([f.selection_set for f in fields], fragments, names):
+            return False
+    return True
+
+def _tables_read(schema, selection_sets, parent_type, fragments, tables, seen=frozenset()):
+    for field, field_parent, field_seen in collect_fields(selection_sets, fragments, schema, parent_type, seen):
+        field_def = getattr(field_parent, "fields", {}).get(field.name.value)
+        if field_def is None:
+            continue
+        named_type = get_named_type(field_def.type)
+        if named_type.name in TYPE_TABLES:
+            tables.add(TYPE_TABLES[named_type.name])
+        field_table = FIELD_TABLES.get(f"{field_parent.name}.{field.name.value}")
+        if field_table:
+            tables.add(field_table)
+        if field.selection_set:
+            _tables_read(schema, [field.selection_set], named_type, fragments, tables, field_seen)
+    return tables
+
+def realias(data, selection_sets, fragments):
+    """Rebuild alias-free cached data into the shape the requesting document asked for."""
+    if data is None:
+        return None
+    if isinstance(data, list):
+        return [realias(item, selection_sets, fragments) for item in data]
+    grouped = {}
+    for field, _, _ in collect_fields(selection_sets, fragments):
+        key = field.alias.value if field.alias else field.name.value
+        grouped.setdefault(key, (field.name.value, []))[1].append(field.selection_set)
+    result = {}
+    for key, (name, child_sets) in grouped.items():
+        if name not in data:
+            continue
+        value = data[name]
+        if any(child_sets) and value is not None:
+            value = realias(value, [s for s in child_sets if s], fragments)
+        result[key] = value
+    return result
+
+def _merge(a, b):
+    if a is MISSING:
+        return b
+    if isinstance(a, dict) and isinstance(b, dict):
+        merged = dict(a)
+        for key, value in b.items():
+            merged[key] = _merge(merged.get(key, MISSING), value)
+        return merged
+    if isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        return [_merge(x, y) for x, y in zip(a, b)]
+    return b
+
+def dealias(data, selection_sets, fragments):
+    """
+    Inverse of realias: key result data by field name. Fields requested
+    more than once under different aliases (same arguments, see
+    _can_strip_aliases) are merged into one entry.
+    """
+    if data is None:
+        return None
+    if isinstance(data, list):
+        return [dealias(item, selection_sets, fragments) for item in data]
+    result = {}
+    for field, _, _ in collect_fields(selection_sets, fragments):
+        key = field.alias.value if field.alias else field.name.value
+        if key not in data:
+            continue
+        value = data[key]
+        if field.selection_set and value is not None:
+            value = dealias(value, [field.selection_set], fragments)
+        name = field.name.value
+        result[name] = _merge(result.get(name, MISSING), value)
+    return result
+
+# Printed alias-free query per parsed document, so repeated aliased
+# operations do not re-walk the AST to compute their cache key
+_key_queries = TTLCache(DOCUMENT_CACHE_SIZE, float("inf"), "response_cache_keys")
+
+def _key_query(document):
+    cached = _key_queries.get(id(document))
+    if cached is not MISSING and cached[0] is document:
+        return cached[1]
+    query = print_ast(visit(document, _StripAliases()))
+    _key_queries.set(id(document), (document, query))
+    return query
+
+class CachePlan:
+    def __init__(self, key, document, operation, fragments, stripped, tables):
+        self.key = key
+        self.document = document
+        self.operation = operation
+        self.fragments = fragments
+        self.stripped = stripped
+        self.tables = tables
+        self.tags = [table_tag(t) for t in sorted(tables)]
+        # Snapshot before execution; set() is refused if a table was purged meanwhile
+        self.generation = response_cache.generation(self.tags)
+
+def plan_query(schema, document, data, role):
+    """
+    Build the response-cache plan for a read-only operation, or None
+    when the operation must not be cached (mutations, ambiguous documents).
+    """
+    operation_name = data.get("operationName")
+    operation = get_operation_ast(document, operation_name)
+    if operation is None or operation.operation != OperationType.QUERY:
+        return None
+
+    fragments = _fragments(document)
+    stripped = _can_strip_aliases([operation.selection_set], fragments)
+    payload = json.dumps(
+        {
+            "query": _key_query(document) if stripped else print_ast(document),
+            "variables": data.get("variables") or {},
+            "operationName": operation_name,
+            "role": role,
+        },
+        sort_keys=True,
+    )
+    key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    tables = _tables_read(schema, [operation.selection_set], schema.query_type, fragments, set())
+    return CachePlan(key, document, operation, fragments, stripped, tables)
+
+class ResponseCacheMixin:
+    """
+    GraphQLHTTPHandler mixin that serves repeated read-only operations
+    from the shared response cache. Entries are tagged with the tables
+    they read and purged by mutations through cache.invalidate_tables().
+    """
+    def __init__(self, *args, response_cache_enabled=RESPONSE_CACHE_ENABLED, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.response_cache_enabled = response_cache_enabled
+
+    async def execute_graphql_query(self, request, data, *, context_value=None, query_document=None):
+        plan = self._plan(request, data, query_document)
+        if plan is None:
+            return await super().execute_graphql_query(
+                request, data, context_value=context_value, query_document=query_document
+            )
+
+        cached = response_cache.get(plan.key)
+        if cached is not MISSING:
+            return True, {"data": self._shape(cached, plan), "extensions": {"responseCache": "HIT"}}
+
+        success, result = await super().execute_graphql_query(
+            request, data, context_value=context_value, query_document=plan.document
+        )
+        # The client's own document runs, so errors and partial data keep their aliases
+        if success and not result.get("errors") and result.get("data") is not None:
+            response_cache.set(
+                plan.key, self._normalize(result["data"], plan), tags=plan.tags, generation=plan.generation
+            )
+        return success, result
+
+    def _plan(self, request, data, query_document):
+        if not self.response_cache_enabled or not isinstance(data, dict) or not isinstance(data.get("query"), str):
+            return None
+        try:
+            document = query_document or document_cache.parse(None, data)
+            user = get_user_from_request(request)
+            role = user.get("role", "user") if user else "anonymous"
+            return plan_query(self.schema, document, data, role)
+        except GraphQLError:
+            return None
+
+    def _normalize(self, data, plan):
+        if not plan.stripped:
+            return data
+        return dealias(data, [plan.operation.selection_set], plan.fragments)
+
+    def _shape(self, data, plan):
+        if not plan.stripped:
+            return data
+        return realias(data, [plan.operation.selection_set], plan.fragments)
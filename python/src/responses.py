@@ -4,6 +4,12 @@ from typing import Optional, List
 class HealthResponse(BaseModel):
     status: str = Field(..., description="Health status (healthy/unhealthy)")
     database: str = Field(..., description="Database connection status")
+    pool: Optional[dict] = Field(None, description="Database connection pool statistics")
+    sqlite: Optional[dict] = Field(None, description="SQLite PRAGMA profile and WAL checkpoint status")
+    cache: Optional[dict] = Field(None, description="Entity cache hit/miss/eviction counters")
+    auth: Optional[dict] = Field(None, description="Password hashing pool latency and saturation")
+    startup: Optional[dict] = Field(None, description="Per-phase startup timing in milliseconds")
+    slow_queries: Optional[dict] = Field(None, description="Slow-query log threshold and entries written")
     version: str = Field(..., description="API version")
 
 class RootResponse(BaseModel):
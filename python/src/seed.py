@@ -1,4 +1,25 @@
-from .database import get_db_connection, init_db
+import argparse
+import random
+import time
+from itertools import accumulate, islice
+from .database import get_db_connection, init_db, indexes_dropped
+from .cache import clear_caches
+
+# Dataset size at scale=1.0; generate_data(scale=0.01) gives 1% of each.
+FULL_SCALE = {
+    "planets": 10_000,
+    "characters": 1_000_000,
+    "starships": 50_000,
+    "pilots": 5_000_000,
+}
+
+CLIMATES = ["Arid", "Temperate", "Frozen", "Tropical", "Murky", "Hot", "Humid", "Windy"]
+TERRAINS = ["Desert", "Grasslands", "Mountains", "Jungle", "Ocean", "Swamp", "Cityscape", "Tundra", "Volcanic"]
+SPECIES = ["Human", "Droid", "Wookiee", "Twi'lek", "Rodian", "Zabrak", "Mon Calamari", "Unknown"]
+SPECIES_WEIGHTS = [50, 12, 6, 6, 5, 5, 4, 12]
+MANUFACTURERS = ["Incom Corporation", "Corellian Engineering", "Sienar Fleet Systems", "Kuat Drive Yards", "Cygnus Spaceworks"]
+MODELS = ["light freighter", "starfighter", "interceptor", "star destroyer", "shuttle", "corvette"]
+SYLLABLES = ["ta", "to", "oo", "ine", "na", "bo", "ho", "th", "en", "dor", "ka", "shy", "yyk", "cor", "us", "ant", "kes", "sel"]
 
 def seed_data():
     conn = get_db_connection()
@@ -46,8 +67,139 @@ def seed_data():
 
     conn.commit()
     conn.close()
+    clear_caches()
     print("Database berhasil diisi dengan data Star Wars!")
 
-if __name__ == "__main__":
+def zipf_sampler(rng, n, s):
+    """
+    Return sample(k) drawing k ids in 1..n where the r-th most popular id
+    has weight 1/r**s. s=0 is uniform. Popularity ranks are shuffled so hot
+    ids are spread over the id range.
+    """
+    ids = list(range(1, n + 1))
+    rng.shuffle(ids)
+    cum_weights = list(accumulate(1.0 / rank ** s for rank in range(1, n + 1)))
+
+    def sample(k):
+        return rng.choices(ids, cum_weights=cum_weights, k=k)
+    return sample
+
+def _name(rng, i, suffix=""):
+    stem = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+    return f"{stem}{suffix} {i}"
+
+def _insert_chunked(conn, statement, rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        conn.executemany(statement, chunk)
+
+def generate_data(scale=0.01, seed=42, planets=None, characters=None, starships=None, pilots=None,
+                  resident_skew=1.1, pilot_skew=0.8, homeless_ratio=0.05, chunk_size=50_000):
+    """
+    Replace the Star Wars tables with a synthetic dataset.
+
+    Counts default to FULL_SCALE * scale and can be overridden one by one.
+    Residents per planet and pilots per starship follow Zipf distributions
+    with exponents resident_skew and pilot_skew (0 = uniform). The same
+    seed always produces the same database. Returns row counts and timing.
+    """
+    counts = {
+        name: max(1, int(round(FULL_SCALE[name] * scale))) if value is None else value
+        for name, value in (("planets", planets), ("characters", characters),
+                            ("starships", starships), ("pilots", pilots))
+    }
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    conn = get_db_connection()
+    try:
+        for table in ("character_starships", "characters", "starships", "planets"):
+            conn.execute(f"DELETE FROM {table}")
+        conn.execute("DELETE FROM sqlite_sequence WHERE name IN ('planets', 'characters', 'starships')")
+        conn.commit()
+
+        with indexes_dropped(conn, "planets", "characters", "starships", "character_starships"):
+            _insert_chunked(conn, "INSERT INTO planets (id, name, climate, terrain) VALUES (?, ?, ?, ?)", (
+                (i, _name(rng, i), rng.choice(CLIMATES), rng.choice(TERRAINS))
+                for i in range(1, counts["planets"] + 1)
+            ), chunk_size)
+
+            home_planet = zipf_sampler(rng, counts["planets"], resident_skew)
+
+            def characters_rows():
+                remaining = counts["characters"]
+                next_id = 1
+                while remaining:
+                    k = min(chunk_size, remaining)
+                    homes = home_planet(k)
+                    species = rng.choices(SPECIES, weights=SPECIES_WEIGHTS, k=k)
+                    for offset in range(k):
+                        i = next_id + offset
+                        home = None if rng.random() < homeless_ratio else homes[offset]
+                        yield (i, _name(rng, i), species[offset], home)
+                    next_id += k
+                    remaining -= k
+
+            _insert_chunked(conn, "INSERT INTO characters (id, name, species, home_planet_id) VALUES (?, ?, ?, ?)",
+                            characters_rows(), chunk_size)
+
+            _insert_chunked(conn, "INSERT INTO starships (id, name, model, manufacturer) VALUES (?, ?, ?, ?)", (
+                (i, _name(rng, i, " Class"), rng.choice(MODELS), rng.choice(MANUFACTURERS))
+                for i in range(1, counts["starships"] + 1)
+            ), chunk_size)
+
+            starship = zipf_sampler(rng, counts["starships"], pilot_skew)
+
+            def pilot_rows():
+                remaining = counts["pilots"]
+                while remaining:
+                    k = min(chunk_size, remaining)
+                    for ship in starship(k):
+                        yield (rng.randint(1, counts["characters"]), ship)
+                    remaining -= k
+
+            _insert_chunked(conn, "INSERT OR IGNORE INTO character_starships (character_id, starship_id) VALUES (?, ?)",
+                            pilot_rows(), chunk_size)
+            conn.commit()
+
+        counts["pilots"] = conn.execute("SELECT COUNT(*) FROM character_starships").fetchone()[0]
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    clear_caches()
+
+    counts["seconds"] = time.perf_counter() - started
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the database with the demo data or a synthetic dataset.")
+    parser.add_argument("--scale", type=float, help="Generate FULL_SCALE * scale rows instead of the demo data")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--planets", type=int)
+    parser.add_argument("--characters", type=int)
+    parser.add_argument("--starships", type=int)
+    parser.add_argument("--pilots", type=int)
+    parser.add_argument("--resident-skew", type=float, default=1.1, help="Zipf exponent of residents per planet")
+    parser.add_argument("--pilot-skew", type=float, default=0.8, help="Zipf exponent of pilots per starship")
+    args = parser.parse_args(argv)
+
     init_db()
-    seed_data()
\ No newline at end of file
+    if args.scale is None and not any((args.planets, args.characters, args.starships, args.pilots)):
+        seed_data()
+        return
+    stats = generate_data(
+        scale=args.scale if args.scale is not None else 0.01, seed=args.seed,
+        planets=args.planets, characters=args.characters, starships=args.starships, pilots=args.pilots,
+        resident_skew=args.resident_skew, pilot_skew=args.pilot_skew,
+    )
+    print(
+        f"Generated {stats['planets']} planets, {stats['characters']} characters, "
+        f"{stats['starships']} starships, {stats['pilots']} pilot assignments in {stats['seconds']:.1f}s"
+    )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,62 @@
+from graphql import FieldNode, FragmentSpreadNode, InlineFragmentNode
+
+def collect_fields(selection_sets, fragments, schema=None, parent_type=None, seen=frozenset()):
+    """
+    Flatten selection sets, inlining fragments, into (field, parent type,
+    seen) triples. With a `schema`, the parent type follows fragment type
+    conditions. `seen` holds the fragment names expanded on the way to the
+    field; pass it back when descending into the field's own selection
+    set, so fragment cycles stop even before validation has rejected them.
+    This is the one walker used by projection, cache planning and the
+    cost analysis, so they all agree on what a query selects.
+    """
+    for selection_set in selection_sets:
+        if selection_set is None:
+            continue
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield selection, parent_type, seen
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if schema is not None and selection.type_condition:
+                    fragment_type = schema.get_type(selection.type_condition.name.value)
+                yield from collect_fields([selection.selection_set], fragments, schema, fragment_type, seen)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = fragments.get(name)
+                if fragment is None or name in seen:
+                    continue
+                fragment_type = parent_type
+                if schema is not None:
+                    fragment_type = schema.get_type(fragment.type_condition.name.value)
+                yield from collect_fields([fragment.selection_set], fragments, schema, fragment_type, seen | {name})
+
+def selected_fields(info, *path):
+    """
+    Names of the fields selected below the field being resolved, following
+    `path` through nested fields first (e.g. "edges", "node" for a
+    connection). Aliases and fragments are merged; @skip/@include are
+    ignored, so the result may over-select but never under-select.
+    Returns None when `info` carries no selection (resolvers called
+    directly), which callers treat as "everything".
+    """
+    field_nodes = getattr(info, "field_nodes", None)
+    if not field_nodes:
+        return None
+    fragments = getattr(info, "fragments", None) or {}
+    selection_sets = [node.selection_set for node in field_nodes]
+    for name in path:
+        selection_sets = [f.selection_set for f, _, _ in collect_fields(selection_sets, fragments) if f.name.value == name]
+    return {f.name.value for f, _, _ in collect_fields(selection_sets, fragments)}
+
+def project(selected, field_columns, always=("id",)):
+    """
+    Columns needed for the `selected` fields, given a mapping of GraphQL
+    field name to column. Fields without a column of their own (nested
+    lists resolved from the id) only need `always`. Column order follows
+    `field_columns` so equal selections produce the same SQL text.
+    """
+    if selected is None:
+        return list(dict.fromkeys([*always, *field_columns.values()]))
+    wanted = set(always) | {column for field, column in field_columns.items() if field in selected}
+    return [c for c in dict.fromkeys([*always, *field_columns.values()]) if c in wanted]
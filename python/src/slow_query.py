@@ -0,0 +1,95 @@
+import sqlite3
+import threading
+from .config import SLOW_QUERY_THRESHOLD_MS
+from .executor import current_operation, sql_source
+from .logger import slow_query_logger
+from .metrics import normalize_sql
+
+PLAN_CACHE_SIZE = 1000
+
+def analyze_plan(plan):
+    """
+    Flag the costly steps of an EXPLAIN QUERY PLAN: full table scans (SCAN
+    without an index) and temporary B-trees for ORDER BY / GROUP BY.
+    """
+    scanned = []
+    temp_btree = False
+    for detail in plan:
+        words = detail.split()
+        if words[:1] == ["SCAN"] and "USING" not in words:
+            # "SCAN t" (SQLite >= 3.36) or "SCAN TABLE t"; subqueries and constant rows are not tables
+            table = words[2] if words[1:2] == ["TABLE"] and len(words) > 2 else words[1] if len(words) > 1 else ""
+            if table and not table.startswith("(") and table != "CONSTANT":
+                scanned.append(table)
+        elif detail.startswith("USE TEMP B-TREE"):
+            temp_btree = True
+    return {"full_scan": bool(scanned), "scanned_tables": scanned, "temp_btree": temp_btree}
+
+class SlowQueryLog:
+    """
+    SQL observer writing statements slower than `threshold_ms` to the
+    slow-query log. Fast statements only cost a float comparison. The
+    query plan is captured with EXPLAIN QUERY PLAN on the first slow
+    occurrence of each normalized statement and reused afterwards.
+    """
+    def __init__(self, threshold_ms=SLOW_QUERY_THRESHOLD_MS, logger=slow_query_logger):
+        self.threshold = threshold_ms / 1000
+        self.logger = logger
+        self._plans = {}
+        self._lock = threading.Lock()
+        self.logged = 0
+
+    def on_execute(self, cursor, sql, seconds):
+        # Row-returning statements are judged once their rows are fetched;
+        # writes, and reads that are slow already at execute, right away.
+        if seconds >= self.threshold:
+            self._log(cursor, rows=cursor.rowcount if cursor.description is None else None)
+
+    def on_fetch(self, cursor, sql, rows, seconds):
+        if cursor.elapsed >= self.threshold and cursor.elapsed - seconds < self.threshold:
+            self._log(cursor, rows=cursor.rows)
+
+    def plan(self, cursor):
+        shape = normalize_sql(cursor.sql)
+        with self._lock:
+            plan = self._plans.get(shape)
+        if plan is not None:
+            return plan
+        if cursor.parameters is None:
+            return None
+        try:
+            # Plain sqlite3 execute, so the EXPLAIN itself is not observed
+            rows = sqlite3.Connection.execute(
+                cursor.connection, f"EXPLAIN QUERY PLAN {cursor.sql}", cursor.parameters
+            ).fetchall()
+        except Exception as e:
+            return [f"EXPLAIN failed: {e}"]
+        plan = [row[3] for row in rows]
+        with self._lock:
+            if len(self._plans) >= PLAN_CACHE_SIZE:
+                self._plans.clear()
+            self._plans[shape] = plan
+        return plan
+
+    def _log(self, cursor, rows):
+        plan = self.plan(cursor)
+        entry = {
+            "statement": normalize_sql(cursor.sql),
+            "parameter_count": None if cursor.parameters is None else len(cursor.parameters),
+            "duration_ms": round(cursor.elapsed * 1000, 3),
+            "rows": rows,
+            "operation": current_operation.get(),
+            "source": sql_source.get(),
+            "plan": plan,
+            **analyze_plan(plan or []),
+        }
+        self.logged += 1
+        level = "full table scan" if entry["full_scan"] else "slow query"
+        self.logger.warning(f"{level}: {entry['duration_ms']}ms {entry['statement'][:120]}", extra=entry)
+
+    def stats(self):
+        with self._lock:
+            plans = len(self._plans)
+        return {"threshold_ms": self.threshold * 1000, "logged": self.logged, "plans": plans}
+
+slow_query_log = SlowQueryLog()
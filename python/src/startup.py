@@ -0,0 +1,40 @@
+import importlib
+import sys
+import time
+from contextlib import contextmanager
+
+class StartupTimer:
+    """Per-phase wall-clock breakdown of process startup, in milliseconds."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 3)
+
+    def measure_import(self, module):
+        """Import `module` and record how long it took (0 when already loaded)."""
+        with self.phase(f"import:{module}"):
+            if module not in sys.modules:
+                importlib.import_module(module)
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def report(self):
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return {
+            "phases_ms": dict(self.phases),
+            "total_ms": round((end - self.started) * 1000, 3),
+        }
+
+startup_timer = StartupTimer()
+
+for _module in ("pydantic", "jose", "bcrypt", "ariadne"):
+    startup_timer.measure_import(_module)
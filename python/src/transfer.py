@@ -0,0 +1,280 @@
+"""
+Streaming bulk import/export for the Star Wars tables.
+
+    python -m src.transfer import characters characters.ndjson --chunk-size 5000 --drop-indexes
+    python -m src.transfer export characters characters.csv
+
+Records reference other rows by name (`homePlanet`, `character`,
+`starship`), so files can move between databases with different ids.
+Rows are streamed in fixed-size chunks in both directions; only the
+name -> id map of the referenced table is held in memory.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from contextlib import contextmanager
+from itertools import islice
+from .database import get_db_connection, ensure_db, indexes_dropped
+from .cache import clear_caches
+
+TABLES = {
+    "planets": {
+        "fields": ["name", "climate", "terrain"],
+        "insert": "INTO planets (name, climate, terrain) VALUES (?, ?, ?)",
+        "export": "SELECT name, climate, terrain FROM planets ORDER BY id",
+        "upsert": "ON CONFLICT(name) DO UPDATE SET climate = excluded.climate, terrain = excluded.terrain",
+    },
+    "characters": {
+        "fields": ["name", "species", "homePlanet"],
+        "insert": "INTO characters (name, species, home_planet_id) VALUES (?, ?, ?)",
+        "export": (
+            "SELECT c.name, c.species, p.name AS homePlanet FROM characters c "
+            "LEFT JOIN planets p ON p.id = c.home_planet_id ORDER BY c.id"
+        ),
+        "references": {"homePlanet": "planets"},
+        "upsert": (
+            "ON CONFLICT(name) DO UPDATE SET species = excluded.species, "
+            "home_planet_id = excluded.home_planet_id"
+        ),
+    },
+    "starships": {
+        "fields": ["name", "model", "manufacturer"],
+        "insert": "INTO starships (name, model, manufacturer) VALUES (?, ?, ?)",
+        "export": "SELECT name, model, manufacturer FROM starships ORDER BY id",
+        "upsert": "ON CONFLICT(name) DO UPDATE SET model = excluded.model, manufacturer = excluded.manufacturer",
+    },
+    "character_starships": {
+        "fields": ["character", "starship"],
+        "insert": "INTO character_starships (character_id, starship_id) VALUES (?, ?)",
+        "export": (
+            "SELECT c.name AS character, s.name AS starship FROM character_starships cs "
+            "JOIN characters c ON c.id = cs.character_id "
+            "JOIN starships s ON s.id = cs.starship_id ORDER BY cs.character_id, cs.starship_id"
+        ),
+        "references": {"character": "characters", "starship": "starships"},
+        "required": ["character", "starship"],
+        "upsert": "ON CONFLICT(character_id, starship_id) DO NOTHING",
+    },
+}
+
+# "replace" is an upsert, not INSERT OR REPLACE: that deletes the old row and
+# inserts one with a new id, orphaning every reference to it (foreign keys are
+# not enforced), while ON CONFLICT ... DO UPDATE keeps the id.
+CONFLICT_CLAUSES = {"abort": "INSERT", "ignore": "INSERT OR IGNORE", "replace": "INSERT"}
+
+def insert_statement(spec, on_conflict):
+    statement = f"{CONFLICT_CLAUSES[on_conflict]} {spec['insert']}"
+    if on_conflict == "replace":
+        statement += f" {spec['upsert']}"
+    return statement
+
+class PartialImportError(Exception):
+    """An import failed after some chunks were committed; `stats` counts them."""
+    def __init__(self, stats, error):
+        super().__init__(f"{stats['table']}: import failed after {stats['rows']} committed rows: {error}")
+        self.stats = stats
+        self.error = error
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    if path.endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+def read_records(stream, fmt):
+    """Yield dicts from an NDJSON or CSV stream, one line at a time."""
+    if fmt == "csv":
+        for record in csv.DictReader(stream):
+            yield {key: (value if value != "" else None) for key, value in record.items()}
+    else:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def write_records(rows, stream, fmt, fields):
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow(["" if value is None else value for value in row])
+            count += 1
+    else:
+        for row in rows:
+            stream.write(json.dumps(dict(zip(fields, row)), ensure_ascii=False))
+            stream.write("\n")
+            count += 1
+    return count
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _name_map(conn, table):
+    return {name: row_id for row_id, name in conn.execute(f"SELECT id, name FROM {table}")}
+
+def import_records(table, records, chunk_size=5000, on_conflict="abort", drop_indexes=False, progress=None):
+    """
+    Load `records` into `table` in chunked transactions. Returns counts and
+    throughput; rows whose required references cannot be resolved are skipped.
+    Each chunk is committed on its own, so memory stays constant; if a chunk
+    fails, the earlier ones stay committed and PartialImportError reports
+    how many rows that is.
+    """
+    spec = TABLES[table]
+    statement = insert_statement(spec, on_conflict)
+    references = spec.get("references", {})
+    required = set(spec.get("required", []))
+    stats = {"table": table, "rows": 0, "skipped": 0, "unresolved": 0}
+
+    conn = get_db_connection()
+    started = time.perf_counter()
+    try:
+        maps = {field: _name_map(conn, ref_table) for field, ref_table in references.items()}
+
+        def to_row(record):
+            row = []
+            for field in spec["fields"]:
+                value = record.get(field)
+                if field in maps and value is not None:
+                    resolved = maps[field].get(value)
+                    if resolved is None:
+                        stats["unresolved"] += 1
+                        if field in required:
+                            return None
+                    value = resolved
+                elif field in required and value is None:
+                    return None
+                row.append(value)
+            return tuple(row)
+
+        def load():
+            for chunk in _chunks(records, chunk_size):
+                rows = []
+                for record in chunk:
+                    row = to_row(record)
+                    if row is None:
+                        stats["skipped"] += 1
+                    else:
+                        rows.append(row)
+                if rows:
+                    conn.executemany(statement, rows)
+                    conn.commit()
+                    stats["rows"] += len(rows)
+                if progress:
+                    progress(stats, time.perf_counter() - started)
+
+        if drop_indexes:
+            with indexes_dropped(conn, table):
+                load()
+        else:
+            load()
+    except Exception as e:
+        conn.rollback()
+        if stats["rows"]:
+            raise PartialImportError(stats, e) from e
+        raise
+    finally:
+        conn.close()
+        # Committed chunks are visible even when a later one failed
+        clear_caches()
+
+    stats["seconds"] = time.perf_counter() - started
+    stats["rows_per_sec"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+def export_rows(table, stream, fmt):
+    """Stream `table` to `stream` straight from the cursor. Returns counts and throughput."""
+    spec = TABLES[table]
+    conn = get_db_connection()
+    started = time.perf_counter()
+    try:
+        cursor = conn.execute(spec["export"])
+        cursor.arraysize = 1000
+        rows = (tuple(row) for batch in iter(cursor.fetchmany, []) for row in batch)
+        count = write_records(rows, stream, fmt, spec["fields"])
+    finally:
+        conn.close()
+    seconds = time.perf_counter() - started
+    return {"table": table, "rows": count, "seconds": seconds, "rows_per_sec": count / seconds if seconds else 0.0}
+
+def _report(stats, elapsed=None):
+    elapsed = stats.get("seconds", elapsed)
+    rate = stats["rows"] / elapsed if elapsed else 0.0
+    extra = ""
+    if "skipped" in stats:
+        extra = f", {stats['skipped']} skipped, {stats['unresolved']} unresolved references"
+    print(f"{stats['table']}: {stats['rows']} rows in {elapsed:.2f}s ({rate:,.0f} rows/s){extra}", file=sys.stderr)
+
+def _progress_reporter(interval=1.0):
+    last = [0.0]
+
+    def progress(stats, elapsed):
+        if elapsed - last[0] >= interval:
+            last[0] = elapsed
+            _report(stats, elapsed)
+    return progress
+
+@contextmanager
+def _open(path, mode):
+    if path == "-":
+        yield sys.stdin if "r" in mode else sys.stdout
+    else:
+        with open(path, mode, encoding="utf-8", newline="") as stream:
+            yield stream
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    importer = sub.add_parser(
+        "import", help="Load NDJSON/CSV into a table",
+        description="Rows are committed per chunk. If the import fails, chunks committed before the "
+                    "error are kept and their row count is reported; re-run with --on-conflict ignore "
+                    "to resume.",
+    )
+    importer.add_argument("table", choices=TABLES)
+    importer.add_argument("path", help="Input file, or - for stdin")
+    importer.add_argument("--format", choices=["ndjson", "csv"])
+    importer.add_argument("--chunk-size", type=int, default=5000)
+    importer.add_argument("--on-conflict", choices=CONFLICT_CLAUSES, default="abort")
+    importer.add_argument("--drop-indexes", action="store_true", help="Drop secondary indexes during the load and rebuild them after")
+    importer.add_argument("--quiet", action="store_true", help="Only report the final summary")
+
+    exporter = sub.add_parser("export", help="Stream a table to NDJSON/CSV")
+    exporter.add_argument("table", choices=TABLES)
+    exporter.add_argument("path", help="Output file, or - for stdout")
+    exporter.add_argument("--format", choices=["ndjson", "csv"])
+
+    args = parser.parse_args(argv)
+    ensure_db()
+    fmt = detect_format(args.path, args.format)
+
+    if args.command == "import":
+        with _open(args.path, "r") as stream:
+            try:
+                stats = import_records(
+                    args.table, read_records(stream, fmt),
+                    chunk_size=args.chunk_size, on_conflict=args.on_conflict,
+                    drop_indexes=args.drop_indexes, progress=None if args.quiet else _progress_reporter(),
+                )
+            except PartialImportError as e:
+                print(f"Import failed: {e.error}", file=sys.stderr)
+                print(f"{e.stats['rows']} rows were committed before the error and remain in {args.table}.", file=sys.stderr)
+                sys.exit(1)
+    else:
+        with _open(args.path, "w") as stream:
+            stats = export_rows(args.table, stream, fmt)
+    _report(stats)
+    return stats
+
+if __name__ == "__main__":
+    main()
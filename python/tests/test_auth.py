@@ -46,3 +46,107 @@ def test_verify_token():
     payload = verify_token(credentials)
     assert payload["sub"] == "testuser"
 
+
+def test_token_decoded_once_per_request():
+    from src.auth import get_user_from_request, get_token_stats
+
+    class MockRequest:
+        def __init__(self, token):
+            self.headers = {"authorization": f"Bearer {token}"}
+            self.scope = {}
+
+    request = MockRequest(create_access_token({"sub": "cached", "role": "user"}))
+    before = get_token_stats()
+    for _ in range(5):
+        assert get_user_from_request(request)["sub"] == "cached"
+    after = get_token_stats()
+    assert after["decodes"] - before["decodes"] == 1
+    assert after["request_hits"] - before["request_hits"] == 4
+
+def test_token_cache_shared_across_requests():
+    from src.auth import decode_token, get_token_stats
+
+    token = create_access_token({"sub": "shared", "role": "user"})
+    before = get_token_stats()
+    decode_token(token)
+    decode_token(token)
+    after = get_token_stats()
+    assert after["decodes"] - before["decodes"] == 1
+    assert after["cache_hits"] - before["cache_hits"] == 1
+
+def test_expired_token_is_not_cached():
+    from datetime import timedelta
+    from jose import ExpiredSignatureError
+    from src.auth import decode_token
+
+    token = create_access_token({"sub": "old"}, expires_delta=timedelta(seconds=-1))
+    with pytest.raises(ExpiredSignatureError):
+        decode_token(token)
+    with pytest.raises(ExpiredSignatureError):
+        decode_token(token)
+
+def test_needs_rehash_when_cost_changes():
+    import bcrypt
+    from src.auth import needs_rehash
+    from src.config import BCRYPT_ROUNDS
+
+    assert not needs_rehash(get_password_hash("secret"))
+    rounds = 4 if BCRYPT_ROUNDS != 4 else 5
+    old = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+    assert needs_rehash(old)
+
+async def test_hash_pool_rejects_when_saturated(monkeypatch):
+    import asyncio
+    import threading
+    from src import executor
+
+    monkeypatch.setattr(executor, "AUTH_HASH_WORKERS", 1)
+    monkeypatch.setattr(executor, "AUTH_HASH_QUEUE_LIMIT", 1)
+    executor.shutdown_hash_executor()
+    release = threading.Event()
+    try:
+        busy = [asyncio.ensure_future(executor.run_hash(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(executor.HashPoolSaturatedError):
+            await executor.run_hash(lambda: None)
+        release.set()
+        await asyncio.gather(*busy)
+        assert executor.get_hash_stats()["rejected"] >= 1
+        assert executor.get_hash_stats()["in_flight"] == 0
+    finally:
+        release.set()
+        executor.shutdown_hash_executor()
+
+async def test_login_upgrades_old_hash_in_background(tmp_path):
+    import asyncio
+    import bcrypt
+    from httpx import AsyncClient
+    from src import main
+    from src.auth import needs_rehash
+    from src.config import BCRYPT_ROUNDS
+    from src.database import configure_pool, DATABASE_NAME
+
+    configure_pool(str(tmp_path / "auth.db"))
+    try:
+        init_db()
+        rounds = 4 if BCRYPT_ROUNDS != 4 else 5
+        old = bcrypt.hashpw(b"secret123", bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+        conn = get_db_connection()
+        conn.execute(
+            "INSERT INTO users (username, email, hashed_password, role) VALUES (?, ?, ?, ?)",
+            ("legacy", "legacy@example.com", old, "user"),
+        )
+        conn.commit()
+        conn.close()
+
+        async with AsyncClient(app=main.app, base_url="http://test") as client:
+            response = await client.post("/auth/login", json={"username": "legacy", "password": "secret123"})
+        assert response.status_code == 200
+        await asyncio.gather(*main._background_tasks)
+
+        conn = get_db_connection()
+        stored = conn.execute("SELECT hashed_password FROM users WHERE username = 'legacy'").fetchone()[0]
+        conn.close()
+        assert not needs_rehash(stored)
+    finally:
+        configure_pool(DATABASE_NAME)
@@ -0,0 +1,61 @@
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from httpx import AsyncClient
+from src.main import app, graphql_app
+from src.database import get_db_connection, init_db
+from src.seed import seed_data
+from src.cache import clear_caches
+from src.dataloaders import CharacterLoader
+
+@pytest.fixture
+def character_ids():
+    init_db()
+    seed_data()
+    clear_caches()
+    conn = get_db_connection()
+    try:
+        ids = [row["id"] for row in conn.execute("SELECT id FROM characters ORDER BY id LIMIT 3")]
+    finally:
+        conn.close()
+    yield ids
+    clear_caches()
+
+async def test_batch_shares_dataloaders(character_ids, monkeypatch):
+    calls = []
+    original = CharacterLoader._load
+
+    def counting_load(self, keys):
+        calls.append(sorted(keys))
+        return original(self, keys)
+
+    monkeypatch.setattr(CharacterLoader, "_load", counting_load)
+    batch = [
+        {"query": "query ($id: ID!) { character(id: $id) { name } }", "variables": {"id": str(i)}}
+        for i in character_ids
+    ]
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/graphql/", json=batch)
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) == 3
+    assert all(r["data"]["character"]["name"] for r in results)
+    assert calls == [sorted(character_ids)]
+
+async def test_batch_keeps_errors_per_operation(character_ids):
+    batch = [{"query": "{ allPlanets { name } }"}, {"query": "{ nope }"}]
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/graphql/", json=batch)
+    assert response.status_code == 200
+    first, second = response.json()
+    assert first["data"]["allPlanets"]
+    assert "errors" in second
+
+async def test_batch_size_limit(character_ids, monkeypatch):
+    monkeypatch.setattr(graphql_app.http_handler, "batch_max_size", 2)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/graphql/", json=[{"query": "{ allPlanets { name } }"}] * 3)
+    assert response.status_code == 400
+    assert "Batch" in response.json()["errors"][0]["message"]
@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.bench_graphql import compare
+
+def result(**overrides):
+    base = {"scale": 0.001, "query": "characters_page", "errors": 0,
+            "rps": 100.0, "p95_ms": 10.0, "p99_ms": 20.0, "sql_per_request": 3}
+    return {**base, **overrides}
+
+def test_compare_within_tolerance_passes():
+    baseline = {"results": [result()]}
+    assert compare([result(rps=85.0, p95_ms=11.5, p99_ms=23.0)], baseline, 0.2) == []
+
+def test_compare_flags_slowdowns_errors_and_extra_sql():
+    baseline = {"results": [result()]}
+    messages = compare([result(rps=70.0, p99_ms=30.0, errors=2, sql_per_request=4)], baseline, 0.2)
+    assert any("errors 0 -> 2" in m for m in messages)
+    assert any(m.startswith("scale 0.001 characters_page: rps") for m in messages)
+    assert any(": p99_ms" in m for m in messages)
+    assert any(": sql_per_request" in m for m in messages)
+    assert not any(": p95_ms" in m for m in messages)
+
+def test_compare_ignores_cases_missing_from_baseline():
+    baseline = {"results": [result(query="character_by_id")]}
+    assert compare([result(rps=1.0)], baseline, 0.2) == []
@@ -0,0 +1,89 @@
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from httpx import AsyncClient
+from src.main import app
+from src.auth import create_access_token
+from src.database import configure_pool, get_db_connection, init_db, DATABASE_NAME
+from src.seed import seed_data
+from src.cache import clear_caches
+
+@pytest.fixture
+async def client(tmp_path):
+    configure_pool(str(tmp_path / "bulk.db"))
+    init_db()
+    seed_data()
+    token = create_access_token({"sub": "admin", "role": "admin"})
+    async with AsyncClient(app=app, base_url="http://test", headers={"Authorization": f"Bearer {token}"}) as client:
+        yield client
+    clear_caches()
+    configure_pool(DATABASE_NAME)
+
+async def execute(client, query, variables):
+    response = await client.post("/graphql/", json={"query": query, "variables": variables})
+    body = response.json()
+    assert "errors" not in body, body
+    return body["data"]
+
+CREATE_CHARACTERS = """
+mutation ($inputs: [CreateCharacterInput!]!) {
+  createCharacters(inputs: $inputs) { index error character { id name homePlanet { name } } }
+}
+"""
+
+async def test_create_characters_reports_per_item_errors(client):
+    inputs = [
+        {"name": "Rey", "species": "Human", "homePlanetId": 1},
+        {"name": "Luke Skywalker"},
+        {"name": "Finn", "homePlanetId": 999},
+        {"name": "Rey"},
+        {"name": "   "},
+        {"name": "Poe Dameron"},
+    ]
+    results = (await execute(client, CREATE_CHARACTERS, {"inputs": inputs}))["createCharacters"]
+    assert [r["index"] for r in results] == list(range(6))
+    assert results[0]["character"]["homePlanet"]["name"] == "Tatooine"
+    assert "sudah ada" in results[1]["error"]
+    assert "tidak ditemukan" in results[2]["error"]
+    assert "lebih dari sekali" in results[3]["error"]
+    assert results[4]["error"].startswith("Validation error")
+    assert results[5]["character"]["name"] == "Poe Dameron"
+    assert [r["character"] is None for r in results] == [False, True, True, True, True, False]
+
+async def test_create_planets_in_bulk(client):
+    inputs = [{"name": f"Bulk Planet {i}", "climate": "Arid"} for i in range(500)]
+    results = (await execute(client, """
+        mutation ($inputs: [CreatePlanetInput!]!) {
+          createPlanets(inputs: $inputs) { index error planet { id name } }
+        }""", {"inputs": inputs}))["createPlanets"]
+    assert all(r["error"] is None for r in results)
+    assert [r["planet"]["name"] for r in results] == [i["name"] for i in inputs]
+
+    conn = get_db_connection()
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM planets WHERE name LIKE 'Bulk Planet %'").fetchone()[0] == 500
+    finally:
+        conn.close()
+
+async def test_assign_starships_in_bulk(client):
+    results = (await execute(client, """
+        mutation ($inputs: [AssignStarshipInput!]!) {
+          assignStarships(inputs: $inputs) { index error character { name pilotedStarships { name } } }
+        }""", {"inputs": [
+            {"characterId": "2", "starshipId": "1"},
+            {"characterId": "2", "starshipId": "999"},
+            {"characterId": "999", "starshipId": "1"},
+        ]}))["assignStarships"]
+    assert results[0]["error"] is None
+    assert results[0]["character"]["name"] == "Leia Organa"
+    assert "Kapal" in results[1]["error"]
+    assert "Karakter" in results[2]["error"]
+
+async def test_bulk_requires_auth(client):
+    del client.headers["Authorization"]
+    response = await client.post("/graphql/", json={
+        "query": 'mutation { createStarships(inputs: [{name: "X"}]) { index } }'
+    })
+    assert "Authentication required" in response.json()["errors"][0]["message"]
@@ -0,0 +1,75 @@
+import pytest
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.cache import TTLCache, MISSING
+
+def test_get_and_set():
+    cache = TTLCache(max_size=10, ttl=60)
+    assert cache.get("a") is MISSING
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_lru_eviction():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_expiry():
+    cache = TTLCache(max_size=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is MISSING
+    assert cache.stats()["expirations"] == 1
+
+def test_invalidate_tag():
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.set("residents:1", [], tags=["planet:1", "character:5"])
+    cache.set("residents:2", [], tags=["planet:2"])
+    assert cache.invalidate_tag("character:5") == 1
+    assert cache.get("residents:1") is MISSING
+    assert cache.get("residents:2") == []
+
+def test_disabled_cache():
+    cache = TTLCache(max_size=0, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") is MISSING
+
+def test_set_refused_after_invalidation_since_generation():
+    cache = TTLCache(max_size=10, ttl=60)
+    token = cache.generation()
+    cache.delete("a")
+    cache.set("a", "stale", generation=token)
+    assert cache.get("a") is MISSING
+    assert cache.stats()["stale_writes"] == 1
+
+    token = cache.generation()
+    cache.set("a", "fresh", generation=token)
+    assert cache.get("a") == "fresh"
+
+def test_tag_generation_only_covers_its_tags():
+    cache = TTLCache(max_size=10, ttl=60)
+    token = cache.generation(["table:planets"])
+    cache.invalidate_tag("table:starships")
+    cache.set("q1", 1, tags=["table:planets"], generation=token)
+    assert cache.get("q1") == 1
+
+    token = cache.generation(["table:planets"])
+    cache.invalidate_tag("table:planets")
+    cache.set("q2", 2, tags=["table:planets"], generation=token)
+    assert cache.get("q2") is MISSING
+
+    token = cache.generation(["table:planets"])
+    cache.clear()
+    cache.set("q3", 3, tags=["table:planets"], generation=token)
+    assert cache.get("q3") is MISSING
@@ -0,0 +1,130 @@
+import pytest
+import sys
+import threading
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import (
+    ConnectionPool, PoolTimeoutError, get_db_connection, get_pool_stats,
+    configure_pool, ensure_db, get_schema_version, SCHEMA_VERSION, DATABASE_NAME,
+)
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=2, timeout=0.2)
+    conn = pool.acquire()
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.commit()
+    conn.close()
+    yield pool
+    pool.close_all()
+
+def test_connection_is_reused(pool):
+    first = pool.acquire()
+    first.close()
+    second = pool.acquire()
+    assert second is first
+    second.close()
+    assert pool.stats()["created"] == 1
+
+def test_pool_stats(pool):
+    conn = pool.acquire()
+    stats = pool.stats()
+    assert stats["in_use"] == 1
+    assert stats["idle"] == 0
+    conn.close()
+    stats = pool.stats()
+    assert stats["in_use"] == 0
+    assert stats["idle"] == 1
+
+def test_checkout_timeout(pool):
+    a = pool.acquire()
+    b = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    assert pool.stats()["timeouts"] == 1
+    a.close()
+    b.close()
+
+def test_waiter_gets_released_connection(pool):
+    a = pool.acquire()
+    b = pool.acquire()
+    borrowed = []
+
+    def borrow():
+        conn = pool.acquire(timeout=2)
+        borrowed.append(conn)
+        conn.close()
+
+    thread = threading.Thread(target=borrow)
+    thread.start()
+    a.close()
+    thread.join()
+    assert borrowed == [a]
+    b.close()
+
+def test_uncommitted_work_is_rolled_back_on_release(pool):
+    conn = pool.acquire()
+    conn.execute("INSERT INTO items (name) VALUES ('pending')")
+    conn.close()
+    conn = pool.acquire()
+    assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+    conn.close()
+
+def test_unhealthy_connection_is_replaced(pool):
+    pool.health_check_interval = 0
+    conn = pool.acquire()
+    conn.close()
+    sqlite3_close = super(type(conn), conn).close
+    sqlite3_close()
+    replacement = pool.acquire()
+    assert replacement is not conn
+    assert replacement.execute("SELECT 1").fetchone()[0] == 1
+    replacement.close()
+    assert pool.stats()["discarded"] == 1
+
+def test_get_db_connection_borrows_from_shared_pool():
+    conn = get_db_connection()
+    assert get_pool_stats()["in_use"] >= 1
+    conn.close()
+
+def test_ensure_db_runs_ddl_only_when_version_is_behind(tmp_path):
+    configure_pool(str(tmp_path / "fresh.db"))
+    try:
+        assert get_schema_version() == 0
+        assert ensure_db() is True
+        assert get_schema_version() == SCHEMA_VERSION
+        assert ensure_db() is False
+    finally:
+        configure_pool(DATABASE_NAME)
+
+def test_profile_applied_to_every_connection(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "profile.db"), size=2, pragmas={
+        "journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -4000,
+        "mmap_size": 0, "temp_store": "MEMORY", "busy_timeout": 1234,
+    })
+    try:
+        first, second = pool.acquire(), pool.acquire()
+        for conn in (first, second):
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -4000
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+        first.close()
+        second.close()
+        assert pool.profile()["effective"]["temp_store"] == 2
+    finally:
+        pool.close_all()
+
+def test_profile_rejects_unknown_values(tmp_path):
+    with pytest.raises(ValueError):
+        ConnectionPool(str(tmp_path / "bad.db"), pragmas={"synchronous": "SOMETIMES"})
+
+def test_wal_checkpoint(pool):
+    conn = pool.acquire()
+    conn.execute("INSERT INTO items (name) VALUES ('x')")
+    conn.commit()
+    conn.close()
+    result = pool.checkpoint("TRUNCATE")
+    assert result["busy"] == 0
+    assert pool.profile()["checkpoints"] == 1
@@ -0,0 +1,194 @@
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import configure_pool, get_db_connection, init_db, DATABASE_NAME
+from src.dataloaders import (
+    CharacterLoader, PlanetLoader, PlanetResidentsLoader, StarshipPilotsLoader, CharacterStarshipsLoader, summarize_loaders,
+)
+from src.resolvers import create_dataloaders, get_dataloaders, resolve_all_characters
+from src.cache import clear_caches, invalidate_relations, MISSING
+from src.config import DATALOADER_MAX_BATCH_SIZE
+
+@pytest.fixture
+def populated_db(tmp_path):
+    configure_pool(str(tmp_path / "loaders.db"))
+    clear_caches()
+    init_db()
+    conn = get_db_connection()
+    conn.executemany(
+        "INSERT INTO planets (id, name) VALUES (?, ?)",
+        [(1, "Tatooine"), (2, "Naboo"), (3, "Hoth")],
+    )
+    conn.executemany(
+        "INSERT INTO characters (id, name, home_planet_id) VALUES (?, ?, ?)",
+        [(i, f"Resident {i}", 1 if i <= 6 else 2) for i in range(1, 10)],
+    )
+    conn.executemany("INSERT INTO starships (id, name) VALUES (?, ?)", [(1, "X-wing"), (2, "Falcon")])
+    conn.executemany(
+        "INSERT INTO character_starships (character_id, starship_id) VALUES (?, ?)",
+        [(1, 1), (2, 1), (3, 1), (4, 2)],
+    )
+    conn.commit()
+    conn.close()
+    yield
+    clear_caches()
+    configure_pool(DATABASE_NAME)
+
+async def test_residents_without_window_returns_all(populated_db):
+    loader = PlanetResidentsLoader()
+    residents = await loader.load(1)
+    assert [r['id'] for r in residents] == [1, 2, 3, 4, 5, 6]
+
+async def test_residents_window_limits_each_parent(populated_db):
+    loader = PlanetResidentsLoader(first=2)
+    tatooine, naboo, hoth = await asyncio.gather(loader.load(1), loader.load(2), loader.load(3))
+    assert [r['id'] for r in tatooine] == [1, 2]
+    assert [r['id'] for r in naboo] == [7, 8]
+    assert hoth == []
+
+async def test_residents_window_after(populated_db):
+    loader = PlanetResidentsLoader(first=2, after=2)
+    residents = await loader.load(1)
+    assert [r['id'] for r in residents] == [3, 4]
+
+async def test_window_batches_parents_in_one_call(populated_db):
+    calls = []
+
+    class CountingLoader(StarshipPilotsLoader):
+        def _load(self, keys):
+            calls.append(list(keys))
+            return super()._load(keys)
+
+    loader = CountingLoader(first=1)
+    x_wing, falcon = await asyncio.gather(loader.load(1), loader.load(2))
+    assert [p['id'] for p in x_wing] == [1]
+    assert [p['id'] for p in falcon] == [4]
+    assert calls == [[1, 2]]
+
+async def test_character_starships_window(populated_db):
+    loader = CharacterStarshipsLoader(first=1)
+    starships = await loader.load(1)
+    assert [s['name'] for s in starships] == ["X-wing"]
+
+async def test_entities_are_shared_across_requests(populated_db):
+    calls = []
+
+    class CountingLoader(PlanetLoader):
+        def _load(self, keys):
+            calls.append(list(keys))
+            return super()._load(keys)
+
+    first_request = await CountingLoader().load_many([1, 2])
+    second_request = await CountingLoader().load_many([2, 3])
+    assert [p['name'] for p in first_request] == ["Tatooine", "Naboo"]
+    assert [p['name'] for p in second_request] == ["Naboo", "Hoth"]
+    assert calls == [[1, 2], [3]]
+
+async def test_relation_list_invalidated_by_member(populated_db):
+    residents = await PlanetResidentsLoader().load(1)
+    assert len(residents) == 6
+
+    conn = get_db_connection()
+    conn.execute("UPDATE characters SET home_planet_id = 2 WHERE id = 1")
+    conn.commit()
+    conn.close()
+
+    assert len(await PlanetResidentsLoader().load(1)) == 6
+    invalidate_relations('planet_residents', 'character', 1)
+    assert len(await PlanetResidentsLoader().load(1)) == 5
+
+async def test_loader_stats_count_memo_cache_and_database(populated_db):
+    loader = PlanetLoader()
+    await asyncio.gather(loader.load(1), loader.load(1), loader.load(2))
+    assert (loader.stats.loads, loader.stats.memo_hits) == (3, 1)
+    assert (loader.stats.batches, loader.stats.batch_keys, loader.stats.db_keys) == (1, 2, 2)
+    assert loader.stats.sql_seconds > 0
+
+    second = PlanetLoader()
+    await asyncio.gather(second.load(1), second.load(3))
+    assert (second.stats.cache_hits, second.stats.db_keys) == (1, 1)
+
+    summary = summarize_loaders({"planets": loader, "other_planets": second, "unused": PlanetResidentsLoader()})
+    assert list(summary) == ["PlanetLoader"]
+    assert summary["PlanetLoader"]["loads"] == 5
+    assert summary["PlanetLoader"]["batches"] == 2
+    assert summary["PlanetLoader"]["avgBatchSize"] == 2.0
+    assert summary["PlanetLoader"]["dedupRatio"] == 0.2
+
+async def test_relation_rows_prime_entity_loaders(populated_db):
+    dataloaders = create_dataloaders()
+    await asyncio.gather(dataloaders['planet_residents'].load(2), dataloaders['character_starships'].load(1))
+    characters, starships = dataloaders['characters'], dataloaders['starships']
+    assert (characters.stats.primed, starships.stats.primed) == (3, 1)
+
+    character, starship = await asyncio.gather(characters.load(8), starships.load(1))
+    assert character == {'id': 8, 'name': "Resident 8", 'species': None, 'home_planet_id': 2}
+    assert starship['name'] == "X-wing"
+    assert characters.stats.batches == starships.stats.batches == 0
+
+async def test_root_resolver_primes_only_complete_rows(populated_db):
+    class MockInfo:
+        def __init__(self):
+            self.context = {}
+
+    info = MockInfo()
+    await resolve_all_characters(None, info)
+    assert get_dataloaders(info)['characters'].stats.primed == 9
+
+    partial = {'id': 1, 'name': "Resident 1"}
+    loader = CharacterLoader()
+    loader.prime_row(partial)
+    assert loader.stats.primed == 0
+
+async def test_oversized_batches_are_split_into_chunks(populated_db):
+    calls = []
+
+    class CountingLoader(CharacterLoader):
+        def _load(self, keys):
+            calls.append(list(keys))
+            return super()._load(keys)
+
+    characters = await CountingLoader(max_batch_size=4).load_many(list(range(1, 10)))
+    assert [c['id'] for c in characters] == list(range(1, 10))
+    assert sorted(calls) == [[1, 2, 3, 4], [5, 6, 7, 8], [9]]
+
+async def test_windowed_relation_chunks_keep_per_parent_windows(populated_db):
+    loader = PlanetResidentsLoader(first=2, max_batch_size=1)
+    tatooine, naboo = await asyncio.gather(loader.load(1), loader.load(2))
+    assert [r['id'] for r in tatooine] == [1, 2]
+    assert [r['id'] for r in naboo] == [7, 8]
+    assert loader.stats.batches == 2
+
+async def test_default_max_batch_size_bounds_in_lists(populated_db):
+    calls = []
+
+    class CountingLoader(PlanetLoader):
+        def _load(self, keys):
+            calls.append(len(keys))
+            return super()._load(keys)
+
+    planets = await CountingLoader().load_many(list(range(1, 1201)))
+    assert [p['name'] for p in planets if p] == ["Tatooine", "Naboo", "Hoth"]
+    assert sum(calls) == 1200
+    assert max(calls) <= DATALOADER_MAX_BATCH_SIZE
+
+async def test_mutation_during_load_is_not_cached(populated_db):
+    from src.cache import entity_cache, invalidate_entity
+
+    class RacingLoader(PlanetLoader):
+        def _load(self, keys):
+            rows = super()._load(keys)
+            # A mutation commits and invalidates while this read is in flight
+            conn = get_db_connection()
+            conn.execute("UPDATE planets SET name = 'Tatooine II' WHERE id = 1")
+            conn.commit()
+            conn.close()
+            invalidate_entity('planets', 1)
+            return rows
+
+    assert (await RacingLoader().load(1))['name'] == "Tatooine"
+    assert entity_cache['planets'].get(1) is MISSING
+    assert (await PlanetLoader().load(1))['name'] == "Tatooine II"
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from graphql import specified_rules, build_schema
+from src.main import schema
+from src.document_cache import DocumentCache
+from src.query_cost import query_cost_rule
+
+QUERY = "{ allPlanets { name } }"
+
+def test_repeated_query_reuses_document():
+    cache = DocumentCache(max_size=10)
+    first = cache.parse(None, {"query": QUERY})
+    second = cache.parse(None, {"query": QUERY})
+    assert first is second
+    assert cache.stats()["parse_hits"] == 1
+
+def test_validation_result_is_cached():
+    cache = DocumentCache(max_size=10)
+    document = cache.parse(None, {"query": QUERY})
+    assert cache.validate(schema, document, specified_rules) == []
+    assert cache.validate(schema, document, specified_rules) == []
+    stats = cache.stats()
+    assert stats["validation_hits"] == 1
+    assert stats["validation_misses"] == 1
+
+def test_validation_errors_are_cached():
+    cache = DocumentCache(max_size=10)
+    document = cache.parse(None, {"query": "{ nope }"})
+    assert cache.validate(schema, document, specified_rules)
+    assert cache.validate(schema, document, specified_rules)
+    assert cache.stats()["validation_hits"] == 1
+
+def test_custom_rules_always_run():
+    cache = DocumentCache(max_size=10)
+    document = cache.parse(None, {"query": "{ allCharacters { name homePlanet { name } } }"})
+    rule = query_cost_rule({}, {}, None, max_depth=1, max_cost=10000)
+    rules = tuple(specified_rules) + (rule,)
+    assert cache.validate(schema, document, rules)
+    assert cache.validate(schema, document, rules)
+
+def test_schema_change_invalidates():
+    cache = DocumentCache(max_size=10)
+    document = cache.parse(None, {"query": QUERY})
+    cache.validate(schema, document, specified_rules)
+    other = build_schema("type Query { allPlanets: [String] }")
+    assert cache.validate(other, document, specified_rules)
+    assert cache.stats()["validation_misses"] == 2
+    assert cache.stats()["size"] == 0
+
+def test_size_bound():
+    cache = DocumentCache(max_size=2)
+    for name in ("a", "b", "c"):
+        cache.parse(None, {"query": f"{{ {name} }}"})
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["evictions"] == 1
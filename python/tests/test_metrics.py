@@ -0,0 +1,90 @@
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from httpx import AsyncClient
+from src.main import app
+from src.database import configure_pool, get_db_connection, init_db, DATABASE_NAME
+from src.seed import generate_data
+from src.metrics import Counter, Histogram, normalize_sql, operation_label, registry
+
+@pytest.fixture
+def seeded_db(tmp_path):
+    configure_pool(str(tmp_path / "metrics.db"))
+    init_db()
+    generate_data(planets=5, characters=50, starships=5, pilots=50)
+    registry.clear()
+    yield tmp_path
+    configure_pool(DATABASE_NAME)
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(("a",), value)
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{route="a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="a",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{route="a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="a"} 4' in lines
+
+def test_series_beyond_limit_fold_into_other():
+    counter = Counter("ops_total", "Ops.", ("operation",), max_series=2)
+    for name in ("a", "b", "c", "d"):
+        counter.inc((name,))
+    assert counter.value(("a",)) == 1
+    assert counter.value(("other",)) == 2
+
+def test_label_values_are_escaped():
+    counter = Counter("ops_total", "Ops.", ("operation",))
+    counter.inc(('say "hi"\n',))
+    assert counter.render()[-1] == 'ops_total{operation="say \\"hi\\"\\n"} 1'
+
+def test_normalize_sql():
+    assert normalize_sql("SELECT *  FROM planets\n WHERE id IN (?, ?, ?)") == "SELECT * FROM planets WHERE id IN (?, ...)"
+    assert normalize_sql("SELECT * FROM planets WHERE id IN (?)") == "SELECT * FROM planets WHERE id IN (?, ...)"
+    assert normalize_sql("SELECT * FROM planets WHERE name = 'Naboo' LIMIT 10") == "SELECT * FROM planets WHERE name = ? LIMIT ?"
+
+def test_operation_label():
+    assert operation_label({"operationName": "GetHero"}) == "GetHero"
+    assert operation_label({"query": "{ a }"}) == "anonymous"
+    assert operation_label({"operationName": "drop table; --"}) == "invalid"
+
+def test_sql_observer_counts_rows(seeded_db):
+    conn = get_db_connection()
+    try:
+        conn.execute("SELECT id FROM characters WHERE id IN (?, ?, ?)", (1, 2, 3)).fetchall()
+    finally:
+        conn.close()
+    text = registry.render()
+    assert 'sql_rows_returned_total{statement="SELECT id FROM characters WHERE id IN (?, ...)"} 3' in text
+    assert 'sql_statement_duration_seconds_count{statement="SELECT id FROM characters WHERE id IN (?, ...)"} 1' in text
+
+async def test_metrics_endpoint(seeded_db):
+    query = "query Heroes { characters(first: 3) { edges { node { name homePlanet { name } } } } }"
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/graphql/", json={"query": query, "operationName": "Heroes"})
+        assert response.status_code == 200
+        response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'graphql_requests_total{operation="Heroes",status="success"} 1' in text
+    assert 'graphql_request_duration_seconds_count{operation="Heroes"} 1' in text
+    assert 'graphql_resolver_duration_seconds_count{type="Character",field="homePlanet"} 3' in text
+    assert "graphql_response_serialization_seconds_count 1" in text
+    assert "# TYPE db_pool_in_use gauge" in text
+
+async def test_dataloader_debug_extension(seeded_db):
+    query = "{ starships(first: 5) { edges { node { pilots { homePlanet { name } } } } } }"
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        plain = (await client.post("/graphql/", json={"query": query})).json()
+        debug = (await client.post(
+            "/graphql/", json={"query": query}, headers={"X-Debug-DataLoaders": "1"},
+        )).json()
+        text = (await client.get("/metrics")).text
+    assert "dataloaders" not in plain["extensions"]
+    planets = debug["extensions"]["dataloaders"]["PlanetLoader"]
+    assert planets["loads"] > 0
+    assert planets["loads"] == planets["memoHits"] + planets["cacheHits"] + planets["databaseKeys"]
+    assert 'dataloader_batch_size_count{loader="PlanetLoader"} 2' in text
@@ -0,0 +1,60 @@
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import init_db
+from src.seed import seed_data
+from src.pagination import encode_cursor, decode_cursor
+from src.resolvers import resolve_characters_connection, resolve_connection_total_count
+
+@pytest.fixture(scope="module")
+def setup_database():
+    init_db()
+    seed_data()
+    yield
+
+@pytest.fixture
+def mock_info():
+    class MockInfo:
+        def __init__(self):
+            self.context = {}
+    return MockInfo()
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42
+
+def test_invalid_cursor():
+    with pytest.raises(Exception):
+        decode_cursor("not-a-cursor")
+
+async def test_forward_pagination_covers_all_rows(setup_database, mock_info):
+    names, after = [], None
+    while True:
+        page = await resolve_characters_connection(None, mock_info, first=2, after=after)
+        names.extend(edge["node"]["name"] for edge in page["edges"])
+        if not page["pageInfo"]["hasNextPage"]:
+            break
+        after = page["pageInfo"]["endCursor"]
+    assert len(names) == 5
+    assert len(set(names)) == 5
+
+async def test_backward_pagination(setup_database, mock_info):
+    last_page = await resolve_characters_connection(None, mock_info, last=2)
+    assert len(last_page["edges"]) == 2
+    assert last_page["pageInfo"]["hasPreviousPage"] is True
+    assert last_page["pageInfo"]["hasNextPage"] is False
+
+    previous = await resolve_characters_connection(
+        None, mock_info, last=2, before=last_page["pageInfo"]["startCursor"]
+    )
+    assert previous["pageInfo"]["hasNextPage"] is True
+    assert previous["edges"][-1]["node"]["id"] < last_page["edges"][0]["node"]["id"]
+
+async def test_first_and_last_together_rejected(setup_database, mock_info):
+    with pytest.raises(Exception):
+        await resolve_characters_connection(None, mock_info, first=1, last=1)
+
+async def test_total_count(setup_database, mock_info):
+    page = await resolve_characters_connection(None, mock_info, first=1)
+    assert await resolve_connection_total_count(page, mock_info) == 5
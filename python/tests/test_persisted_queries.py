@@ -0,0 +1,77 @@
+import json
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from httpx import AsyncClient
+from src.main import app, graphql_app
+from src.database import init_db
+from src.seed import seed_data
+from src.persisted_queries import PersistedQueryStore, PersistedQueryError, query_hash, NOT_REGISTERED
+
+QUERY = "{ allPlanets { name } }"
+
+def persisted(sha):
+    return {"extensions": {"persistedQuery": {"version": 1, "sha256Hash": sha}}}
+
+def test_store_is_bounded():
+    store = PersistedQueryStore(max_size=2)
+    for query in ("{ a }", "{ b }", "{ c }"):
+        store.register(query_hash(query), query)
+    assert store.get(query_hash("{ a }")) is None
+    assert store.get(query_hash("{ c }")) == "{ c }"
+
+def test_manifest_formats(tmp_path):
+    plain = tmp_path / "plain.json"
+    plain.write_text(json.dumps({query_hash(QUERY): QUERY}))
+    apollo = tmp_path / "apollo.json"
+    apollo.write_text(json.dumps({"operations": [{"id": query_hash("{ b }"), "body": "{ b }"}]}))
+
+    store = PersistedQueryStore(strict=True)
+    assert store.load_manifest(plain) == 1
+    assert store.load_manifest(apollo) == 1
+    assert store.get(query_hash(QUERY)) == QUERY
+
+def test_manifest_rejects_wrong_hash(tmp_path):
+    manifest = tmp_path / "bad.json"
+    manifest.write_text(json.dumps({"0" * 64: QUERY}))
+    with pytest.raises(ValueError):
+        PersistedQueryStore().load_manifest(manifest)
+
+def test_strict_mode_rejects_unlisted_queries():
+    store = PersistedQueryStore(strict=True)
+    with pytest.raises(PersistedQueryError) as error:
+        store.resolve({"query": QUERY})
+    assert error.value.code == NOT_REGISTERED
+
+    store.register(query_hash(QUERY), QUERY)
+    with pytest.raises(PersistedQueryError):
+        store.resolve(persisted(query_hash(QUERY)))
+
+@pytest.fixture
+def seeded():
+    init_db()
+    seed_data()
+    store = graphql_app.http_handler.persisted_query_store = PersistedQueryStore()
+    yield store
+    del graphql_app.http_handler.persisted_query_store
+
+async def test_not_found_then_register_handshake(seeded):
+    sha = query_hash(QUERY)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/graphql/", json=persisted(sha))
+        assert response.status_code == 200
+        assert response.json()["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_NOT_FOUND"
+
+        response = await client.post("/graphql/", json={"query": QUERY, **persisted(sha)})
+        assert "Tatooine" in [p["name"] for p in response.json()["data"]["allPlanets"]]
+
+        response = await client.post("/graphql/", json=persisted(sha))
+        assert "Tatooine" in [p["name"] for p in response.json()["data"]["allPlanets"]]
+
+async def test_hash_mismatch_is_rejected(seeded):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/graphql/", json={"query": QUERY, **persisted("0" * 64)})
+        assert response.status_code == 400
+        assert response.json()["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_HASH_MISMATCH"
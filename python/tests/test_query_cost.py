@@ -0,0 +1,59 @@
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from graphql import parse, validate
+from src.main import schema
+from src.query_cost import query_cost_rule
+
+def analyze(query, variables=None, max_depth=10, max_cost=10000):
+    context = {}
+    rule = query_cost_rule(context, variables, max_depth=max_depth, max_cost=max_cost)
+    errors = validate(schema, parse(query), [rule])
+    return context.get("query_cost"), errors
+
+def test_scalar_fields_are_free():
+    cost, errors = analyze('{ character(id: "1") { id name species } }')
+    assert cost["cost"] == 1
+    assert cost["depth"] == 2
+    assert errors == []
+
+def test_list_fields_multiply_by_estimate():
+    cost, _ = analyze("{ allPlanets { residents { name } } }")
+    assert cost["cost"] == 1 + 20
+
+def test_pagination_arguments_drive_multiplier():
+    cost, _ = analyze(
+        "query ($n: Int) { allPlanets { residents(first: $n) { homePlanet { name } } } }",
+        variables={"n": 2},
+    )
+    assert cost["cost"] == 1 + 20 + 20 * 2
+
+def test_fragments_are_counted():
+    cost, _ = analyze("""
+        { allStarships { ...ShipFields } }
+        fragment ShipFields on Starship { pilots { name } }
+    """)
+    assert cost["cost"] == 1 + 20
+
+def test_depth_budget_rejects_operation():
+    _, errors = analyze(
+        "{ allPlanets { residents { homePlanet { residents { name } } } } }",
+        max_depth=3,
+    )
+    assert len(errors) == 1
+    assert "kedalaman" in errors[0].message
+
+def test_cost_budget_rejects_operation():
+    _, errors = analyze(
+        "{ allPlanets { residents { pilotedStarships { pilots { name } } } } }",
+        max_cost=100,
+    )
+    assert len(errors) == 1
+    assert "biaya" in errors[0].message
+
+def test_introspection_is_not_counted():
+    cost, errors = analyze("{ __schema { types { name fields { name } } } }", max_depth=1)
+    assert cost["cost"] == 0
+    assert errors == []
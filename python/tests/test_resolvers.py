@@ -24,39 +24,39 @@ def mock_info():
             self.context = type('obj', (object,), {'dataloaders': {}})()
     return MockInfo()
 
-def test_resolve_all_characters(setup_database, mock_info):
-    result = resolve_all_characters(None, mock_info)
+async def test_resolve_all_characters(setup_database, mock_info):
+    result = await resolve_all_characters(None, mock_info)
     assert isinstance(result, list)
     assert len(result) > 0
     assert 'name' in result[0]
 
-def test_resolve_character(setup_database, mock_info):
-    result = resolve_character(None, mock_info, "1")
+async def test_resolve_character(setup_database, mock_info):
+    result = await resolve_character(None, mock_info, "1")
     assert result is not None
     assert result['id'] == 1
     assert 'name' in result
 
-def test_resolve_character_not_found(setup_database, mock_info):
-    result = resolve_character(None, mock_info, "999")
+async def test_resolve_character_not_found(setup_database, mock_info):
+    result = await resolve_character(None, mock_info, "999")
     assert result is None
 
-def test_resolve_all_planets(setup_database, mock_info):
-    result = resolve_all_planets(None, mock_info)
+async def test_resolve_all_planets(setup_database, mock_info):
+    result = await resolve_all_planets(None, mock_info)
     assert isinstance(result, list)
     assert len(result) > 0
 
-def test_resolve_planet(setup_database, mock_info):
-    result = resolve_planet(None, mock_info, "1")
+async def test_resolve_planet(setup_database, mock_info):
+    result = await resolve_planet(None, mock_info, "1")
     assert result is not None
     assert result['id'] == 1
 
-def test_resolve_all_starships(setup_database, mock_info):
-    result = resolve_all_starships(None, mock_info)
+async def test_resolve_all_starships(setup_database, mock_info):
+    result = await resolve_all_starships(None, mock_info)
     assert isinstance(result, list)
     assert len(result) > 0
 
-def test_resolve_starship(setup_database, mock_info):
-    result = resolve_starship(None, mock_info, "1")
+async def test_resolve_starship(setup_database, mock_info):
+    result = await resolve_starship(None, mock_info, "1")
     assert result is not None
     assert result['id'] == 1
 
@@ -0,0 +1,131 @@
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from graphql import parse
+from httpx import AsyncClient
+from src.main import app, schema, graphql_app
+from src.database import configure_pool, get_db_connection, init_db, DATABASE_NAME
+from src.seed import seed_data
+from src.cache import clear_caches, invalidate_tables
+from src.response_cache import dealias, plan_query, realias
+
+def plan(query, variables=None, role="anonymous"):
+    return plan_query(schema, parse(query), {"query": query, "variables": variables}, role)
+
+def test_key_ignores_whitespace_and_aliases():
+    a = plan("{ allPlanets { name residents { name } } }")
+    b = plan("{\n  allPlanets {\n    n: name\n    residents { r: name }\n  }\n}")
+    assert a.key == b.key
+
+def test_key_includes_variables_and_role():
+    query = "query ($id: ID!) { planet(id: $id) { name } }"
+    assert plan(query, {"id": "1"}).key != plan(query, {"id": "2"}).key
+    assert plan(query, {"id": "1"}).key != plan(query, {"id": "1"}, role="admin").key
+
+def test_aliases_kept_when_they_disambiguate_arguments():
+    p = plan('{ a: planet(id: "1") { name } b: planet(id: "2") { name } }')
+    assert p.stripped is False
+
+def test_tables_read():
+    p = plan("{ allStarships { name pilots { name homePlanet { name } } } }")
+    assert p.tables == {"starships", "character_starships", "characters", "planets"}
+
+def test_mutations_are_not_cached():
+    assert plan('mutation { deletePlanet(id: "1") }') is None
+
+def test_realias_restores_requested_shape():
+    p = plan("{ allPlanets { n: name residents { r: name } } }")
+    data = {"allPlanets": [{"name": "Tatooine", "residents": [{"name": "Luke"}]}]}
+    assert realias(data, [p.operation.selection_set], p.fragments) == {
+        "allPlanets": [{"n": "Tatooine", "residents": [{"r": "Luke"}]}]
+    }
+
+def test_alias_free_key_computed_once_per_document():
+    from src.response_cache import _key_queries
+    query = "{ allPlanets { n: name } }"
+    document = parse(query)
+    hits = _key_queries.stats()["hits"]
+    first = plan_query(schema, document, {"query": query}, "anonymous")
+    second = plan_query(schema, document, {"query": query}, "anonymous")
+    assert first.key == second.key
+    assert second.document is document
+    assert _key_queries.stats()["hits"] == hits + 1
+
+def test_dealias_merges_fields_requested_under_several_aliases():
+    p = plan('{ x: planet(id: "1") { n: name } y: planet(id: "1") { climate } }')
+    data = {"x": {"n": "Tatooine"}, "y": {"climate": "arid"}}
+    assert dealias(data, [p.operation.selection_set], p.fragments) == {
+        "planet": {"name": "Tatooine", "climate": "arid"}
+    }
+
+@pytest.fixture
+def response_cache_enabled():
+    init_db()
+    seed_data()
+    graphql_app.http_handler.response_cache_enabled = True
+    yield
+    graphql_app.http_handler.response_cache_enabled = False
+    clear_caches()
+
+async def test_repeated_query_is_served_from_cache(response_cache_enabled):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        query = {"query": "{ allPlanets { name } }"}
+        first = (await client.post("/graphql/", json=query)).json()
+        second = (await client.post("/graphql/", json=query)).json()
+        assert "responseCache" not in first.get("extensions", {})
+        assert second["extensions"]["responseCache"] == "HIT"
+        assert second["data"] == first["data"]
+
+        invalidate_tables("planets")
+        third = (await client.post("/graphql/", json=query)).json()
+        assert "responseCache" not in third.get("extensions", {})
+
+@pytest.fixture
+def cached_planets(tmp_path):
+    configure_pool(str(tmp_path / "responses.db"))
+    clear_caches()
+    init_db()
+    conn = get_db_connection()
+    conn.execute("INSERT INTO planets (id, name) VALUES (1, 'Tatooine')")
+    conn.commit()
+    conn.close()
+    graphql_app.http_handler.response_cache_enabled = True
+    yield
+    graphql_app.http_handler.response_cache_enabled = False
+    clear_caches()
+    configure_pool(DATABASE_NAME)
+
+async def test_aliased_query_with_errors_keeps_aliases(cached_planets):
+    query = {"query": '{ x: planet(id: "1") { nm: name } y: planet(id: "1") { residents(first: 1000) { name } } }'}
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        body = (await client.post("/graphql/", json=query)).json()
+    assert body["data"] == {"x": {"nm": "Tatooine"}, "y": None}
+    assert body["errors"][0]["path"] == ["y", "residents"]
+
+async def test_aliased_query_cached_and_reshaped(cached_planets):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        first = (await client.post("/graphql/", json={"query": '{ p: planet(id: "1") { n: name } }'})).json()
+        second = (await client.post("/graphql/", json={"query": '{ planet(id: "1") { name } }'})).json()
+    assert first["data"] == {"p": {"n": "Tatooine"}}
+    assert second["extensions"]["responseCache"] == "HIT"
+    assert second["data"] == {"planet": {"name": "Tatooine"}}
+
+async def test_result_not_stored_when_mutation_lands_before_set(cached_planets, monkeypatch):
+    from src.response_cache import ResponseCacheMixin
+
+    normalize = ResponseCacheMixin._normalize
+
+    def racing_normalize(self, data, plan):
+        # A mutation commits and purges between execution and cache.set
+        invalidate_tables("planets")
+        return normalize(self, data, plan)
+
+    monkeypatch.setattr(ResponseCacheMixin, "_normalize", racing_normalize)
+    query = {"query": '{ planet(id: "1") { name } }'}
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        await client.post("/graphql/", json=query)
+        monkeypatch.setattr(ResponseCacheMixin, "_normalize", normalize)
+        second = (await client.post("/graphql/", json=query)).json()
+    assert "responseCache" not in second.get("extensions", {})
@@ -0,0 +1,56 @@
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import configure_pool, get_db_connection, init_db, DATABASE_NAME
+from src.seed import generate_data
+
+@pytest.fixture
+def empty_db(tmp_path):
+    configure_pool(str(tmp_path / "seed.db"))
+    init_db()
+    yield tmp_path
+    configure_pool(DATABASE_NAME)
+
+def fetch(sql):
+    conn = get_db_connection()
+    try:
+        return [tuple(row) for row in conn.execute(sql).fetchall()]
+    finally:
+        conn.close()
+
+def test_generate_data_counts(empty_db):
+    stats = generate_data(planets=50, characters=2000, starships=40, pilots=400)
+    assert fetch("SELECT COUNT(*) FROM planets") == [(50,)]
+    assert fetch("SELECT COUNT(*) FROM characters") == [(2000,)]
+    assert fetch("SELECT COUNT(*) FROM starships") == [(40,)]
+    # Duplicate (character, starship) draws are ignored, never exceeded
+    assert 0 < stats["pilots"] <= 400
+    assert fetch("SELECT COUNT(*) FROM character_starships") == [(stats["pilots"],)]
+    assert fetch("SELECT MIN(id), MAX(id) FROM characters") == [(1, 2000)]
+
+def test_generate_data_scale(empty_db):
+    stats = generate_data(scale=0.001, pilots=100)
+    assert (stats["planets"], stats["characters"], stats["starships"]) == (10, 1000, 50)
+
+def test_generate_data_is_deterministic(empty_db):
+    generate_data(seed=7, planets=20, characters=500, starships=10, pilots=100)
+    first = fetch("SELECT id, name, species, home_planet_id FROM characters ORDER BY id")
+    generate_data(seed=7, planets=20, characters=500, starships=10, pilots=100)
+    assert fetch("SELECT id, name, species, home_planet_id FROM characters ORDER BY id") == first
+    generate_data(seed=8, planets=20, characters=500, starships=10, pilots=100)
+    assert fetch("SELECT id, name, species, home_planet_id FROM characters ORDER BY id") != first
+
+def test_residents_are_skewed(empty_db):
+    generate_data(planets=100, characters=5000, starships=5, pilots=5, resident_skew=1.1)
+    residents = [n for (n,) in fetch(
+        "SELECT COUNT(c.id) AS n FROM planets p LEFT JOIN characters c ON c.home_planet_id = p.id "
+        "GROUP BY p.id ORDER BY n DESC"
+    )]
+    assert residents[0] > 10 * residents[len(residents) // 2]
+
+def test_generate_data_keeps_indexes(empty_db):
+    before = fetch("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL ORDER BY name")
+    generate_data(planets=5, characters=50, starships=5, pilots=20)
+    assert fetch("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL ORDER BY name") == before
@@ -0,0 +1,93 @@
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from httpx import AsyncClient
+from src.main import app
+from src.cache import clear_caches
+from src.database import add_sql_observer, configure_pool, get_db_connection, init_db, remove_sql_observer, DATABASE_NAME
+from src.selection import project
+
+@pytest.fixture
+def populated_db(tmp_path):
+    configure_pool(str(tmp_path / "selection.db"))
+    clear_caches()
+    init_db()
+    conn = get_db_connection()
+    conn.executemany(
+        "INSERT INTO planets (id, name, climate) VALUES (?, ?, ?)",
+        [(1, "Tatooine", "arid"), (2, "Naboo", "temperate")],
+    )
+    conn.executemany(
+        "INSERT INTO characters (id, name, species, home_planet_id) VALUES (?, ?, ?, ?)",
+        [(1, "Luke", "Human", 1), (2, "Padme", "Human", 2), (3, "R2-D2", "Droid", None), (4, "Lost", None, 99)],
+    )
+    conn.commit()
+    conn.close()
+    statements = []
+    handle = add_sql_observer(on_execute=lambda cursor, sql, seconds: statements.append(sql))
+    yield statements
+    remove_sql_observer(handle)
+    clear_caches()
+    configure_pool(DATABASE_NAME)
+
+async def graphql(query):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/graphql/", json={"query": query})
+    body = response.json()
+    assert "errors" not in body
+    return body["data"]
+
+def test_project_keeps_id_and_column_order():
+    columns = {"name": "name", "species": "species", "homePlanet": "home_planet_id"}
+    assert project({"homePlanet", "name"}, columns) == ["id", "name", "home_planet_id"]
+    assert project({"pilotedStarships"}, columns) == ["id"]
+    assert project(None, columns) == ["id", "name", "species", "home_planet_id"]
+
+async def test_home_planet_joined_in_one_statement(populated_db):
+    data = await graphql("{ allCharacters { name homePlanet { name climate } } }")
+    assert data["allCharacters"] == [
+        {"name": "Luke", "homePlanet": {"name": "Tatooine", "climate": "arid"}},
+        {"name": "Padme", "homePlanet": {"name": "Naboo", "climate": "temperate"}},
+        {"name": "R2-D2", "homePlanet": None},
+        {"name": "Lost", "homePlanet": None},
+    ]
+    assert len(populated_db) == 1
+    assert "LEFT JOIN planets" in populated_db[0]
+    assert "species" not in populated_db[0]
+
+async def test_only_selected_columns_are_read(populated_db):
+    data = await graphql("{ characters(first: 2) { edges { node { ...Names } } } }  fragment Names on Character { name }")
+    assert [edge["node"]["name"] for edge in data["characters"]["edges"]] == ["Luke", "Padme"]
+    page_query = populated_db[0]
+    assert page_query.startswith("SELECT characters.id, characters.name FROM characters ")
+    assert "JOIN" not in page_query
+
+async def test_joined_planet_primes_loader(populated_db):
+    data = await graphql(
+        "{ characters(first: 1) { edges { node { homePlanet { residents { homePlanet { name } } } } } } }"
+    )
+    residents = data["characters"]["edges"][0]["node"]["homePlanet"]["residents"]
+    assert residents == [{"homePlanet": {"name": "Tatooine"}}]
+    assert not any("FROM planets WHERE id IN" in sql for sql in populated_db)
+
+def test_collect_fields_follows_type_conditions_and_stops_cycles():
+    from graphql import parse
+    from src.main import schema
+    from src.response_cache import plan_query
+    from src.selection import collect_fields
+
+    query = (
+        "{ allPlanets { ...P } } "
+        "fragment P on Planet { name ... on Planet { climate } residents { homePlanet { ...P } } }"
+    )
+    document = parse(query)
+    fragments = {d.name.value: d for d in document.definitions[1:]}
+    planet = schema.get_type("Planet")
+    fields = list(collect_fields([document.definitions[0].selection_set.selections[0].selection_set], fragments, schema, planet))
+    assert [(f.name.value, t.name, sorted(seen)) for f, t, seen in fields] == [
+        ("name", "Planet", ["P"]), ("climate", "Planet", ["P"]), ("residents", "Planet", ["P"]),
+    ]
+    # Cyclic fragments are rejected later by validation; planning must not recurse forever
+    assert plan_query(schema, document, {"query": query}, "anonymous").tables == {"planets", "characters"}
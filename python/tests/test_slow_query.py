@@ -0,0 +1,115 @@
+import logging
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import (
+    configure_pool, get_db_connection, init_db, add_sql_observer, remove_sql_observer, DATABASE_NAME,
+)
+from src.executor import current_operation, run_db
+from src.seed import generate_data
+from src.slow_query import SlowQueryLog, analyze_plan
+
+class Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+@pytest.fixture
+def slow_log(tmp_path):
+    configure_pool(str(tmp_path / "slow.db"))
+    init_db()
+    generate_data(planets=5, characters=200, starships=5, pilots=20)
+    logger = logging.getLogger("test.slow_query")
+    logger.propagate = False
+    capture = Capture()
+    logger.addHandler(capture)
+    log = SlowQueryLog(threshold_ms=0, logger=logger)
+    handle = add_sql_observer(log.on_execute, log.on_fetch)
+    yield log, capture.records
+    remove_sql_observer(handle)
+    logger.removeHandler(capture)
+    configure_pool(DATABASE_NAME)
+
+def query(sql, params=()):
+    conn = get_db_connection()
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+def test_full_scan_is_flagged(slow_log):
+    log, records = slow_log
+    query("SELECT id FROM characters WHERE species = ?", ("Human",))
+    entry = records[-1]
+    assert entry.statement == "SELECT id FROM characters WHERE species = ?"
+    assert entry.parameter_count == 1
+    assert entry.full_scan is True
+    assert entry.scanned_tables == ["characters"]
+    # Already over the threshold at execute, before any row was fetched
+    assert entry.rows is None
+
+def test_index_lookup_is_not_flagged(slow_log):
+    log, records = slow_log
+    query("SELECT id FROM characters WHERE home_planet_id IN (?, ?)", (1, 2))
+    assert records[-1].full_scan is False
+    assert any("USING" in step for step in records[-1].plan)
+
+def test_plan_is_captured_once_per_shape(slow_log):
+    log, records = slow_log
+    query("SELECT id FROM planets WHERE id IN (?)", (1,))
+    query("SELECT id FROM planets WHERE id IN (?, ?, ?)", (1, 2, 3))
+    assert log.stats()["plans"] == 1
+    assert records[-1].plan == records[-2].plan
+
+def test_rows_counted_when_fetching_crosses_threshold(slow_log):
+    log, records = slow_log
+    log.threshold = 1e-9
+    conn = get_db_connection()
+    try:
+        cursor = conn.execute("SELECT id FROM characters")
+        cursor.elapsed = 0.0
+        records.clear()
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+    assert records[-1].rows == len(rows) == 200
+
+def test_write_reports_rowcount(slow_log):
+    log, records = slow_log
+    conn = get_db_connection()
+    try:
+        conn.execute("UPDATE characters SET species = ? WHERE home_planet_id = ?", ("Droid", 1))
+        conn.commit()
+    finally:
+        conn.close()
+    assert records[-1].statement == "UPDATE characters SET species = ? WHERE home_planet_id = ?"
+    assert records[-1].rows == len(query("SELECT id FROM characters WHERE home_planet_id = 1"))
+
+def test_fast_queries_are_not_logged(slow_log):
+    log, records = slow_log
+    log.threshold = 10.0
+    query("SELECT id FROM characters WHERE species = ?", ("Human",))
+    assert records == []
+
+async def test_entry_carries_operation_and_source(slow_log):
+    log, records = slow_log
+
+    def find_humans():
+        return query("SELECT id FROM characters WHERE species = ?", ("Human",))
+
+    current_operation.set("GetHumans")
+    await run_db(find_humans)
+    assert records[-1].operation == "GetHumans"
+    assert records[-1].source.endswith("find_humans")
+
+def test_analyze_plan():
+    assert analyze_plan(["SCAN TABLE characters"])["scanned_tables"] == ["characters"]
+    assert analyze_plan(["SCAN characters USING COVERING INDEX idx"])["full_scan"] is False
+    assert analyze_plan(["SCAN (subquery-1)", "USE TEMP B-TREE FOR ORDER BY"]) == {
+        "full_scan": False, "scanned_tables": [], "temp_btree": True,
+    }
@@ -0,0 +1,124 @@
+import io
+import json
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import configure_pool, get_db_connection, init_db, DATABASE_NAME
+from src.transfer import import_records, export_rows, read_records, main, PartialImportError
+
+@pytest.fixture
+def empty_db(tmp_path):
+    configure_pool(str(tmp_path / "transfer.db"))
+    init_db()
+    yield tmp_path
+    configure_pool(DATABASE_NAME)
+
+def count(table):
+    conn = get_db_connection()
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+def test_import_resolves_references_by_name(empty_db):
+    import_records("planets", [{"name": "Tatooine"}, {"name": "Naboo", "climate": "Temperate"}])
+    stats = import_records("characters", [
+        {"name": "Luke", "homePlanet": "Tatooine"},
+        {"name": "Padme", "homePlanet": "Naboo"},
+        {"name": "Han", "homePlanet": "Corellia"},
+    ], chunk_size=2)
+    assert stats["rows"] == 3
+    assert stats["unresolved"] == 1
+
+    import_records("starships", [{"name": "X-wing"}])
+    stats = import_records("character_starships", [
+        {"character": "Luke", "starship": "X-wing"},
+        {"character": "Nobody", "starship": "X-wing"},
+    ])
+    assert stats["rows"] == 1
+    assert stats["skipped"] == 1
+
+    out = io.StringIO()
+    export_rows("characters", out, "ndjson")
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert rows == [
+        {"name": "Luke", "species": None, "homePlanet": "Tatooine"},
+        {"name": "Padme", "species": None, "homePlanet": "Naboo"},
+        {"name": "Han", "species": None, "homePlanet": None},
+    ]
+
+def test_drop_indexes_rebuilds_them(empty_db):
+    records = ({"name": f"Character {i}"} for i in range(2500))
+    stats = import_records("characters", records, chunk_size=1000, drop_indexes=True)
+    assert stats["rows"] == 2500
+    conn = get_db_connection()
+    try:
+        indexes = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'characters'"
+        )}
+    finally:
+        conn.close()
+    assert {"idx_characters_home_planet", "idx_characters_name"} <= indexes
+
+def test_conflict_policy(empty_db):
+    import_records("planets", [{"name": "Hoth"}])
+    with pytest.raises(Exception):
+        import_records("planets", [{"name": "Hoth"}])
+    assert import_records("planets", [{"name": "Hoth"}, {"name": "Endor"}], on_conflict="ignore")["rows"] == 2
+    assert count("planets") == 2
+
+def test_replace_keeps_ids_and_references(empty_db):
+    import_records("planets", [{"name": "Tatooine", "climate": "arid"}, {"name": "Naboo"}])
+    import_records("characters", [{"name": "Luke", "homePlanet": "Tatooine"}])
+    import_records("starships", [{"name": "X-wing"}])
+    import_records("character_starships", [{"character": "Luke", "starship": "X-wing"}])
+
+    stats = import_records("planets", [{"name": "Tatooine", "climate": "desert"}, {"name": "Hoth"}], on_conflict="replace")
+    assert stats["rows"] == 2
+    import_records("characters", [{"name": "Luke", "species": "Human", "homePlanet": "Tatooine"}], on_conflict="replace")
+    import_records("character_starships", [{"character": "Luke", "starship": "X-wing"}], on_conflict="replace")
+
+    conn = get_db_connection()
+    try:
+        row = conn.execute(
+            "SELECT c.id, c.species, p.id AS planet_id, p.climate FROM characters c "
+            "JOIN planets p ON p.id = c.home_planet_id WHERE c.name = 'Luke'"
+        ).fetchone()
+        pilots = conn.execute("SELECT character_id FROM character_starships").fetchall()
+    finally:
+        conn.close()
+    assert (row["id"], row["species"], row["planet_id"], row["climate"]) == (1, "Human", 1, "desert")
+    assert [p[0] for p in pilots] == [1]
+    assert count("planets") == 3
+
+def test_failed_import_reports_committed_rows_and_clears_caches(empty_db):
+    from src.cache import entity_cache, MISSING
+    entity_cache["planets"].set(1, {"id": 1, "name": "Stale"})
+    records = [{"name": "A"}, {"name": "B"}, {"name": "C"}, {"name": "D"}, {"name": "A"}]
+    with pytest.raises(PartialImportError) as error:
+        import_records("planets", records, chunk_size=2)
+    assert error.value.stats["rows"] == 4
+    assert count("planets") == 4
+    assert entity_cache["planets"].get(1) is MISSING
+
+def test_cli_exits_nonzero_after_partial_import(empty_db, capsys):
+    source = empty_db / "planets.ndjson"
+    source.write_text('{"name": "A"}\n{"name": "B"}\n{"name": "A"}\n')
+    with pytest.raises(SystemExit) as exit_info:
+        main(["import", "planets", str(source), "--chunk-size", "2", "--quiet"])
+    assert exit_info.value.code == 1
+    assert "2 rows were committed" in capsys.readouterr().err
+
+def test_csv_round_trip_through_cli(empty_db):
+    source = empty_db / "starships.csv"
+    source.write_text("name,model,manufacturer\nX-wing,T-65,Incom\nFalcon,,Corellian\n")
+    main(["import", "starships", str(source), "--quiet"])
+    target = empty_db / "export.csv"
+    main(["export", "starships", str(target)])
+    with open(target, newline="") as stream:
+        assert list(read_records(stream, "csv")) == [
+            {"name": "X-wing", "model": "T-65", "manufacturer": "Incom"},
+            {"name": "Falcon", "model": None, "manufacturer": "Corellian"},
+        ]